@@ -1,16 +1,25 @@
 """The Home Connect integration."""
 
+import asyncio
 import logging
+from datetime import timedelta
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry  # pylint: disable=import-error, no-name-in-module
-from homeassistant.const import CONF_CLIENT_ID, CONF_CLIENT_SECRET  # pylint: disable=import-error, no-name-in-module
+from homeassistant.const import CONF_CLIENT_ID, CONF_CLIENT_SECRET, EVENT_HOMEASSISTANT_STOP  # pylint: disable=import-error, no-name-in-module
 from homeassistant.core import HomeAssistant  # pylint: disable=import-error, no-name-in-module
-from homeassistant.helpers import config_entry_oauth2_flow, config_validation as cv  # pylint: disable=import-error, no-name-in-module
-from homeassistant.helpers import device_registry  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers import config_validation as cv  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers.entity_platform import async_get_platforms  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers.event import async_track_time_interval  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers.storage import Store  # pylint: disable=import-error, no-name-in-module
 from .api import ConfigEntryAuth
-from .config_flow import OAuth2FlowHandler
-from .const import DOMAIN, BASE_URL, ENDPOINT_AUTHORIZE, ENDPOINT_TOKEN
-from .device import Washer, Dryer, Dishwasher, Freezer, FridgeFreezer, Oven, CoffeeMaker, Hood, Hob, WasherDryer, Refrigerator, WineCooler
+from .config_flow import async_register_account_implementation
+from .const import DOMAIN, EVENT_BULK_RESULT, DATA_STORES, STORAGE_VERSION, STORAGE_KEY_CATALOG, STORAGE_KEY_ENTITIES, CATALOG_SAVE_DELAY, DATA_CONFIG, DATA_HANDOFF, INTERPOLATION_INTERVAL_S, TRACE_BUFFER_SIZE
+from .command import BUFFERED
+from .device import APPLIANCE_TYPES
+from .handoff import EventHandoff
+from .homeconnect import EVENT_TTL_S, KEEPALIVE_COUNT, KEEPALIVE_IDLE_S, KEEPALIVE_INTERVAL_S, LIVENESS_TIMEOUT_S, READ_DEADLINE_FACTOR, READ_DEADLINE_MIN_S, STATUS_MAX_KEYS, HomeConnectError
+from .index import ApplianceIndex
+from .tracing import tracer
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,92 +28,225 @@ SERVICE_OPTION_SCHEMA = vol.Schema({vol.Required("device_name"): cv.string, vol.
 SERVICE_SETTING_SCHEMA = vol.Schema({vol.Required("device_name"): cv.string, vol.Required("key"): cv.string, vol.Required("value"): cv.string})
 SERVICE_COMMAND_SCHEMA = vol.Schema({vol.Required("device_name"): cv.string, vol.Required("key"): cv.string})
 
+BULK_KEY_SCHEMA = vol.Schema({vol.Required("key"): cv.string})
+BULK_OPTION_SCHEMA = vol.Schema({vol.Required("key"): cv.string, vol.Required("value"): cv.positive_int})
+# settings are booleans, numbers or enumeration strings, their JSON type is kept
+BULK_SETTING_SCHEMA = vol.Schema({vol.Required("key"): cv.string, vol.Required("value"): vol.Any(bool, int, float, str)})
+SERVICE_BULK_PROGRAM_SCHEMA = vol.Schema({vol.Required("device_names"): vol.All(cv.ensure_list, [cv.string]), vol.Required("key"): cv.string})
+SERVICE_BULK_OPTION_SCHEMA = vol.Schema({vol.Required("device_names"): vol.All(cv.ensure_list, [cv.string]), vol.Required("items"): vol.All(cv.ensure_list, [BULK_OPTION_SCHEMA])})
+SERVICE_BULK_SETTING_SCHEMA = vol.Schema({vol.Required("device_names"): vol.All(cv.ensure_list, [cv.string]), vol.Required("items"): vol.All(cv.ensure_list, [BULK_SETTING_SCHEMA])})
+SERVICE_BULK_COMMAND_SCHEMA = vol.Schema({vol.Required("device_names"): vol.All(cv.ensure_list, [cv.string]), vol.Required("items"): vol.All(cv.ensure_list, [BULK_KEY_SCHEMA])})
+
+TRACING_SCHEMA = vol.Schema(
+    {
+        vol.Optional("sample_rate", default=1.0): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+        vol.Optional("buffer_size", default=TRACE_BUFFER_SIZE): cv.positive_int,
+        vol.Optional("file"): cv.string,
+    }
+)
+RETENTION_SCHEMA = vol.Schema(
+    {
+        vol.Optional("event_ttl", default=EVENT_TTL_S): cv.positive_int,
+        vol.Optional("max_status_keys", default=STATUS_MAX_KEYS): vol.All(vol.Coerce(int), vol.Range(min=64)),
+    }
+)
+DETECTION_SCHEMA = vol.Schema(
+    {
+        vol.Optional("keepalive_idle", default=KEEPALIVE_IDLE_S): cv.positive_int,
+        vol.Optional("keepalive_interval", default=KEEPALIVE_INTERVAL_S): cv.positive_int,
+        vol.Optional("keepalive_count", default=KEEPALIVE_COUNT): cv.positive_int,
+        vol.Optional("read_deadline_factor", default=READ_DEADLINE_FACTOR): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional("read_deadline_min", default=READ_DEADLINE_MIN_S): cv.positive_int,
+        vol.Optional("liveness_timeout", default=LIVENESS_TIMEOUT_S): cv.positive_int,
+    }
+)
+INTERPOLATION_SCHEMA = vol.Schema({vol.Optional("interval", default=INTERPOLATION_INTERVAL_S): vol.All(vol.Coerce(int), vol.Range(min=1))})
+
+THROTTLE_SCHEMA = vol.Schema(
+    {
+        cv.string: vol.Schema(
+            {
+                vol.Required("min_interval"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional("min_delta"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional("min_relative_delta"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            }
+        )
+    }
+)
+CONFIG_SCHEMA = vol.Schema(
+    {DOMAIN: vol.Schema({vol.Optional("tracing"): TRACING_SCHEMA, vol.Optional("retention"): RETENTION_SCHEMA, vol.Optional("detection"): DETECTION_SCHEMA, vol.Optional("throttle"): THROTTLE_SCHEMA, vol.Optional("interpolation"): INTERPOLATION_SCHEMA})},
+    extra=vol.ALLOW_EXTRA,
+)
+
 PLATFORMS = ["binary_sensor", "sensor", "switch", "light"]
+SERVICES = ["program", "option", "setting", "command", "bulk_program", "bulk_option", "bulk_setting", "bulk_command"]
 
 
 async def async_setup(hass: HomeAssistant, config: dict):
-    """Old way to set up integrations."""
+    """Old way to set up integrations. Only used for the YAML options like the event tracing, the status retention and the detection of dead connections."""
+    tracing = config.get(DOMAIN, {}).get("tracing")
+    if tracing is not None:
+        path = hass.config.path(tracing["file"]) if "file" in tracing else None
+        tracer.configure(tracing["sample_rate"], tracing["buffer_size"], path)
+        _LOGGER.info("Tracing %.0f%% of the events", tracing["sample_rate"] * 100)
+    # the other options are applied to the appliances of every account when it's set up
+    hass.data[DATA_CONFIG] = config.get(DOMAIN, {})
     return True
 
 
+def collect_catalogs(hass: HomeAssistant, catalogs: dict):
+    """Update the stored catalogs with the catalogs of the appliances of all accounts."""
+    for account in hass.data.get(DOMAIN, {}).values():
+        catalogs.update({device.appliance.haId: device.appliance.catalog.as_dict() for device in account.devices})
+
+
+def collect_known_keys(hass: HomeAssistant, known_keys: dict):
+    """Update the stored keys of optional entities with the known keys of the devices of all accounts."""
+    for account in hass.data.get(DOMAIN, {}).values():
+        known_keys.update({device.appliance.haId: sorted(device.known_keys) for device in account.devices})
+
+
+async def async_get_shared_store(hass: HomeAssistant, key: str, collect):
+    """Return the data of a store which is shared by all accounts and a function to save it delayed. It's loaded only once.
+    The store keeps only the last data function of delayed saves, so there's one per store and `collect(hass, data)` updates the data from all accounts."""
+    stores = hass.data.setdefault(DATA_STORES, {})
+    if key not in stores:
+        store = Store(hass, STORAGE_VERSION, key)
+
+        async def async_load():
+            data = await store.async_load() or {}
+
+            def data_func():
+                collect(hass, data)
+                return data
+
+            def schedule_save():
+                """Save the data delayed. Called from the executor threads."""
+                hass.add_job(store.async_delay_save, data_func, CATALOG_SAVE_DELAY)
+
+            return data, schedule_save
+
+        stores[key] = hass.async_create_task(async_load())
+    return await stores[key]
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up Home Connect from a config entry."""
 
-    hass.data[DOMAIN] = {}
-
-    async def async_get_appliance(name: str):
-        """Retrieve appliance from device name."""
-        registry = await device_registry.async_get_registry(hass)
-
-        haId = None
-        for device in registry.devices.values():
-            for identifier in device.identifiers:
-                if identifier[0] == DOMAIN and device.name == name:
-                    haId = identifier[1]
-                    break
-            else:
-                continue
-            break
-
-        appliance = None
-        if haId is not None:
-            for hc in hass.data[DOMAIN].values():
-                for dev_dict in hc.devices:
-                    if dev_dict.appliance.haId == haId:
-                        appliance = dev_dict.appliance
-                        break
-                else:
-                    continue
-                break
-
-        return appliance
+    # Several accounts can be set up, each with its own config entry
+    hass.data.setdefault(DOMAIN, {})
+
+    # Index of device names to find the appliance of a service call
+    index = ApplianceIndex(hass)
+
+    def find_device(name: str):
+        """Return the account and the device of a device name. The devices of all accounts are searched."""
+        for account in hass.data[DOMAIN].values():
+            device = account.index.get(name)
+            if device is not None:
+                return account, device
+        return None, None
+
+    async def async_get_device(name: str):
+        """Retrieve device from device name."""
+        return find_device(name)[1]
 
     async def async_service_program(call):
         """Service call for program selection."""
         device_name = call.data["device_name"]
         program_key = call.data["key"]
-        appliance = await async_get_appliance(device_name)
-        if appliance is not None:
-            await hass.async_add_executor_job(getattr(appliance, "set_programs_selected"), program_key)
+        device = await async_get_device(device_name)
+        if device is not None:
+            await device.commands.async_submit(getattr(device.appliance, "set_programs_selected"), program_key)
 
     async def async_service_option(call):
         """Service call for option selection."""
         device_name = call.data["device_name"]
         option_key = call.data["key"]
         value = call.data["value"]
-        appliance = await async_get_appliance(device_name)
-        if appliance is not None:
-            await hass.async_add_executor_job(getattr(appliance, "set_programs_active_options_with_key"), option_key, value)
+        device = await async_get_device(device_name)
+        if device is not None:
+            await device.commands.async_submit(getattr(device.appliance, "set_programs_active_options_with_key"), option_key, value)
 
     async def async_service_setting(call):
         """Service call to set settings."""
         device_name = call.data["device_name"]
         setting_key = call.data["key"]
         value = call.data["value"]
-        appliance = await async_get_appliance(device_name)
-        if appliance is not None:
-            await hass.async_add_executor_job(getattr(appliance, "set_setting_with_key"), setting_key, value)
+        device = await async_get_device(device_name)
+        if device is not None:
+            await device.commands.async_submit(getattr(device.appliance, "set_setting_with_key"), setting_key, value)
 
     async def async_service_command(call):
         """Service call to execute command."""
         device_name = call.data["device_name"]
         command_key = call.data["key"]
-        appliance = await async_get_appliance(device_name)
-        if appliance is not None:
-            await hass.async_add_executor_job(getattr(appliance, "set_command"), command_key)
-
-    hass.services.async_register(DOMAIN, "program", async_service_program, schema=SERVICE_PROGRAM_SCHEMA)
-    hass.services.async_register(DOMAIN, "option", async_service_option, schema=SERVICE_OPTION_SCHEMA)
-    hass.services.async_register(DOMAIN, "setting", async_service_setting, schema=SERVICE_SETTING_SCHEMA)
-    hass.services.async_register(DOMAIN, "command", async_service_command, schema=SERVICE_COMMAND_SCHEMA)
+        device = await async_get_device(device_name)
+        if device is not None:
+            await device.commands.async_submit(getattr(device.appliance, "set_command"), command_key)
+
+    async def async_bulk_write(device_name: str, writes: list):
+        """Execute the writes of one device in order and return the result of this device."""
+        account, device = find_device(device_name)
+        if device is None:
+            return {"device_name": device_name, "success": False, "error": "Device not found"}
+
+        buffered = False
+        for method, args in writes:
+            try:
+                # the command queue takes a slot of the account's request limit for the time a request is in flight
+                result = await device.commands.async_submit(getattr(device.appliance, method), *args)
+            except (HomeConnectError, ValueError) as err:
+                _LOGGER.error("Bulk request %s%s failed on %s: %s", method, args, device_name, err)
+                return {"device_name": device_name, "success": False, "buffered": False, "error": str(err)}
+            buffered = buffered or result is BUFFERED
+
+        # the writes to a disconnected appliance are sent when it's connected again
+        return {"device_name": device_name, "success": not buffered, "buffered": buffered, "error": None}
+
+    async def async_bulk_execute(service: str, device_names: list, writes: list):
+        """Fan out the writes to all devices concurrently and publish the per device results."""
+        results = await asyncio.gather(*[async_bulk_write(device_name, writes) for device_name in device_names])
+        hass.bus.async_fire(EVENT_BULK_RESULT, {"service": service, "results": results})
+        return results
+
+    async def async_service_bulk_program(call):
+        """Service call for program selection on several devices."""
+        await async_bulk_execute(call.service, call.data["device_names"], [("set_programs_selected", (call.data["key"],))])
+
+    async def async_service_bulk_option(call):
+        """Service call for option selection on several devices."""
+        writes = [("set_programs_active_options_with_key", (item["key"], item["value"])) for item in call.data["items"]]
+        await async_bulk_execute(call.service, call.data["device_names"], writes)
+
+    async def async_service_bulk_setting(call):
+        """Service call to set settings on several devices."""
+        writes = [("set_setting_with_key", (item["key"], item["value"])) for item in call.data["items"]]
+        await async_bulk_execute(call.service, call.data["device_names"], writes)
+
+    async def async_service_bulk_command(call):
+        """Service call to execute commands on several devices."""
+        writes = [("set_command", (item["key"],)) for item in call.data["items"]]
+        await async_bulk_execute(call.service, call.data["device_names"], writes)
+
+    # the services find the devices of all accounts, they are registered by the account set up first
+    if not hass.services.has_service(DOMAIN, "program"):
+        hass.services.async_register(DOMAIN, "program", async_service_program, schema=SERVICE_PROGRAM_SCHEMA)
+        hass.services.async_register(DOMAIN, "option", async_service_option, schema=SERVICE_OPTION_SCHEMA)
+        hass.services.async_register(DOMAIN, "setting", async_service_setting, schema=SERVICE_SETTING_SCHEMA)
+        hass.services.async_register(DOMAIN, "command", async_service_command, schema=SERVICE_COMMAND_SCHEMA)
+        hass.services.async_register(DOMAIN, "bulk_program", async_service_bulk_program, schema=SERVICE_BULK_PROGRAM_SCHEMA)
+        hass.services.async_register(DOMAIN, "bulk_option", async_service_bulk_option, schema=SERVICE_BULK_OPTION_SCHEMA)
+        hass.services.async_register(DOMAIN, "bulk_setting", async_service_bulk_setting, schema=SERVICE_BULK_SETTING_SCHEMA)
+        hass.services.async_register(DOMAIN, "bulk_command", async_service_bulk_command, schema=SERVICE_BULK_COMMAND_SCHEMA)
 
     client_id = entry.data.get(CONF_CLIENT_ID)
     client_secret = entry.data.get(CONF_CLIENT_SECRET)
-    authorize_url = f"{BASE_URL}{ENDPOINT_AUTHORIZE}"
-    token_url = f"{BASE_URL}{ENDPOINT_TOKEN}"
-    OAuth2FlowHandler.async_register_implementation(hass, config_entry_oauth2_flow.LocalOAuth2Implementation(hass, DOMAIN, client_id, client_secret, authorize_url, token_url))
-
-    implementation = await config_entry_oauth2_flow.async_get_config_entry_implementation(hass, entry)
+    # Every account uses the implementation with its own credentials, registered under a key of its own
+    implementation = async_register_account_implementation(hass, client_id, client_secret)
+    if entry.data.get("auth_implementation") != implementation.domain:
+        # entries created before used one key for all accounts
+        hass.config_entries.async_update_entry(entry, data={**entry.data, "auth_implementation": implementation.domain})
 
     # session = config_entry_oauth2_flow.OAuth2Session(hass, entry, implementation)
     # hass.data[DOMAIN][entry.entry_id] = ConfigEntryAuth(hass, entry, session)
@@ -113,61 +255,77 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     # Get the Home Connect interface
     home_connect = hass.data[DOMAIN][entry.entry_id]
+    home_connect.index = index
 
     # Get a list of all Home Connect appliances like washer, dryer, oven.
     appliances = await hass.async_add_executor_job(home_connect.get_appliances)
 
-    # Get a list of Home Connect devices and it's entities
-    devices = []
+    # Transient events expire and the status of an appliance is bounded
+    options = hass.data.get(DATA_CONFIG, {})
+    retention = options.get("retention", {})
+    for appliance in appliances:
+        appliance.event_ttl = retention.get("event_ttl", EVENT_TTL_S)
+        appliance.max_status_keys = retention.get("max_status_keys", STATUS_MAX_KEYS)
+
+    # A dead event stream is detected by TCP keepalive, a read deadline derived from the KEEP-ALIVE cadence and the liveness timeout
+    detection = options.get("detection")
+    if detection is not None:
+        for appliance in appliances:
+            appliance.keepalive = (detection["keepalive_idle"], detection["keepalive_interval"], detection["keepalive_count"])
+            appliance.read_deadline_factor = detection["read_deadline_factor"]
+            appliance.read_deadline_min = detection["read_deadline_min"]
+            appliance.liveness_timeout = detection["liveness_timeout"]
+
+    # Restore the program catalogs and save them whenever an appliance refreshed its catalog
+    catalogs, schedule_catalog_save = await async_get_shared_store(hass, STORAGE_KEY_CATALOG, collect_catalogs)
     for appliance in appliances:
-        if appliance.type == "Washer":
-            device = Washer(hass, appliance)
-            _LOGGER.info("Washer detected")
-        elif appliance.type == "Dryer":
-            device = Dryer(hass, appliance)
-            _LOGGER.info("Dryer detected")
-        elif appliance.type == "WasherDryer":
-            device = WasherDryer(hass, appliance)
-            _LOGGER.info("Washer Dryer detected")
-        elif appliance.type == "Refrigerator":
-            device = Refrigerator(hass, appliance)
-            _LOGGER.info("Refrigerator detected")
-        elif appliance.type == "WineCooler":
-            device = WineCooler(hass, appliance)
-            _LOGGER.info("Wine Cooler detected")
-        elif appliance.type == "Freezer":
-            device = Freezer(hass, appliance)
-            _LOGGER.info("Freezer detected")
-        elif appliance.type == "Dishwasher":
-            device = Dishwasher(hass, appliance)
-            _LOGGER.info("Dishwasher detected")
-        elif appliance.type == "FridgeFreezer":
-            device = FridgeFreezer(hass, appliance)
-            _LOGGER.info("Fridge Freezer detected")
-        elif appliance.type == "Oven":
-            device = Oven(hass, appliance)
-            _LOGGER.info("Oven detected")
-        elif appliance.type == "CoffeeMaker":
-            device = CoffeeMaker(hass, appliance)
-            _LOGGER.info("Coffee Maker detected")
-        elif appliance.type == "Hood":
-            device = Hood(hass, appliance)
-            _LOGGER.info("Hood detected")
-        elif appliance.type == "Hob":
-            device = Hob(hass, appliance)
-            _LOGGER.info("Hob detected")
-        else:
+        appliance.catalog.load(catalogs.get(appliance.haId))
+        appliance.catalog.on_change = schedule_catalog_save
+
+    # Restore the keys of optional entities which have been seen before, so their entities are created right away
+    known_keys, schedule_known_keys_save = await async_get_shared_store(hass, STORAGE_KEY_ENTITIES, collect_known_keys)
+
+    # The events of all appliances are handed over to the event loop in batches
+    handoff = hass.data.setdefault(DATA_HANDOFF, EventHandoff(hass.loop))
+
+    # Get a list of Home Connect devices and it's entities. The list is published right away, so accounts set up concurrently see the claimed appliances
+    devices = home_connect.devices = []
+    for appliance in appliances:
+        appliance_class = APPLIANCE_TYPES.get(appliance.type)
+        if appliance_class is None:
             _LOGGER.warning("Appliance type %s not implemented", appliance.type)
             continue
+        # Several accounts can share an appliance, its device is created by the account set up first
+        if any(device.appliance.haId == appliance.haId for account in hass.data[DOMAIN].values() if account is not home_connect for device in account.devices):
+            _LOGGER.info("%s is already set up by another account", appliance.name)
+            continue
+        device = appliance_class(hass, appliance)
+        device.known_keys.update(known_keys.get(appliance.haId, []))
+        device.on_known_keys_changed = schedule_known_keys_save
+        device.handoff = handoff
+        device.commands.limiter = home_connect.request_limiter
+        _LOGGER.info("%s detected", appliance.type)
+
+        # Put the device into the list of devices before waiting for its initialization
+        devices.append(device)
 
-        # Initialize Home Connect device
+        # Initialize Home Connect device, it's stopped on unload even if the initialization fails
+        home_connect.lifecycle.register(device.appliance)
         await hass.async_add_executor_job(device.initialize)
 
-        # Put the device into the list of devices
-        devices.append(device)
+    # Publish the interpolated program times of running programs. Their sensors are throttled, see THROTTLE_POLICIES
+    interval = timedelta(seconds=options.get("interpolation", {}).get("interval", INTERPOLATION_INTERVAL_S))
+    for device in devices:
+        entry.async_on_unload(async_track_time_interval(hass, device.async_publish_interpolation, interval))
+
+    # Build the device name index and keep it current on device registry updates
+    entry.async_on_unload(await index.async_setup(devices))
+
+    # Stop the event streams on shutdown, unloading the entry stops them otherwise
+    async def async_stop(event):
+        await home_connect.lifecycle.async_teardown()
 
-    # Save all found devices in home connect object
-    home_connect.devices = devices
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop))
 
     hass.config_entries.async_setup_platforms(entry, PLATFORMS)
 
@@ -180,6 +338,21 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        # the entity components only reset the platforms of the entry, they would be kept on every reload
+        platforms = async_get_platforms(hass, DOMAIN)
+        platforms[:] = [platform for platform in platforms if platform.config_entry is not entry]
+
+        # the delayed saves see only the accounts which are still loaded
+        stores = hass.data.get(DATA_STORES, {})
+        for key, collect in ((STORAGE_KEY_CATALOG, collect_catalogs), (STORAGE_KEY_ENTITIES, collect_known_keys)):
+            if key in stores:
+                collect(hass, (await stores[key])[0])
+        home_connect = hass.data[DOMAIN].pop(entry.entry_id)
+        await home_connect.lifecycle.async_teardown()
+
+        # the services are shared by all accounts
+        if not hass.data[DOMAIN]:
+            for service in SERVICES:
+                hass.services.async_remove(DOMAIN, service)
 
     return unload_ok
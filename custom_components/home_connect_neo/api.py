@@ -1,10 +1,12 @@
 """API for Home Connect bound to Home Assistant OAuth."""
 
 import logging
-from asyncio import run_coroutine_threadsafe
+from asyncio import Semaphore, run_coroutine_threadsafe
 from homeassistant import config_entries, core  # pylint: disable=import-error, no-name-in-module
 from homeassistant.helpers import config_entry_oauth2_flow  # pylint: disable=import-error, no-name-in-module
+from .const import MAX_CONCURRENT_REQUESTS
 from .homeconnect import HomeConnectAPI
+from .lifecycle import Lifecycle
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,6 +22,11 @@ class ConfigEntryAuth(HomeConnectAPI):
         self.session = config_entry_oauth2_flow.OAuth2Session(hass, config_entry, implementation)
         super().__init__(self.session.token)
         self.devices = []
+        # device name index and request limit of this account
+        self.index = None
+        self.request_limiter = Semaphore(MAX_CONCURRENT_REQUESTS)
+        # event streams and threads stopped on unload
+        self.lifecycle = Lifecycle(hass)
 
     # def refresh_tokens(self) -> str:
     #    """Refresh and return new Home Connect tokens using Home Assistant OAuth2 session."""
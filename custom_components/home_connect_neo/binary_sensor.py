@@ -2,40 +2,70 @@
 
 import logging
 from homeassistant.components.binary_sensor import BinarySensorEntity  # pylint: disable=import-error, no-name-in-module
-from .const import DOMAIN
+from homeassistant.core import callback  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers.dispatcher import async_dispatcher_connect  # pylint: disable=import-error, no-name-in-module
+from .const import DOMAIN, SIGNAL_NEW_ENTITIES
 from .entity import HomeConnectEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# State and icon of a binary sensor for each enum value
+BINARY_SENSOR_STATES = {
+    "BSH.Common.Status.DoorState": {
+        "BSH.Common.EnumType.DoorState.Closed": (False, "mdi:door-closed"),
+        "BSH.Common.EnumType.DoorState.Locked": (False, "mdi:door-closed-lock"),
+        "BSH.Common.EnumType.DoorState.Open": (True, "mdi:door-open"),
+    },
+    "BSH.Common.Setting.PowerState": {
+        "BSH.Common.EnumType.PowerState.On": (True, None),
+        "BSH.Common.EnumType.PowerState.Standby": (False, None),
+        "BSH.Common.EnumType.PowerState.Off": (False, None),
+    },
+}
+
+# Binary sensors which show the boolean value of the message
+VALUE_KEYS = frozenset(["BSH.Common.Status.RemoteControlStartAllowed"])
+
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Add binary sensor in HA."""
 
     home_connect = hass.data[DOMAIN][config_entry.entry_id]
 
-    # put all binary sensors of appliances into a list and add it to HA
-    entities = []
-    for device in home_connect.devices:
-        # get a list of all binary sensors
-        binary_sensor_list = device.get_binary_sensors()
-        for i in binary_sensor_list:
-            # create a home connect binary sensor
-            binary_sensor = HomeConnectBinarySensor(i["device"], i["key"], i["description"], i["device_class"])
-            # add binary sensor to the list
-            entities.append(binary_sensor)
+    @callback
+    def async_add_new_entities(ha_id=None):
+        """Add the binary sensors which are not in HA yet. Optional ones are added when their key appears."""
+
+        # put all binary sensors of appliances into a list and add it to HA
+        entities = []
+        for device in home_connect.devices:
+            # get a list of all binary sensors
+            binary_sensor_list = device.get_binary_sensors()
+            for description in binary_sensor_list:
+                # create a home connect binary sensor
+                binary_sensor = HomeConnectBinarySensor(device, description)
+                # add binary sensor to the list
+                entities.append(binary_sensor)
+
+        # add all entities to HA
+        if entities:
+            async_add_entities(entities, True)
 
-    # add all entities to HA
-    async_add_entities(entities, True)
+    async_add_new_entities()
+    config_entry.async_on_unload(async_dispatcher_connect(hass, SIGNAL_NEW_ENTITIES, async_add_new_entities))
 
 
 class HomeConnectBinarySensor(HomeConnectEntity, BinarySensorEntity):
     """binary sensor for Home Connect."""
 
-    def __init__(self, device, key, description, device_class) -> None:
+    def __init__(self, device, description) -> None:
         """Initialize the entity."""
-        super().__init__(device, description)
-        self._device_class = device_class
-        self._key = key
+        super().__init__(device, description.description)
+        self._device_class = description.device_class
+        self._key = description.key
+        self._watched_keys = frozenset([self._key])
+        self._states = BINARY_SENSOR_STATES.get(self._key)
+        self._is_value = self._key in VALUE_KEYS
         self._state = None
 
     @property
@@ -48,7 +78,7 @@ class HomeConnectBinarySensor(HomeConnectEntity, BinarySensorEntity):
         """Return the class of this binary_sensor."""
         return self._device_class
 
-    async def async_update(self):
+    def update_state(self):
         """Update the binary sensor's status."""
 
         # all messages of this appliance are stored in status
@@ -60,24 +90,14 @@ class HomeConnectBinarySensor(HomeConnectEntity, BinarySensorEntity):
         elif "value" not in status[self._key]:
             self._state = None
         else:
-            # Is there a door message?
-            if self._key == "BSH.Common.Status.DoorState" and status[self._key].get("value") == "BSH.Common.EnumType.DoorState.Closed":
-                self._state = False
-                self._icon = "mdi:door-closed"
-            elif self._key == "BSH.Common.Status.DoorState" and status[self._key].get("value") == "BSH.Common.EnumType.DoorState.Locked":
-                self._state = False
-                self._icon = "mdi:door-closed-lock"
-            elif self._key == "BSH.Common.Status.DoorState" and status[self._key].get("value") == "BSH.Common.EnumType.DoorState.Open":
-                self._state = True
-                self._icon = "mdi:door-open"
-            # Is there a power message?
-            elif self._key == "BSH.Common.Setting.PowerState" and status[self._key].get("value") == "BSH.Common.EnumType.PowerState.On":
-                self._state = True
-            elif self._key == "BSH.Common.Setting.PowerState" and status[self._key].get("value") == "BSH.Common.EnumType.PowerState.Standby":
-                self._state = False
-            elif self._key == "BSH.Common.Setting.PowerState" and status[self._key].get("value") == "BSH.Common.EnumType.PowerState.Off":
-                self._state = False
-            # Is there a remote control message?
-            elif self._key == "BSH.Common.Status.RemoteControlStartAllowed":
-                self._state = status[self._key].get("value")
+            value = status[self._key].get("value")
+            if self._states is not None:
+                # Translate the enum value into state and icon
+                result = self._states.get(value)
+                if result is not None:
+                    self._state, icon = result
+                    if icon is not None:
+                        self._icon = icon
+            elif self._is_value:
+                self._state = value
             # _LOGGER.debug("Updated, new state: %s", self._state)
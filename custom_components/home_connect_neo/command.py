@@ -0,0 +1,127 @@
+"""Ordered command queue for Home Connect appliances."""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from homeassistant.core import HomeAssistant  # pylint: disable=import-error, no-name-in-module
+from .const import COMMAND_TIMEOUT_S, OFFLINE_BUFFER_SIZE, OFFLINE_BUFFER_TTL_S
+from .homeconnect import HomeConnectError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Result of a command of a disconnected appliance which has been buffered for a later replay
+BUFFERED = object()
+
+# Writes of settings and options are buffered, they have the same effect when they are replayed. Programs and commands
+# depend on the state of the appliance when they are sent, e.g. whether remote start is allowed, and are rejected
+BUFFERED_COMMANDS = frozenset({"set_setting_with_key", "set_programs_active_options", "set_programs_active_options_with_key", "set_programs_selected_options", "set_programs_selected_options_with_key"})
+
+
+class CommandQueue:
+    """Execute the commands of one appliance one after another in the order of submission."""
+
+    def __init__(self, hass: HomeAssistant, appliance):
+        """Initialize the queue."""
+        self.hass = hass
+        self.appliance = appliance
+        # waiters of an asyncio lock are woken up first in first out
+        self._lock = asyncio.Lock()
+        self.depth = 0
+        self.executed = 0
+        self.expired = 0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+        # limits the requests of the account in flight at the same time, set by the integration
+        self.limiter = None
+
+        # commands issued while the appliance is disconnected, replayed when it's connected again
+        self._offline = OrderedDict()
+        self.buffered = 0
+        self.replayed = 0
+        self.offline_expired = 0
+        self.superseded = 0
+
+    @staticmethod
+    def _supersede_key(target, args):
+        """Return the key of a command. A newer command with the same key replaces an older buffered one."""
+        name = getattr(target, "__name__", str(target))
+        if args and name.endswith("_with_key"):
+            return (name, args[0])
+        return (name,)
+
+    async def async_submit(self, target, *args, timeout: float = COMMAND_TIMEOUT_S):
+        """Queue a blocking appliance call and return its result or `BUFFERED` if the appliance is disconnected. Raise `HomeConnectError` if the command is stale before it could be sent or can't be buffered."""
+        if not self.appliance.is_connected:
+            if getattr(target, "__name__", None) not in BUFFERED_COMMANDS:
+                raise HomeConnectError(f"{self.appliance.name} is disconnected, {getattr(target, '__name__', target)} is not buffered")
+            self._buffer(target, args)
+            return BUFFERED
+
+        submitted = self.hass.loop.time()
+        self.depth += 1
+        try:
+            try:
+                await asyncio.wait_for(self._lock.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.expired += 1
+                _LOGGER.warning("Dropped stale command %s on %s after %.1f s", getattr(target, "__name__", target), self.appliance.name, timeout)
+                raise HomeConnectError("Command expired before it could be sent") from None
+        finally:
+            self.depth -= 1
+
+        try:
+            self.last_wait = self.hass.loop.time() - submitted
+            self.max_wait = max(self.max_wait, self.last_wait)
+            self.executed += 1
+            _LOGGER.debug("Execute command %s on %s after waiting %.3f s, %d queued", getattr(target, "__name__", target), self.appliance.name, self.last_wait, self.depth)
+            if self.limiter is None:
+                return await self.hass.async_add_executor_job(target, *args)
+            # only the request itself takes a slot, not the wait for the commands queued before
+            async with self.limiter:
+                return await self.hass.async_add_executor_job(target, *args)
+        finally:
+            self._lock.release()
+
+    def _buffer(self, target, args):
+        """Keep a command of a disconnected appliance for a later replay."""
+        key = self._supersede_key(target, args)
+        if self._offline.pop(key, None) is not None:
+            self.superseded += 1
+        elif len(self._offline) >= OFFLINE_BUFFER_SIZE:
+            self._offline.popitem(last=False)
+            self.offline_expired += 1
+        self._offline[key] = (target, args, self.hass.loop.time() + OFFLINE_BUFFER_TTL_S)
+        self.buffered += 1
+        _LOGGER.info("%s is disconnected. Command %s buffered", self.appliance.name, key)
+
+    async def async_replay(self):
+        """Send the buffered commands in order after the appliance has been connected again."""
+        commands = list(self._offline.values())
+        self._offline.clear()
+
+        now = self.hass.loop.time()
+        for target, args, expires in commands:
+            if expires < now:
+                self.offline_expired += 1
+                continue
+            try:
+                # buffered again if the appliance has been disconnected in the meantime
+                if await self.async_submit(target, *args) is not BUFFERED:
+                    self.replayed += 1
+            except (HomeConnectError, ValueError) as err:
+                _LOGGER.error("Replay of command %s on %s failed: %s", getattr(target, "__name__", target), self.appliance.name, err)
+
+    def as_dict(self):
+        """Return the queue statistics."""
+        return {
+            "depth": self.depth,
+            "executed": self.executed,
+            "expired": self.expired,
+            "last_wait": round(self.last_wait, 3),
+            "max_wait": round(self.max_wait, 3),
+            "buffered": self.buffered,
+            "pending": len(self._offline),
+            "replayed": self.replayed,
+            "offline_expired": self.offline_expired,
+            "superseded": self.superseded,
+        }
@@ -28,10 +28,6 @@ class OAuth2FlowHandler(config_entry_oauth2_flow.AbstractOAuth2FlowHandler, doma
 
         errors = {}
 
-        # Only one instance should be allowed
-        if self._async_current_entries():
-            return self.async_abort(reason="single_instance_allowed")
-
         # Has the user already entered something?
         if user_input is not None:
             # Check the input is not empty and client ID and client secret has 64 character
@@ -39,12 +35,10 @@ class OAuth2FlowHandler(config_entry_oauth2_flow.AbstractOAuth2FlowHandler, doma
                 # Register your own Config Flow Handler
                 self.client_id = user_input[CONF_CLIENT_ID]
                 self.client_secret = user_input[CONF_CLIENT_SECRET]
-                authorize_url = f"{BASE_URL}{ENDPOINT_AUTHORIZE}"
-                token_url = f"{BASE_URL}{ENDPOINT_TOKEN}"
-                OAuth2FlowHandler.async_register_implementation(self.hass, config_entry_oauth2_flow.LocalOAuth2Implementation(self.hass, DOMAIN, self.client_id, self.client_secret, authorize_url, token_url))
+                implementation = async_register_account_implementation(self.hass, self.client_id, self.client_secret)
 
-                # Hand over control of the parent class
-                return await self.async_step_pick_implementation()
+                # Hand over control of the parent class with the implementation of these credentials, other accounts have their own
+                return await self.async_step_pick_implementation({"implementation": implementation.domain})
             else:
                 # otherwise show an error message
                 errors["base"] = "auth"
@@ -61,4 +55,17 @@ class OAuth2FlowHandler(config_entry_oauth2_flow.AbstractOAuth2FlowHandler, doma
         user_input[CONF_CLIENT_ID] = self.client_id
         user_input[CONF_CLIENT_SECRET] = self.client_secret
 
-        return self.async_create_entry(title=NAME, data=user_input)
+        # several accounts can be set up, number them to tell them apart
+        entries = len(self._async_current_entries())
+        title = NAME if not entries else f"{NAME} {entries + 1}"
+
+        return self.async_create_entry(title=title, data=user_input)
+
+
+def async_register_account_implementation(hass, client_id: str, client_secret: str):
+    """Register and return the OAuth2 implementation of the credentials of an account. Each client ID has its own key, so accounts don't refresh their tokens with the credentials of another one."""
+    authorize_url = f"{BASE_URL}{ENDPOINT_AUTHORIZE}"
+    token_url = f"{BASE_URL}{ENDPOINT_TOKEN}"
+    implementation = config_entry_oauth2_flow.LocalOAuth2Implementation(hass, f"{DOMAIN}_{client_id}", client_id, client_secret, authorize_url, token_url)
+    OAuth2FlowHandler.async_register_implementation(hass, implementation)
+    return implementation
@@ -1,9 +1,12 @@
 """Constants for the Home Connect integration."""
 
+import os
+
 DOMAIN = "home_connect_neo"
 NAME = "Home Connect Neo"
 
-BASE_URL = "https://api.home-connect.com"
+# The cloud can be replaced by the simulator or a local stand-in like tools/fake_home_connect.py
+BASE_URL = os.environ.get("HOME_CONNECT_BASE_URL", "https://api.home-connect.com").rstrip("/")
 # BASE_URL = "https://simulator.home-connect.com"
 
 ENDPOINT_AUTHORIZE = "/security/oauth/authorize"
@@ -11,3 +14,42 @@ ENDPOINT_TOKEN = "/security/oauth/token"
 ENDPOINT_APPLIANCES = "/api/homeappliances"
 
 SIGNAL_UPDATE_ENTITIES = "home_connect_neo.update_entities"
+SIGNAL_NEW_ENTITIES = "home_connect_neo.new_entities"
+EVENT_BULK_RESULT = "home_connect_neo_bulk_result"
+
+# Maximum number of concurrent requests of an account to the Home Connect cloud
+MAX_CONCURRENT_REQUESTS = 4
+
+# Commands which could not be sent within this time are dropped
+COMMAND_TIMEOUT_S = 30
+
+# Commands of disconnected appliances are buffered and replayed on reconnect
+OFFLINE_BUFFER_SIZE = 16
+OFFLINE_BUFFER_TTL_S = 15 * 60
+
+# Stores shared by all accounts
+DATA_STORES = "home_connect_neo.stores"
+
+# Options configured in YAML for the appliances of all accounts
+DATA_CONFIG = "home_connect_neo.config"
+
+# Handoff of the events of all accounts to the event loop
+DATA_HANDOFF = "home_connect_neo.handoff"
+
+# Persisted program catalogs of all appliances
+STORAGE_VERSION = 1
+STORAGE_KEY_CATALOG = "home_connect_neo.catalog"
+CATALOG_SAVE_DELAY = 10
+
+# Interval to publish interpolated program times while a program is running. The throttle of the program time sensors
+# writes them at most once a minute anyway, unless they changed by 5 minutes, so shorter intervals need a shorter throttle
+INTERPOLATION_INTERVAL_S = 60
+
+# Persisted keys of optional entities which have been seen on the appliances
+STORAGE_KEY_ENTITIES = "home_connect_neo.entities"
+
+# Number of finished event traces kept for the latency report
+TRACE_BUFFER_SIZE = 1000
+
+# Seconds to wait for the event stream threads to end on unload or shutdown
+SHUTDOWN_TIMEOUT_S = 5
@@ -1,25 +1,156 @@
 """API for Home Connect bound to Home Assistant OAuth."""
 
 import logging
+from dataclasses import dataclass
+from typing import Optional
 from homeassistant.const import PERCENTAGE, TEMP_CELSIUS, TIME_SECONDS, VOLUME_MILLILITERS  # pylint: disable=import-error, no-name-in-module
-from homeassistant.helpers.dispatcher import dispatcher_send  # pylint: disable=import-error, no-name-in-module
-from .const import SIGNAL_UPDATE_ENTITIES
+from homeassistant.core import callback  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers.dispatcher import async_dispatcher_send  # pylint: disable=import-error, no-name-in-module
+from .command import CommandQueue
+from .const import SIGNAL_NEW_ENTITIES, SIGNAL_UPDATE_ENTITIES
+from .homeconnect import INTERPOLATED_KEYS
+from .metrics import metrics
+from .tracing import NULL_TRACE, TraceGroup, tracer
 
 _LOGGER = logging.getLogger(__name__)
 
 
+# Entities of lazy descriptions are only created when their key has been seen in the status, settings or events of the appliance
+
+
+@dataclass(frozen=True)
+class BinarySensorDescription:
+    """Description of a binary sensor."""
+
+    key: str
+    description: str
+    device_class: Optional[str] = None
+    lazy: bool = False
+
+
+@dataclass(frozen=True)
+class SensorDescription:
+    """Description of a sensor."""
+
+    key: str
+    description: str
+    unit: Optional[str] = None
+    icon: Optional[str] = None
+    device_class: Optional[str] = None
+    lazy: bool = False
+
+
+@dataclass(frozen=True)
+class SwitchDescription:
+    """Description of a switch."""
+
+    key: str
+    description: str
+    lazy: bool = False
+
+
+@dataclass(frozen=True)
+class LightDescription:
+    """Description of a light."""
+
+    key: str
+    description: str
+    lazy: bool = False
+
+
+# Binary sensors
+POWER = BinarySensorDescription("BSH.Common.Setting.PowerState", "Power", "power")
+REMOTE_CONTROL = BinarySensorDescription("BSH.Common.Status.RemoteControlStartAllowed", "Remote Control")
+DOOR = BinarySensorDescription("BSH.Common.Status.DoorState", "Door", "door")
+
+# Sensors
+OPERATION_STATE = SensorDescription("BSH.Common.Status.OperationState", "Operation State", device_class="home_connect_operation")
+REMAINING_TIME = SensorDescription("BSH.Common.Option.RemainingProgramTime", "Remaining Time", TIME_SECONDS, "mdi:update")
+DURATION = SensorDescription("BSH.Common.Option.Duration", "Duration", TIME_SECONDS, "mdi:update")
+ELAPSED_TIME = SensorDescription("BSH.Common.Option.ElapsedProgramTime", "Elapsed Program Time", TIME_SECONDS, "mdi:update")
+PROGRESS = SensorDescription("BSH.Common.Option.ProgramProgress", "Progress", PERCENTAGE, "mdi:progress-clock")
+WASHER_PROGRAM = SensorDescription("BSH.Common.Root.SelectedProgram", "Program", None, "mdi:format-list-bulleted", "home_connect_washer_program")
+DRYER_PROGRAM = SensorDescription("BSH.Common.Root.SelectedProgram", "Program", None, "mdi:format-list-bulleted", "home_connect_dryer_program")
+DISHCARE_PROGRAM = SensorDescription("BSH.Common.Root.SelectedProgram", "Program", None, "mdi:format-list-bulleted", "home_connect_dishcare_program")
+OVEN_PROGRAM = SensorDescription("BSH.Common.Root.SelectedProgram", "Program", None, "mdi:format-list-bulleted", "home_connect_oven_program")
+COFFEE_MAKER_PROGRAM = SensorDescription("BSH.Common.Root.SelectedProgram", "Program", None, "mdi:format-list-bulleted", "home_connect_coffee_maker_program")
+WASHER_TEMPERATURE = SensorDescription("LaundryCare.Washer.Option.Temperature", "Temperature", None, "mdi:coolant-temperature", "home_connect_washer_temperatur")
+SPIN_SPEED = SensorDescription("LaundryCare.Washer.Option.SpinSpeed", "Spin Speed", None, "mdi:rotate-right", "home_connect_washer_spin_speed")
+DRYING_TARGET = SensorDescription("LaundryCare.Dryer.Option.DryingTarget", "Drying Target", None, "mdi:water-percent", "home_connect_drying_target")
+CAVITY_TEMPERATURE = SensorDescription("Cooking.Oven.Status.CurrentCavityTemperature", "Current Cavity Temperature", TEMP_CELSIUS, "mdi:thermometer")
+OVEN_TEMPERATURE = SensorDescription("Cooking.Oven.Option.SetpointTemperature", "Temperature", TEMP_CELSIUS, "mdi:thermometer")
+CHILLER_LEFT_TEMPERATURE = SensorDescription("Refrigeration.Common.Setting.ChillerLeft.SetpointTemperature", "Chiller Left Temperature", TEMP_CELSIUS, "mdi:thermometer", lazy=True)
+CHILLER_TEMPERATURE = SensorDescription("Refrigeration.Common.Setting.ChillerCommon.SetpointTemperature", "Chiller Temperature", TEMP_CELSIUS, "mdi:thermometer", lazy=True)
+CHILLER_RIGHT_TEMPERATURE = SensorDescription("Refrigeration.Common.Setting.ChillerRight.SetpointTemperature", "Chiller Right Temperature", TEMP_CELSIUS, "mdi:thermometer", lazy=True)
+# The entity names are part of the unique ids, so the refrigerators keep their names
+REFRIGERATOR_TEMPERATURE = SensorDescription("Refrigeration.FridgeFreezer.Setting.SetpointTemperatureRefrigerator", "Temperature", TEMP_CELSIUS, "mdi:thermometer")
+REFRIGERATOR_BOTTLE_TEMPERATURE = SensorDescription("Refrigeration.Common.Setting.BottleCooler.SetpointTemperature", "Bottle Coller Temperature", TEMP_CELSIUS, "mdi:thermometer", lazy=True)
+FREEZER_TEMPERATURE = SensorDescription("Refrigeration.FridgeFreezer.Setting.SetpointTemperatureFreezer", "Temperature", TEMP_CELSIUS, "mdi:thermometer")
+FRIDGE_FREEZER_FREEZER_TEMPERATURE = SensorDescription("Refrigeration.FridgeFreezer.Setting.SetpointTemperatureFreezer", "Freezer Temperature", TEMP_CELSIUS, "mdi:thermometer")
+FRIDGE_FREEZER_REFRIGERATOR_TEMPERATURE = SensorDescription("Refrigeration.FridgeFreezer.Setting.SetpointTemperatureRefrigerator", "Refrigerator Temperature", TEMP_CELSIUS, "mdi:thermometer")
+FRIDGE_FREEZER_BOTTLE_TEMPERATURE = SensorDescription("Refrigeration.Common.Setting.BottleCooler.SetpointTemperature", "Bottle Temperature", TEMP_CELSIUS, "mdi:thermometer", lazy=True)
+WINE_TEMPERATURE_1 = SensorDescription("Refrigeration.Common.Setting.WineCompartment.SetpointTemperature", "Temperature 1", TEMP_CELSIUS, "mdi:thermometer")
+WINE_TEMPERATURE_2 = SensorDescription("Refrigeration.Common.Setting.WineCompartment2.SetpointTemperature", "Temperature 2", TEMP_CELSIUS, "mdi:thermometer", lazy=True)
+WINE_TEMPERATURE_3 = SensorDescription("Refrigeration.Common.Setting.WineCompartment3.SetpointTemperature", "Temperature 3", TEMP_CELSIUS, "mdi:thermometer", lazy=True)
+COFFEE_TEMPERATURE = SensorDescription("ConsumerProducts.CoffeeMaker.Option.CoffeeTemperature", "Temperature", None, "mdi:thermometer", "home_connect_coffee_maker_temperature")
+FILL_QUANTITY = SensorDescription("ConsumerProducts.CoffeeMaker.Option.FillQuantity", "Fill Quantity", VOLUME_MILLILITERS, "mdi:water-outline", "None")
+BEAN_AMOUNT = SensorDescription("ConsumerProducts.CoffeeMaker.Option.BeanAmount", "Bean Amount", None, "mdi:scatter-plot", "home_connect_coffee_maker_bean_amount")
+
+# Switches
+START = SwitchDescription("BSH.Common.Start", "Start")
+SUPER_MODE_REFRIGERATOR = SwitchDescription("Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator", "Super Mode Refrigerator", lazy=True)
+SUPER_MODE_FREEZER = SwitchDescription("Refrigeration.FridgeFreezer.Setting.SuperModeFreezer", "Super Mode Freezer", lazy=True)
+ECO_MODE = SwitchDescription("Refrigeration.Common.Setting.EcoMode", "Eco Mode", lazy=True)
+SABBATH_MODE = SwitchDescription("Refrigeration.Common.Setting.SabbathMode", "Sabbath Mode", lazy=True)
+VACATION_MODE = SwitchDescription("Refrigeration.Common.Setting.VacationMode", "Vacation Mode", lazy=True)
+FRESH_MODE = SwitchDescription("Refrigeration.Common.Setting.FreshMode", "Fresh Mode", lazy=True)
+
+# Lights
+LIGHTING = LightDescription("Cooking.Common.Setting.Lighting", "Light")
+AMBIENT_LIGHT = LightDescription("BSH.Common.Setting.AmbientLightEnabled", "Ambient Light")
+
+# Appliance classes registered by Home Connect appliance type
+APPLIANCE_TYPES = {}
+
+
+def register(appliance_type):
+    """Register an appliance class for a Home Connect appliance type."""
+
+    def decorator(cls):
+        APPLIANCE_TYPES[appliance_type] = cls
+        return cls
+
+    return decorator
+
+
 class Appliance:
     """Home Connect generic device."""
 
+    binary_sensors = (POWER,)
+    sensors = ()
+    switches = ()
+    lights = ()
+
     def __init__(self, hass, appliance):
         """Constructor"""
         self.hass = hass
         self.appliance = appliance
-        self.binary_sensors = []
-        self.sensors = []
-        self.switches = []
-        self.lights = []
-        self.binary_sensors.append({"device": self, "key": "BSH.Common.Setting.PowerState", "description": "Power", "device_class": "power"})
+        self.commands = CommandQueue(hass, appliance)
+        self.was_connected = appliance.is_connected
+
+        # keys of lazy descriptions which have been seen on this appliance, persisted by the integration
+        self.known_keys = set()
+        self.on_known_keys_changed = None
+        self._lazy_keys = frozenset(d.key for platform in (self.binary_sensors, self.sensors, self.switches, self.lights) for d in platform if d.lazy)
+        # the status keeps the keys of the entities, whether they have been created yet or not
+        appliance.observed_keys.update(d.key for platform in (self.binary_sensors, self.sensors, self.switches, self.lights) for d in platform)
+        self._created = set()
+
+        # hands the events of the listener thread over to the event loop, shared by all devices
+        self.handoff = None
+
+        # events forwarded to the entities
+        self._dispatched = metrics.counter("dispatch.events", appliance=appliance.haId)
 
     def initialize(self):
         """Initialize appliance."""
@@ -28,331 +159,219 @@ class Appliance:
         # listen to events sent from appliance
         self.appliance.listen_events(callback=self.event_callback)
 
-    def event_callback(self, appliance):
-        """Handle event."""
-        _LOGGER.debug("Update triggered on %s", appliance.name)
-        # Dump the entire status buffer
-        for key in self.appliance.status:
-            value = self.appliance.status[key]
-            # remove uri due to better readability
-            if "uri" in value:
-                value["uri"] = "none"
-            _LOGGER.debug("%s: %s", key, value)
-        # forward the event to home assistant entities
-        dispatcher_send(self.hass, SIGNAL_UPDATE_ENTITIES, appliance.haId)
+    def event_callback(self, appliance, keys=None, trace=NULL_TRACE):
+        """Handle event. Called from the listener thread, the changes of all events received until the event loop runs are dispatched together."""
+        self.handoff.submit(self, keys, trace)
+
+    @callback
+    def async_dispatch(self, keys, traces, events):
+        """Update the entities with the merged changed keys of one or more events, all of them if keys is None."""
+        appliance = self.appliance
+        _LOGGER.debug("Update triggered on %s by %d events", appliance.name, events)
+        # Dump the entire status buffer without the uri for better readability
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            for key, value in list(appliance.status.items()):
+                _LOGGER.debug("%s: %s", key, {name: item for name, item in value.items() if name != "uri"})
+        # replay the commands which were issued while the appliance was disconnected
+        if appliance.is_connected and not self.was_connected:
+            self.hass.async_add_job(self.commands.async_replay)
+        # the availability of all entities changes with the connection
+        if appliance.is_connected != self.was_connected:
+            keys = None
+        self.was_connected = appliance.is_connected
+        # create the entities of keys which appeared for the first time
+        if self._observe_keys(keys):
+            async_dispatcher_send(self.hass, SIGNAL_NEW_ENTITIES, appliance.haId)
+        # forward the events to home assistant entities
+        self._dispatched.inc(events)
+        trace = TraceGroup(traces)
+        trace.mark("dispatched")
+        if not trace:
+            async_dispatcher_send(self.hass, SIGNAL_UPDATE_ENTITIES, appliance.haId, keys)
+            return
+        async_dispatcher_send(self.hass, SIGNAL_UPDATE_ENTITIES, appliance.haId, keys, trace)
+        # the entities are updated by jobs scheduled before this one
+        self.hass.async_add_job(self._async_finish_traces, traces)
+
+    @callback
+    def _async_finish_traces(self, traces):
+        """Keep the traces after the entities have written their state."""
+        for trace in traces:
+            tracer.finish(trace)
+
+    @callback
+    def async_publish_interpolation(self, _now=None):
+        """Update the entities of the interpolated program times while a program is running."""
+        if self.appliance.is_interpolating:
+            async_dispatcher_send(self.hass, SIGNAL_UPDATE_ENTITIES, self.appliance.haId, INTERPOLATED_KEYS.keys())
+
+    def _observe_keys(self, keys=None):
+        """Remember lazy keys which are present in the status. Return true if there are new ones."""
+        status = self.appliance.status
+        candidates = self._lazy_keys if keys is None else self._lazy_keys.intersection(keys)
+        new_keys = {key for key in candidates if key not in self.known_keys and key in status}
+        if not new_keys:
+            return False
+        _LOGGER.debug("New keys on %s: %s", self.appliance.name, new_keys)
+        self.known_keys.update(new_keys)
+        if self.on_known_keys_changed is not None:
+            self.on_known_keys_changed()
+        return True
+
+    def _take(self, descriptions):
+        """Return the descriptions whose entities can be created now and have not been created before."""
+        self._observe_keys()
+        result = [d for d in descriptions if d not in self._created and (not d.lazy or d.key in self.known_keys)]
+        self._created.update(result)
+        return result
 
     def get_binary_sensors(self):
-        """Get a dictionary with info about all binary sensors."""
-        return self.binary_sensors
+        """Get the descriptions of the binary sensors which have not been created yet."""
+        return self._take(self.binary_sensors)
 
     def get_sensors(self):
-        """Get a dictionary with info about all sensors."""
-        return self.sensors
+        """Get the descriptions of the sensors which have not been created yet."""
+        return self._take(self.sensors)
 
     def get_switches(self):
-        """Get a dictionary with info about all switches."""
-        return self.switches
+        """Get the descriptions of the switches which have not been created yet."""
+        return self._take(self.switches)
 
     def get_lights(self):
-        """Get a dictionary with info about all lights sensors."""
-        return self.lights
-
-
+        """Get the descriptions of the lights which have not been created yet."""
+        return self._take(self.lights)
+
+    def skipped_entities(self):
+        """Return the number of entities which have not been created because the appliance does not report their key."""
+        return sum(1 for platform in (self.binary_sensors, self.sensors, self.switches, self.lights) for d in platform if d not in self._created)
+
+    def diagnostics(self):
+        """Return the statistics of the appliance which are not kept in the metrics registry."""
+        sse = self.appliance._sse
+        return {
+            "connected": self.appliance.is_connected,
+            "commands": self.commands.as_dict(),
+            "skipped_requests": self.appliance.skipped_requests,
+            "unsupported": dict(self.appliance.unsupported),
+            "skipped_entities": self.skipped_entities(),
+            "known_keys": sorted(self.known_keys),
+            "status_keys": len(self.appliance.status),
+            "history": {"keys": self.appliance.history.keys(), "bytes": self.appliance.history.nbytes},
+            "read_deadline": sse.read_deadline if sse is not None else None,
+            "last_detection_time": sse.last_detection_time if sse is not None else None,
+        }
+
+
+@register("Washer")
 class Washer(Appliance):
     """Washer."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.RemoteControlStartAllowed", "description": "Remote Control", "device_class": None},
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.OperationState", "description": "Operation State", "unit": None, "icon": None, "device_class": "home_connect_operation"},
-                {"device": self, "key": "BSH.Common.Option.RemainingProgramTime", "description": "Remaining Time", "unit": TIME_SECONDS, "icon": "mdi:update", "device_class": None},
-                {"device": self, "key": "BSH.Common.Option.ProgramProgress", "description": "Progress", "unit": PERCENTAGE, "icon": "mdi:progress-clock", "device_class": None},
-                {"device": self, "key": "BSH.Common.Root.SelectedProgram", "description": "Program", "unit": None, "icon": "mdi:format-list-bulleted", "device_class": "home_connect_washer_program"},
-                {"device": self, "key": "LaundryCare.Washer.Option.Temperature", "description": "Temperature", "unit": None, "icon": "mdi:coolant-temperature", "device_class": "home_connect_washer_temperatur"},
-                {"device": self, "key": "LaundryCare.Washer.Option.SpinSpeed", "description": "Spin Speed", "unit": None, "icon": "mdi:rotate-right", "device_class": "home_connect_washer_spin_speed"},
-            ]
-        )
-        self.switches.append({"device": self, "key": "BSH.Common.Start", "description": "Start"})
+    binary_sensors = (POWER, REMOTE_CONTROL, DOOR)
+    sensors = (OPERATION_STATE, REMAINING_TIME, PROGRESS, WASHER_PROGRAM, WASHER_TEMPERATURE, SPIN_SPEED)
+    switches = (START,)
 
 
+@register("Dryer")
 class Dryer(Appliance):
     """Dryer."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.RemoteControlStartAllowed", "description": "Remote Control", "device_class": None},
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.OperationState", "description": "Operation State", "unit": None, "icon": None, "device_class": "home_connect_operation"},
-                {"device": self, "key": "BSH.Common.Option.RemainingProgramTime", "description": "Remaining Time", "unit": TIME_SECONDS, "icon": "mdi:update", "device_class": None},
-                {"device": self, "key": "BSH.Common.Option.ProgramProgress", "description": "Progress", "unit": PERCENTAGE, "icon": "mdi:progress-clock", "device_class": None},
-                {"device": self, "key": "BSH.Common.Root.SelectedProgram", "description": "Program", "unit": None, "icon": "mdi:format-list-bulleted", "device_class": "home_connect_dryer_program"},
-                {"device": self, "key": "LaundryCare.Dryer.Option.DryingTarget", "description": "Drying Target", "unit": None, "icon": "mdi:water-percent", "device_class": "home_connect_drying_target"},
-            ]
-        )
-        self.switches.append({"device": self, "key": "BSH.Common.Start", "description": "Start"})
+    binary_sensors = (POWER, REMOTE_CONTROL, DOOR)
+    sensors = (OPERATION_STATE, REMAINING_TIME, PROGRESS, DRYER_PROGRAM, DRYING_TARGET)
+    switches = (START,)
 
 
+@register("WasherDryer")
 class WasherDryer(Appliance):
     """Washer Dryer."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.RemoteControlStartAllowed", "description": "Remote Control", "device_class": None},
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.OperationState", "description": "Operation State", "unit": None, "icon": None, "device_class": "home_connect_operation"},
-                {"device": self, "key": "BSH.Common.Option.RemainingProgramTime", "description": "Remaining Time", "unit": TIME_SECONDS, "icon": "mdi:update", "device_class": None},
-                {"device": self, "key": "BSH.Common.Option.ProgramProgress", "description": "Progress", "unit": PERCENTAGE, "icon": "mdi:progress-clock", "device_class": None},
-                {"device": self, "key": "BSH.Common.Root.SelectedProgram", "description": "Program", "unit": None, "icon": "mdi:format-list-bulleted", "device_class": "home_connect_washer_program"},
-                {"device": self, "key": "LaundryCare.Washer.Option.Temperature", "description": "Temperature", "unit": None, "icon": "mdi:coolant-temperature", "device_class": "home_connect_washer_temperatur"},
-                {"device": self, "key": "LaundryCare.Washer.Option.SpinSpeed", "description": "Spin Speed", "unit": None, "icon": "mdi:rotate-right", "device_class": "home_connect_washer_spin_speed"},
-                {"device": self, "key": "LaundryCare.Dryer.Option.DryingTarget", "description": "Drying Target", "unit": None, "icon": "mdi:water-percent", "device_class": "home_connect_drying_target"},
-            ]
-        )
-        self.switches.append({"device": self, "key": "BSH.Common.Start", "description": "Start"})
+    binary_sensors = (POWER, REMOTE_CONTROL, DOOR)
+    sensors = (OPERATION_STATE, REMAINING_TIME, PROGRESS, WASHER_PROGRAM, WASHER_TEMPERATURE, SPIN_SPEED, DRYING_TARGET)
+    switches = (START,)
 
 
+@register("Dishwasher")
 class Dishwasher(Appliance):
     """Dishwasher."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.RemoteControlStartAllowed", "description": "Remote Control", "device_class": None},
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.OperationState", "description": "Operation State", "unit": None, "icon": None, "device_class": "home_connect_operation"},
-                {"device": self, "key": "BSH.Common.Option.RemainingProgramTime", "description": "Remaining Time", "unit": TIME_SECONDS, "icon": "mdi:update", "device_class": None},
-                {"device": self, "key": "BSH.Common.Option.ProgramProgress", "description": "Progress", "unit": PERCENTAGE, "icon": "mdi:progress-clock", "device_class": None},
-                {"device": self, "key": "BSH.Common.Root.SelectedProgram", "description": "Program", "unit": None, "icon": "mdi:format-list-bulleted", "device_class": "home_connect_dishcare_program"},
-            ]
-        )
-        self.switches.append({"device": self, "key": "BSH.Common.Start", "description": "Start"})
-        self.lights.append({"device": self, "key": "BSH.Common.Setting.AmbientLightEnabled", "description": "Ambient Light"})
+    binary_sensors = (POWER, REMOTE_CONTROL, DOOR)
+    sensors = (OPERATION_STATE, REMAINING_TIME, PROGRESS, DISHCARE_PROGRAM)
+    switches = (START,)
+    lights = (AMBIENT_LIGHT,)
 
 
+@register("Refrigerator")
 class Refrigerator(Appliance):
     """Refrigerator."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "Refrigeration.Common.Setting.BottleCooler.SetpointTemperature", "description": "Bottle Coller Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.Common.Setting.ChillerLeft.SetpointTemperature", "description": "Chiller Left Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.Common.Setting.ChillerCommon.SetpointTemperature", "description": "Chiller Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.Common.Setting.ChillerRight.SetpointTemperature", "description": "Chiller Right Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.FridgeFreezer.Setting.SetpointTemperatureRefrigerator", "description": "Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-            ]
-        )
-        self.switches.extend(
-            [
-                {"device": self, "key": "Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator", "description": "Super Mode Refrigerator"},
-                {"device": self, "key": "Refrigeration.Common.Setting.EcoMode", "description": "Eco Mode"},
-                {"device": self, "key": "Refrigeration.Common.Setting.SabbathMode", "description": "Sabbath Mode"},
-                {"device": self, "key": "Refrigeration.Common.Setting.VacationMode", "description": "Vacation Mode"},
-                {"device": self, "key": "Refrigeration.Common.Setting.FreshMode", "description": "Fresh Mode"},
-            ]
-        )
+    binary_sensors = (POWER, DOOR)
+    sensors = (REFRIGERATOR_BOTTLE_TEMPERATURE, CHILLER_LEFT_TEMPERATURE, CHILLER_TEMPERATURE, CHILLER_RIGHT_TEMPERATURE, REFRIGERATOR_TEMPERATURE)
+    switches = (SUPER_MODE_REFRIGERATOR, ECO_MODE, SABBATH_MODE, VACATION_MODE, FRESH_MODE)
 
 
+@register("WineCooler")
 class WineCooler(Appliance):
     """Wine Cooler."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "Refrigeration.Common.Setting.WineCompartment.SetpointTemperature", "description": "Temperature 1", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.Common.Setting.WineCompartment2.SetpointTemperature", "description": "Temperature 2", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.Common.Setting.WineCompartment3.SetpointTemperature", "description": "Temperature 3", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-            ]
-        )
-        self.switches.append({"device": self, "key": "Refrigeration.Common.Setting.SabbathMode", "description": "Sabbath Mode"})
+    binary_sensors = (POWER, DOOR)
+    sensors = (WINE_TEMPERATURE_1, WINE_TEMPERATURE_2, WINE_TEMPERATURE_3)
+    switches = (SABBATH_MODE,)
 
 
+@register("Freezer")
 class Freezer(Appliance):
     """Freezer."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "Refrigeration.FridgeFreezer.Setting.SetpointTemperatureFreezer", "description": "Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-            ]
-        )
-        self.switches.extend(
-            [
-                {"device": self, "key": "Refrigeration.FridgeFreezer.Setting.SuperModeFreezer", "description": "Super Mode Freezer"},
-                {"device": self, "key": "Refrigeration.Common.Setting.EcoMode", "description": "Eco Mode"},
-                {"device": self, "key": "Refrigeration.Common.Setting.SabbathMode", "description": "Sabbath Mode"},
-            ]
-        )
+    binary_sensors = (POWER, DOOR)
+    sensors = (FREEZER_TEMPERATURE,)
+    switches = (SUPER_MODE_FREEZER, ECO_MODE, SABBATH_MODE)
 
 
+@register("FridgeFreezer")
 class FridgeFreezer(Appliance):
     """FridgeFreezer."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "Refrigeration.FridgeFreezer.Setting.SetpointTemperatureFreezer", "description": "Freezer Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.FridgeFreezer.Setting.SetpointTemperatureRefrigerator", "description": "Refrigerator Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.Common.Setting.BottleCooler.SetpointTemperature", "description": "Bottle Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.Common.Setting.ChillerLeft.SetpointTemperature", "description": "Chiller Left Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.Common.Setting.ChillerCommon.SetpointTemperature", "description": "Chiller Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Refrigeration.Common.Setting.ChillerRight.SetpointTemperature", "description": "Chiller Right Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-            ]
-        )
-        self.switches.extend(
-            [
-                {"device": self, "key": "Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator", "description": "Super Mode Refrigerator"},
-                {"device": self, "key": "Refrigeration.FridgeFreezer.Setting.SuperModeFreezer", "description": "Super Mode Freezer"},
-                {"device": self, "key": "Refrigeration.Common.Setting.EcoMode", "description": "Eco Mode"},
-                {"device": self, "key": "Refrigeration.Common.Setting.SabbathMode", "description": "Sabbath Mode"},
-                {"device": self, "key": "Refrigeration.Common.Setting.VacationMode", "description": "Vacation Mode"},
-                {"device": self, "key": "Refrigeration.Common.Setting.FreshMode", "description": "Fresh Mode"},
-            ]
-        )
+    binary_sensors = (POWER, DOOR)
+    sensors = (FRIDGE_FREEZER_FREEZER_TEMPERATURE, FRIDGE_FREEZER_REFRIGERATOR_TEMPERATURE, FRIDGE_FREEZER_BOTTLE_TEMPERATURE, CHILLER_LEFT_TEMPERATURE, CHILLER_TEMPERATURE, CHILLER_RIGHT_TEMPERATURE)
+    switches = (SUPER_MODE_REFRIGERATOR, SUPER_MODE_FREEZER, ECO_MODE, SABBATH_MODE, VACATION_MODE, FRESH_MODE)
 
 
+@register("Oven")
 class Oven(Appliance):
     """Oven."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.RemoteControlStartAllowed", "description": "Remote Control", "device_class": None},
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.OperationState", "description": "Operation State", "unit": None, "icon": None, "device_class": "home_connect_operation"},
-                {"device": self, "key": "BSH.Common.Option.RemainingProgramTime", "description": "Remaining Time", "unit": TIME_SECONDS, "icon": "mdi:update", "device_class": None},
-                {"device": self, "key": "BSH.Common.Option.Duration", "description": "Duration", "unit": TIME_SECONDS, "icon": "mdi:update", "device_class": None},
-                {"device": self, "key": "BSH.Common.Option.ElapsedProgramTime", "description": "Elapsed Program Time", "unit": TIME_SECONDS, "icon": "mdi:update", "device_class": None},
-                {"device": self, "key": "BSH.Common.Option.ProgramProgress", "description": "Progress", "unit": PERCENTAGE, "icon": "mdi:progress-clock", "device_class": None},
-                {"device": self, "key": "BSH.Common.Root.SelectedProgram", "description": "Program", "unit": None, "icon": "mdi:format-list-bulleted", "device_class": "home_connect_oven_program"},
-                {"device": self, "key": "Cooking.Oven.Status.CurrentCavityTemperature", "description": "Current Cavity Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-                {"device": self, "key": "Cooking.Oven.Option.SetpointTemperature", "description": "Temperature", "unit": TEMP_CELSIUS, "icon": "mdi:thermometer", "device_class": None},
-            ]
-        )
-        self.switches.append({"device": self, "key": "BSH.Common.Start", "description": "Start"})
+    binary_sensors = (POWER, REMOTE_CONTROL, DOOR)
+    sensors = (OPERATION_STATE, REMAINING_TIME, DURATION, ELAPSED_TIME, PROGRESS, OVEN_PROGRAM, CAVITY_TEMPERATURE, OVEN_TEMPERATURE)
+    switches = (START,)
 
 
+@register("CoffeeMaker")
 class CoffeeMaker(Appliance):
     """Coffee Maker."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.RemoteControlStartAllowed", "description": "Remote Control", "device_class": None},
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.OperationState", "description": "Operation State", "unit": None, "icon": None, "device_class": "home_connect_operation"},
-                {"device": self, "key": "BSH.Common.Root.SelectedProgram", "description": "Program", "unit": None, "icon": "mdi:format-list-bulleted", "device_class": "home_connect_coffee_maker_program"},
-                {"device": self, "key": "ConsumerProducts.CoffeeMaker.Option.CoffeeTemperature", "description": "Temperature", "unit": None, "icon": "mdi:thermometer", "device_class": "home_connect_coffee_maker_temperature"},
-                {"device": self, "key": "ConsumerProducts.CoffeeMaker.Option.FillQuantity", "description": "Fill Quantity", "unit": VOLUME_MILLILITERS, "icon": "mdi:water-outline", "device_class": "None"},
-                {"device": self, "key": "ConsumerProducts.CoffeeMaker.Option.BeanAmount", "description": "Bean Amount", "unit": None, "icon": "mdi:scatter-plot", "device_class": "home_connect_coffee_maker_bean_amount"},
-            ]
-        )
-        self.switches.append({"device": self, "key": "BSH.Common.Start", "description": "Start"})
+    binary_sensors = (POWER, REMOTE_CONTROL, DOOR)
+    sensors = (OPERATION_STATE, COFFEE_MAKER_PROGRAM, COFFEE_TEMPERATURE, FILL_QUANTITY, BEAN_AMOUNT)
+    switches = (START,)
 
 
+@register("Hood")
 class Hood(Appliance):
     """Hood. / Dunstabzugshaube"""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.RemoteControlStartAllowed", "description": "Remote Control", "device_class": None},
-            ]
-        )
-        self.switches.append({"device": self, "key": "BSH.Common.Start", "description": "Start"})
-        self.lights.extend(
-            [
-                {"device": self, "key": "Cooking.Common.Setting.Lighting", "description": "Light"},
-                {"device": self, "key": "BSH.Common.Setting.AmbientLightEnabled", "description": "Ambient Light"},
-            ]
-        )
+    binary_sensors = (POWER, REMOTE_CONTROL)
+    switches = (START,)
+    lights = (LIGHTING, AMBIENT_LIGHT)
 
 
+@register("Hob")
 class Hob(Appliance):
     """Hob. / Herd"""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.OperationState", "description": "Operation State", "unit": None, "icon": None, "device_class": "home_connect_operation"},
-            ]
-        )
+    sensors = (OPERATION_STATE,)
 
 
 class WarmingDrawer(Appliance):
     """WarmingDrawer."""
 
-    def __init__(self, hass, appliance):
-        super().__init__(hass, appliance)
-        self.binary_sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.RemoteControlStartAllowed", "description": "Remote Control", "device_class": None},
-                {"device": self, "key": "BSH.Common.Status.DoorState", "description": "Door", "device_class": "door"},
-            ]
-        )
-        self.sensors.extend(
-            [
-                {"device": self, "key": "BSH.Common.Status.OperationState", "description": "Operation State", "unit": None, "icon": None, "device_class": "home_connect_operation"},
-            ]
-        )
-        self.switches.append({"device": self, "key": "BSH.Common.Start", "description": "Start"})
+    binary_sensors = (POWER, REMOTE_CONTROL, DOOR)
+    sensors = (OPERATION_STATE,)
+    switches = (START,)
@@ -0,0 +1,21 @@
+"""Diagnostics support for Home Connect."""
+
+from homeassistant.config_entries import ConfigEntry  # pylint: disable=import-error, no-name-in-module
+from homeassistant.core import HomeAssistant  # pylint: disable=import-error, no-name-in-module
+from .const import DOMAIN
+from .metrics import metrics
+from .tracing import tracer
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    """Return the metrics and the statistics of the appliances of a config entry."""
+    home_connect = hass.data[DOMAIN][entry.entry_id]
+    ha_ids = {device.appliance.haId for device in home_connect.devices}
+    return {
+        "account": {"requests_in_quota_window": home_connect.requests_in_quota_window(), "rate_limited": home_connect.rate_limited},
+        "appliances": {device.appliance.haId: {"name": device.appliance.name, "type": device.appliance.type, **device.diagnostics()} for device in home_connect.devices},
+        # metrics without an appliance label like token refreshes and request latencies are shared by all accounts
+        "metrics": [metric for metric in metrics.as_dict() if metric["labels"].get("appliance", "") in ha_ids or "appliance" not in metric["labels"]],
+        # latency breakdown of the sampled events in milliseconds, empty unless tracing is configured
+        "tracing": {"report": tracer.report(), "recent": [trace.as_dict() for trace in list(tracer.finished)[-20:]]},
+    }
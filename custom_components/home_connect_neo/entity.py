@@ -5,6 +5,8 @@ from homeassistant.core import callback  # pylint: disable=import-error, no-name
 from homeassistant.helpers.dispatcher import async_dispatcher_connect  # pylint: disable=import-error, no-name-in-module
 from homeassistant.helpers.entity import Entity  # pylint: disable=import-error, no-name-in-module
 from .const import DOMAIN, SIGNAL_UPDATE_ENTITIES
+from .metrics import metrics
+from .tracing import NULL_TRACE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,6 +19,10 @@ class HomeConnectEntity(Entity):
         self._device = device
         self._description = description
         self._name = f"{self._device.appliance.name} {self._description}"
+        # status keys which affect the state of the entity
+        self._watched_keys = frozenset()
+        # state writes caused by events
+        self._writes = metrics.counter("dispatch.entity_writes", appliance=device.appliance.haId)
 
     @property
     def name(self):
@@ -45,16 +51,38 @@ class HomeConnectEntity(Entity):
 
     async def async_added_to_hass(self):
         """Register callbacks."""
+        # the status keeps every key the state depends on
+        self._device.appliance.observed_keys.update(self._watched_keys)
         self.async_on_remove(async_dispatcher_connect(self.hass, SIGNAL_UPDATE_ENTITIES, self._update_callback))
 
     @callback
-    def _update_callback(self, ha_id):
-        """Update data."""
-        if ha_id == self._device.appliance.haId:
-            self.async_schedule_update_ha_state(True)
+    def _update_callback(self, ha_id, keys=None, trace=NULL_TRACE):
+        """Update data. Only entities watching one of the changed keys are written, all of them if keys is None."""
+        if ha_id != self._device.appliance.haId:
+            return
+        if keys is not None and self._watched_keys.isdisjoint(keys):
+            return
+        self.update_state()
+        if self.should_write(keys):
+            self._writes.inc()
+            self.async_write_ha_state()
+            trace.mark("written")
+
+    def should_write(self, keys):
+        """Return false to skip writing the state computed for the changed keys."""
+        return True
 
     @callback
     def async_entity_update(self):
         """Update the entity."""
         _LOGGER.debug("Entity update triggered on %s", self)
-        self.async_schedule_update_ha_state(True)
\ No newline at end of file
+        self.update_state()
+        self.async_write_ha_state()
+
+    async def async_update(self):
+        """Update the entity before it's added to Home Assistant."""
+        self.update_state()
+
+    def update_state(self):
+        """Compute the state from the status of the appliance. Must not block, it's called in the event loop.
+        The platform entities override it, the base entity has no state of its own."""
@@ -0,0 +1,72 @@
+"""Handoff of the events of the listener threads to the event loop."""
+
+import logging
+from threading import Condition
+from .metrics import metrics
+
+_LOGGER = logging.getLogger("homeconnect.handoff")
+
+# Events waiting for the event loop before the listener threads are slowed down
+HANDOFF_MAX_PENDING = 1000
+# Longest time a listener thread waits for the event loop to catch up
+HANDOFF_BLOCK_S = 1
+
+
+class EventHandoff:
+    """Collect the events of all listener threads and wake up the event loop once for all events received until it runs.
+    The changed keys of the events of a target are merged, so it's dispatched only once per loop iteration."""
+
+    def __init__(self, loop, max_pending: int = HANDOFF_MAX_PENDING, block_timeout: float = HANDOFF_BLOCK_S):
+        self._loop = loop
+        self.max_pending = max_pending
+        self.block_timeout = block_timeout
+        # target -> [merged keys or None for all keys, sampled traces, number of events]
+        self._pending = {}
+        self._events = 0
+        self._scheduled = False
+        self._condition = Condition()
+        self._submitted = metrics.counter("handoff.events")
+        self._wakeups = metrics.counter("handoff.wakeups")
+        self._backpressure = metrics.counter("handoff.backpressure")
+
+    def submit(self, target, keys=None, trace=None):
+        """Queue the changed keys of an event of `target`, None if all keys changed. Called from the listener threads.
+        If the event loop is too far behind, the caller is blocked up to `block_timeout` seconds."""
+        with self._condition:
+            if self._events >= self.max_pending:
+                self._backpressure.inc()
+                if not self._condition.wait_for(lambda: self._events < self.max_pending, self.block_timeout):
+                    _LOGGER.warning("Event loop is %d events behind", self._events)
+
+            entry = self._pending.get(target)
+            if entry is None:
+                entry = self._pending[target] = [set(keys) if keys is not None else None, [], 0]
+            elif entry[0] is not None:
+                if keys is None:
+                    entry[0] = None
+                else:
+                    entry[0].update(keys)
+            if trace:
+                entry[1].append(trace)
+            entry[2] += 1
+            self._events += 1
+            self._submitted.inc()
+
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._wakeups.inc()
+        self._loop.call_soon_threadsafe(self._drain)
+
+    def _drain(self):
+        """Dispatch the merged events of every target. Runs in the event loop."""
+        with self._condition:
+            pending, self._pending = self._pending, {}
+            self._events = 0
+            self._scheduled = False
+            self._condition.notify_all()
+        for target, (keys, traces, events) in pending.items():
+            try:
+                target.async_dispatch(keys, traces, events)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Failed dispatching the events of %s", target)
@@ -1,12 +1,22 @@
 """Home Connect API"""
 
+import heapq
+import itertools
 import json
 import logging
-from threading import Event, Thread
+import time
+from collections import deque
+from threading import Condition, Lock, Thread
+from time import monotonic
 from typing import Callable, Dict, Optional, Union
 from oauthlib.oauth2 import TokenExpiredError
 from requests import Response
+from requests.adapters import HTTPAdapter
 from requests_oauthlib import OAuth2Session
+from .metrics import metrics
+from .subscriptions import DROP_OLDEST, SUBSCRIPTION_QUEUE_SIZE, ChangeFeed
+from .timeseries import History
+from .tracing import tracer
 from .sseclient import SSEClient
 from .const import BASE_URL, ENDPOINT_APPLIANCES, ENDPOINT_TOKEN
 
@@ -14,54 +24,259 @@ _LOGGER = logging.getLogger("homeconnect")
 
 TIMEOUT_S = 120
 
+# The event stream is reconnected when no message was received within this time
+LIVENESS_TIMEOUT_S = 300
+
+# TCP keepalive of the event stream: probe after 30 s idle every 10 s and give up after 3 failed probes
+KEEPALIVE_IDLE_S = 30
+KEEPALIVE_INTERVAL_S = 10
+KEEPALIVE_COUNT = 3
+
+# The read deadline of the event stream is this factor times the observed KEEP-ALIVE interval, but at least READ_DEADLINE_MIN_S
+READ_DEADLINE_FACTOR = 1.5
+READ_DEADLINE_MIN_S = 30
+
+# Errors which mean that an appliance will never support an endpoint until its firmware or connection changes
+UNSUPPORTED_ERRORS = {"SDK.Error.UnsupportedOption", "SDK.Error.UnsupportedSetting", "SDK.Error.UnsupportedStatus", "SDK.Error.UnsupportedProgram", "SDK.Error.UnsupportedCommand", "SDK.Error.UnsupportedOperation"}
+# Endpoints of the active and the selected program, what they support changes with the program and is never remembered
+PROGRAM_ENDPOINTS = ("/programs/active", "/programs/selected")
+
+# Program times which are interpolated while a program is running and the direction they are counting
+INTERPOLATED_KEYS = {"BSH.Common.Option.RemainingProgramTime": -1, "BSH.Common.Option.ElapsedProgramTime": 1}
+
+# Maximum age of the cached programs and option constraints of an appliance
+CATALOG_MAX_AGE_S = 24 * 60 * 60
+
+# Connections to the Home Connect cloud kept open for the requests and event streams of all accounts
+POOL_SIZE = 64
+
+# Home Connect limits the requests of an account per day
+QUOTA_WINDOW_S = 24 * 60 * 60
+
+# Transient events like BSH.Common.Event.ProgramFinished are dropped from the status after this time or when they are cleared
+EVENT_TTL_S = 60 * 60
+CLEARED_EVENT_STATES = {"BSH.Common.EnumType.EventPresentState.Off", "BSH.Common.EnumType.EventPresentState.Confirmed"}
+
+# Maximum number of keys in the status of an appliance. Events are evicted first, then the least recently updated keys
+STATUS_MAX_KEYS = 512
+
+# Samples kept of every numeric value and number of values with a history per appliance, 64 kB at most
+HISTORY_SIZE = 128
+HISTORY_MAX_KEYS = 32
+
+
+def is_event_key(key):
+    """Return true if `key` is a transient event like BSH.Common.Event.ProgramFinished or an alarm."""
+    return ".Event." in key
+
+
+class LivenessScheduler:
+    """Track the liveness deadlines of all event streams in a single thread. Resetting a deadline is O(1), the heap is corrected lazily when an outdated deadline is due."""
+
+    def __init__(self):
+        self._deadlines = {}
+        self._heap = []
+        self._sequence = 0
+        self._condition = Condition()
+        self._thread = None
+
+    def schedule(self, key, timeout, callback):
+        """Start watching `key` and call `callback` if it's not reset within `timeout` seconds."""
+        with self._condition:
+            self._sequence += 1
+            entry = [monotonic() + timeout, timeout, callback, self._sequence]
+            self._deadlines[key] = entry
+            heapq.heappush(self._heap, (entry[0], self._sequence, key))
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="homeconnect-liveness", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def reset(self, key):
+        """Move the deadline of `key`, e.g. when a KEEP-ALIVE was received."""
+        entry = self._deadlines.get(key)
+        if entry is not None:
+            entry[0] = monotonic() + entry[1]
+
+    def cancel(self, key):
+        """Stop watching `key`."""
+        with self._condition:
+            self._deadlines.pop(key, None)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                deadline, sequence, key = self._heap[0]
+                entry = self._deadlines.get(key)
+                # the key was cancelled or scheduled again
+                if entry is None or entry[3] != sequence:
+                    heapq.heappop(self._heap)
+                    continue
+                # the deadline was reset in the meantime
+                if entry[0] > deadline:
+                    heapq.heapreplace(self._heap, (entry[0], sequence, key))
+                    continue
+                remaining = deadline - monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+                del self._deadlines[key]
+                callback = entry[2]
 
-class watch_dog_timer:
-    def __init__(self, time, callback):
-        self.callback = callback
-        self.time = time
-        self.reset_event = Event()
-        self.resume_event = Event()
-        self.stopped_event = Event()
-        self.pause_flag = False
-        self.stop_flag = False
-        self.start()
+            try:
+                callback()
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Liveness callback of %s failed. %s", key, err)
 
-    def __del__(self):
-        self.stop()
 
-    def start(self):
-        Thread(target=self.checker).start()
+# One scheduler for the event streams of all appliances of all accounts
+liveness_scheduler = LivenessScheduler()
 
-    def stop(self):
-        self.stop_flag = True
-        self.reset_event.set()
-        self.stopped_event.wait()
-
-    def reset(self):
-        self.reset_event.set()
-
-    def pause(self):
-        self.pause_flag = True
-        self.reset_event.set()
-
-    def resume(self):
-        self.pause_flag = False
-        self.resume_event.set()
-
-    def checker(self):
-        while not self.stop_flag:
-            if self.pause_flag:
-                self.resume_event.wait()
-                self.resume_event.clear()
-            if self.reset_event.wait(self.time):
-                self.reset_event.clear()
-            else:
-                self.callback()
-        self.stopped_event.set()
+# One connection pool for all accounts. Each account keeps its own session with its own token.
+shared_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+
+
+def endpoint_labels(path):
+    """Return the haId and the endpoint without haId and keys of a request path, e.g. (haId, "/api/homeappliances/{haId}/programs/selected")."""
+    parts = path.split("/")
+    if "homeappliances" not in parts:
+        return "", path
+    index = parts.index("homeappliances")
+    if len(parts) <= index + 1:
+        return "", path
+    # keep the resource, but not the keys of settings, status values, options and commands
+    resource = parts[index + 2 : index + 4]
+    if resource and resource[0] != "programs":
+        resource = resource[:1]
+    elif len(resource) > 1 and resource[1] not in ("available", "active", "selected"):
+        resource = resource[:1]
+    return parts[index + 1], "/".join(parts[: index + 1] + ["{haId}"] + resource)
 
 
 class HomeConnectError(Exception):
-    pass
+    @property
+    def key(self):
+        """Return the error key sent by Home Connect, e.g. SDK.Error.UnsupportedOption."""
+        if self.args and isinstance(self.args[0], dict):
+            return self.args[0].get("key")
+        return None
+
+
+class ProgramCatalog:
+    """Local catalog of the available programs and option constraints of an appliance to reject invalid commands before sending them."""
+
+    def __init__(self, appliance, max_age=CATALOG_MAX_AGE_S):
+        self.appliance = appliance
+        self.max_age = max_age
+        self.programs = None
+        self.programs_updated = 0
+        self.options = {}
+        self.on_change = None
+        # the catalog is updated by the executor threads and saved by the event loop
+        self._lock = Lock()
+
+    def load(self, data):
+        """Restore the catalog from persisted data."""
+        if not data:
+            return
+        with self._lock:
+            self.programs = set(data["programs"]) if data.get("programs") is not None else None
+            self.programs_updated = data.get("programs_updated", 0)
+            self.options = dict(data.get("options", {}))
+
+    def as_dict(self):
+        """Return a copy of the catalog as JSON serializable dictionary."""
+        with self._lock:
+            return {"programs": sorted(self.programs) if self.programs is not None else None, "programs_updated": self.programs_updated, "options": dict(self.options)}
+
+    def invalidate(self):
+        """Force a refresh on the next validation, e.g. after a firmware update."""
+        with self._lock:
+            self.programs_updated = 0
+            self.options = {}
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def _expired(self, updated):
+        return time.time() - updated > self.max_age
+
+    def get_programs(self, refresh=False):
+        """Return the keys of the available programs and refresh them if they are outdated or `refresh` is true."""
+        if refresh or self.programs is None or self._expired(self.programs_updated):
+            try:
+                programs = self.appliance.get_programs_available()
+            except (HomeConnectError, ValueError) as err:
+                _LOGGER.debug("Unable to fetch available programs. %s", err)
+                return self.programs
+            # An appliance which is switched off reports no programs at all. Keep the last known programs.
+            if programs:
+                with self._lock:
+                    self.programs = set(programs)
+                    self.programs_updated = time.time()
+                self._changed()
+        return self.programs
+
+    def get_options(self, program_key):
+        """Return the option constraints of a program and refresh them if they are outdated."""
+        entry = self.options.get(program_key)
+        if entry is None or self._expired(entry["updated"]):
+            try:
+                options = {}
+                for option in self.appliance.get_programs_available_with_key(program_key):
+                    for key, value in option.items():
+                        options[key] = value.get("constraints", {})
+            except (HomeConnectError, ValueError) as err:
+                _LOGGER.debug("Unable to fetch options of program %s. %s", program_key, err)
+                return entry["options"] if entry is not None else None
+            if options:
+                entry = {"updated": time.time(), "options": options}
+                with self._lock:
+                    self.options[program_key] = entry
+                self._changed()
+        return entry["options"] if entry is not None else None
+
+    def validate_program(self, program_key, options=None):
+        """Raise `HomeConnectError` if the program or one of its options is not supported."""
+        programs = self.get_programs()
+        if programs and program_key not in programs:
+            # the available programs depend on the state of the appliance, e.g. the door or the mode
+            programs = self.get_programs(refresh=True)
+            if programs and program_key not in programs:
+                raise HomeConnectError(f"Program {program_key} is not available")
+        for option in options or []:
+            self.validate_option(program_key, option["key"], option["value"])
+
+    def validate_option(self, program_key, option_key, value):
+        """Raise `HomeConnectError` if the value of the option violates the constraints of the program."""
+        if program_key is None:
+            return
+        options = self.get_options(program_key)
+        if not options:
+            return
+        if option_key not in options:
+            raise HomeConnectError(f"Option {option_key} is not supported by program {program_key}")
+
+        constraints = options[option_key]
+        allowed_values = constraints.get("allowedvalues")
+        if allowed_values is not None and value not in allowed_values:
+            raise HomeConnectError(f"Value {value} of option {option_key} is not one of {allowed_values}")
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            minimum = constraints.get("min")
+            maximum = constraints.get("max")
+            if minimum is not None and value < minimum:
+                raise HomeConnectError(f"Value {value} of option {option_key} is below minimum {minimum}")
+            if maximum is not None and value > maximum:
+                raise HomeConnectError(f"Value {value} of option {option_key} is above maximum {maximum}")
+            stepsize = constraints.get("stepsize")
+            if stepsize:
+                steps = (value - (minimum or 0)) / stepsize
+                if abs(steps - round(steps)) > 1e-6:
+                    raise HomeConnectError(f"Value {value} of option {option_key} does not match step size {stepsize}")
 
 
 class HomeConnectAPI:
@@ -75,6 +290,12 @@ class HomeConnectAPI:
         extra = {"client_id": self.client_id, "client_secret": self.client_secret}
 
         self._oauth = OAuth2Session(client_id=client_id, redirect_uri=redirect_uri, auto_refresh_kwargs=extra, token=token, token_updater=token_updater)
+        self._oauth.mount("https://", shared_adapter)
+        self._oauth.mount("http://", shared_adapter)
+
+        # Times of the requests of this account within the quota window
+        self._quota_window = deque()
+        self.rate_limited = 0
 
     def refresh_tokens(self) -> Dict[str, Union[str, int]]:
         """Refresh and return new tokens."""
@@ -92,13 +313,34 @@ class HomeConnectAPI:
 
         url = f"{self.host}{path}"
         try:
-            return getattr(self._oauth, method)(url, **kwargs)
+            return self._timed_request(method, path, url, **kwargs)
 
         except TokenExpiredError:
             _LOGGER.info("Token expired.")
+            metrics.counter("api.token_refreshes").inc()
             self._oauth.token = self.refresh_tokens()
 
-            return getattr(self._oauth, method)(url, **kwargs)
+            return self._timed_request(method, path, url, **kwargs)
+
+    def _timed_request(self, method, path, url, **kwargs):
+        """Send a request and record its latency and status per endpoint."""
+        ha_id, endpoint = endpoint_labels(path)
+        start = monotonic()
+        res = getattr(self._oauth, method)(url, **kwargs)
+        metrics.histogram("api.latency", method=method, endpoint=endpoint).observe(monotonic() - start)
+        metrics.counter("api.requests", appliance=ha_id, method=method, endpoint=endpoint, status=res.status_code).inc()
+        self._quota_window.append(start)
+        self.requests_in_quota_window()
+        if res.status_code == 429:
+            self.rate_limited += 1
+        return res
+
+    def requests_in_quota_window(self):
+        """Return the number of requests of this account within the last quota window."""
+        expired = monotonic() - QUOTA_WINDOW_S
+        while self._quota_window and self._quota_window[0] < expired:
+            self._quota_window.popleft()
+        return len(self._quota_window)
 
     def get(self, endpoint):
         """Get data as dictionary from an endpoint."""
@@ -172,7 +414,7 @@ class HomeConnectAppliance:
         self.enumber = enumber or ""
         self.is_connected = connected
 
-        # Create and initialize messages, events and variables
+        # Create and initialize messages, events and variables. Keys which only some models support are not seeded, their entities are created when they appear.
         self.status = {}
         self.status["BSH.Common.Status.DoorState"] = {"value": None}
         self.status["BSH.Common.Status.RemoteControlStartAllowed"] = {"value": None}
@@ -193,22 +435,56 @@ class HomeConnectAppliance:
         self.status["Cooking.Common.Setting.LightingBrightness"] = {"value": None}
         self.status["Cooking.Oven.Status.CurrentCavityTemperature"] = {"value": None}
         self.status["Cooking.Oven.Option.SetpointTemperature"] = {"value": None}
-        self.status["Refrigeration.Common.Setting.EcoMode"] = {"value": None}
-        self.status["Refrigeration.Common.Setting.SabbathMode"] = {"value": None}
-        self.status["Refrigeration.Common.Setting.VacationMode"] = {"value": None}
-        self.status["Refrigeration.Common.Setting.FreshMode"] = {"value": None}
-        self.status["Refrigeration.Common.Setting.BottleCooler.SetpointTemperature"] = {"value": 0}
-        self.status["Refrigeration.Common.Setting.ChillerLeft.SetpointTemperature"] = {"value": 0}
-        self.status["Refrigeration.Common.Setting.ChillerCommon.SetpointTemperature"] = {"value": 0}
-        self.status["Refrigeration.Common.Setting.ChillerRight.SetpointTemperature"] = {"value": 0}
         self.status["Refrigeration.FridgeFreezer.Setting.SetpointTemperatureFreezer"] = {"value": 0}
         self.status["Refrigeration.FridgeFreezer.Setting.SetpointTemperatureRefrigerator"] = {"value": 0}
-        self.status["Refrigeration.FridgeFreezer.Setting.SuperModeFreezer"] = {"value": None}
-        self.status["Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator"] = {"value": None}
 
-        # Setup a watchdog and check every 5 minutes for a valid connection
-        self.wdt = watch_dog_timer(300.0, self._observer)
-        self.wdt.pause()
+        # The seeded keys and the keys shown by entities are never evicted, transient events expire. Retention can be changed until the first event
+        self._seeded = frozenset(self.status)
+        self.observed_keys = set()
+        self._event_times = {}
+        self.event_ttl = EVENT_TTL_S
+        self.max_status_keys = STATUS_MAX_KEYS
+
+        # Detection of a dead event stream. Changes take effect with the next connection
+        self.keepalive = (KEEPALIVE_IDLE_S, KEEPALIVE_INTERVAL_S, KEEPALIVE_COUNT)
+        self.read_deadline_factor = READ_DEADLINE_FACTOR
+        self.read_deadline_min = READ_DEADLINE_MIN_S
+        self.liveness_timeout = LIVENESS_TIMEOUT_S
+
+        # Available programs and option constraints to validate commands locally
+        self.catalog = ProgramCatalog(self)
+
+        # Endpoints which are probed to be supported or unsupported by this appliance
+        self.supported = set()
+        self.unsupported = {}
+        self.skipped_requests = 0
+
+        # Event stream which is watched by the liveness scheduler
+        self._sse = None
+        self._resync_pending = False
+
+        # Threads of the event listener and the resynchronizations, stopped by stop() and joined by join()
+        self._listener = None
+        self._resync_threads = set()
+        self._stopped = False
+
+        # Every applied event gets a sequence number to merge events and concurrently fetched values in the right order
+        self._status_lock = Lock()
+        self._sequence = 0
+        self._key_sequence = {}
+        self._stale_since = 0
+        self._resync_running = False
+        self._resync_again = False
+
+        # Subscriptions to the changes of keys matching a pattern
+        self.changes = ChangeFeed(self.haId)
+
+        # Recent samples of the numeric values, e.g. for trends without querying the recorder
+        self.history = History(HISTORY_SIZE, HISTORY_MAX_KEYS)
+
+        # Last authoritative program times with the monotonic time they were received
+        self._anchors = {}
+        self._running = False
 
     def __repr__(self):
         return "HomeConnectAppliance(hc, haId='{}', vib='{}', brand='{}', type='{}', name='{}', enumber='{}', connected={})".format(self.haId, self.vib, self.brand, self.type, self.name, self.enumber, self.is_connected)
@@ -218,8 +494,8 @@ class HomeConnectAppliance:
         """Turn a list of dictionaries where one key is called 'key' into a dictionary with the value of 'key' as key."""
         return {d.pop("key"): d for d in lst}
 
-    def update_properties(self):
-        """Updates the status, settingds, programs, etc. of appliance."""
+    def update_properties(self, since=None):
+        """Updates the status, settingds, programs, etc. of appliance. With `since` only the program values which have not been received by an event after this sequence number are fetched."""
 
         # if there is an established connection, further requests can be retrieved
         if self.is_connected:
@@ -236,129 +512,321 @@ class HomeConnectAppliance:
             except (HomeConnectError, ValueError) as err:  # pylint: disable=unused-variable
                 _LOGGER.debug("Unable to fetch appliance settings. %s", err)
 
-            if self.type in ["Washer", "Dryer", "WasherDryer"]:
+            if self.type in ["Washer", "Dryer", "WasherDryer"] and not self._received_since("BSH.Common.Root.SelectedProgram", since):
                 # Get selected program
                 try:
+                    start = self._sequence
                     selected_program = self.get_programs_selected()
-                    self.status["BSH.Common.Root.SelectedProgram"] = {"value": selected_program.get("key")}
+                    self._merge({"BSH.Common.Root.SelectedProgram": {"value": selected_program.get("key")}}, start)
                 except (HomeConnectError, ValueError) as err:  # pylint: disable=unused-variable
                     _LOGGER.debug("Unable to fetch selected program. %s", err)
 
             if self.type in ["Washer", "WasherDryer"]:
-                # Get temperature from selected program
-                try:
-                    temperature = self.get_programs_selected_options_with_key("LaundryCare.Washer.Option.Temperature")["value"]
-                    self.status["LaundryCare.Washer.Option.Temperature"] = {"value": temperature}
-                except (HomeConnectError, ValueError) as err:  # pylint: disable=unused-variable
-                    _LOGGER.debug("Unable to fetch selected program. %s", err)
-                # Get spin speed from selected program
-                try:
-                    spin_speed = self.get_programs_selected_options_with_key("LaundryCare.Washer.Option.SpinSpeed")["value"]
-                    self.status["LaundryCare.Washer.Option.SpinSpeed"] = {"value": spin_speed}
-                except (HomeConnectError, ValueError) as err:  # pylint: disable=unused-variable
-                    _LOGGER.debug("Unable to fetch selected program. %s", err)
+                # Get temperature and spin speed from selected program
+                self._update_selected_option("LaundryCare.Washer.Option.Temperature", since)
+                self._update_selected_option("LaundryCare.Washer.Option.SpinSpeed", since)
 
             if self.type in ["Dryer", "WasherDryer"]:
                 # Get selected drying target
-                try:
-                    drying_target = self.get_programs_selected_options_with_key("LaundryCare.Dryer.Option.DryingTarget")["value"]
-                    self.status["LaundryCare.Dryer.Option.DryingTarget"] = {"value": drying_target}
-                except (HomeConnectError, ValueError) as err:  # pylint: disable=unused-variable
-                    _LOGGER.debug("Unable to fetch drying target. %s", err)
+                self._update_selected_option("LaundryCare.Dryer.Option.DryingTarget", since)
 
-            # Watchdog counter resume because there is a valid connection
-            self.wdt.resume()
+    def _update_selected_option(self, option_key, since=None):
+        """Fetch an option of the selected program unless an event has already delivered it."""
+        if self._received_since(option_key, since):
+            return
+        try:
+            start = self._sequence
+            value = self.get_programs_selected_options_with_key(option_key)["value"]
+            self._merge({option_key: {"value": value}}, start)
+        except (HomeConnectError, ValueError) as err:  # pylint: disable=unused-variable
+            _LOGGER.debug("Unable to fetch option %s of selected program. %s", option_key, err)
+
+    def _received_since(self, key, since):
+        """Return true if an event updated `key` after the sequence number `since`."""
+        return since is not None and self._key_sequence.get(key, 0) > since
+
+    def _apply_event(self, d):
+        """Store the items of an event. Events always win over values fetched before."""
+        with self._status_lock:
+            self._sequence += 1
+            for key in d:
+                self._key_sequence[key] = self._sequence
+            self.status.update(d)
+            self._update_anchors(d)
+            self._retain(d)
+        self.history.record(d)
+        self.changes.publish(d)
+
+    def _merge(self, d, start):
+        """Store values fetched by a request started at sequence number `start`, but keep values from events received in the meantime."""
+        with self._status_lock:
+            applied = {key: value for key, value in d.items() if self._key_sequence.get(key, 0) <= start}
+            self.status.update(applied)
+            self._update_anchors(applied)
+            self._retain(applied)
+        self.history.record(applied)
+        self.changes.publish(applied)
+
+    def _retain(self, d):
+        """Expire and clear transient events and keep the status within its capacity. Called with the status lock held."""
+        now = monotonic()
+        for key, item in d.items():
+            if not is_event_key(key):
+                continue
+            # move the event to the end of the expiry order
+            self._event_times.pop(key, None)
+            if item.get("value") in CLEARED_EVENT_STATES:
+                self._evict(key, "cleared")
+            else:
+                self._event_times[key] = now
+
+        # the events are ordered by the time they have been received
+        expired = now - self.event_ttl
+        for key, received in list(self._event_times.items()):
+            if received > expired:
+                break
+            self._evict(key, "expired")
+
+        # the oldest events first, then the least recently updated keys without an entity
+        excess = len(self.status) - self.max_status_keys
+        if excess > 0:
+            victims = list(itertools.islice((key for key in self._event_times if key not in self.observed_keys), excess))
+            if len(victims) < excess:
+                candidates = (key for key in self.status if key not in self._seeded and key not in self.observed_keys and key not in self._event_times)
+                victims += heapq.nsmallest(excess - len(victims), candidates, key=lambda key: self._key_sequence.get(key, 0))
+            for key in victims:
+                self._evict(key, "capacity")
+
+    def _evict(self, key, reason):
+        """Remove a key from the status."""
+        self.status.pop(key, None)
+        self._event_times.pop(key, None)
+        self._key_sequence.pop(key, None)
+        metrics.counter("status.evictions", appliance=self.haId, reason=reason).inc()
+
+    def _update_anchors(self, d):
+        """Take authoritative program times and operation state as new base of the interpolation."""
+        now = monotonic()
+        if "BSH.Common.Status.OperationState" in d:
+            self._set_running(d["BSH.Common.Status.OperationState"].get("value") == "BSH.Common.EnumType.OperationState.Run" and self.is_connected, now)
+        for key in INTERPOLATED_KEYS:
+            value = d.get(key, {}).get("value")
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self._anchors[key] = (value, now)
+
+    def _set_running(self, running, now=None):
+        """Start or stop the interpolation. Stopping freezes the interpolated values."""
+        if running == self._running:
+            return
+        now = now if now is not None else monotonic()
+        self._anchors = {key: (self._extrapolate(key, now), now) for key in self._anchors}
+        self._running = running
+
+    def _extrapolate(self, key, now):
+        """Return the value of a program time at monotonic time `now`."""
+        value, anchored = self._anchors[key]
+        if not self._running:
+            return value
+        return max(0, value + INTERPOLATED_KEYS[key] * (now - anchored))
+
+    @property
+    def is_interpolating(self):
+        """Return true if program times are interpolated, i.e. a program is running."""
+        return self._running
+
+    def interpolated_value(self, key):
+        """Return the value of a program time extrapolated from the last received value while a program is running."""
+        if key not in self._anchors:
+            return self.status.get(key, {}).get("value")
+        return round(self._extrapolate(key, monotonic()))
+
+    def _request_resync(self, callback=None):
+        """Fetch the state which might be stale in a worker thread, so the event stream is read on meanwhile."""
+        with self._status_lock:
+            if self._stopped:
+                return
+            if self._resync_running:
+                self._resync_again = True
+                return
+            self._resync_running = True
+            # a worker which has ended is not joined any more
+            self._resync_threads = {thread for thread in self._resync_threads if thread.is_alive()}
+            thread = Thread(target=self._resync, args=(callback,), name=f"homeconnect-resync-{self.haId}", daemon=True)
+            self._resync_threads.add(thread)
+        thread.start()
+
+    def _resync(self, callback=None):
+        """Worker function for resynchronization."""
+        while True:
+            if self._stopped:
+                with self._status_lock:
+                    self._resync_running = False
+                return
+            since = self._stale_since
+            try:
+                self.update_properties(since)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Resynchronization of %s failed. %s", self.name, err)
+            if callback is not None and not self._stopped:
+                callback(self)
+            with self._status_lock:
+                if not self._resync_again:
+                    self._resync_running = False
+                    return
+                self._resync_again = False
+
+    def _create_sse(self):
+        """Connect to the event stream of the appliance."""
+        uri = f"{self.hc.host}/api/homeappliances/{self.haId}/events"
+        return SSEClient(uri, session=self.hc._oauth, retry=1000, keepalive=self.keepalive, cadence_event="KEEP-ALIVE", deadline_factor=self.read_deadline_factor, min_deadline=self.read_deadline_min, metric_labels={"appliance": self.haId}, timeout=TIMEOUT_S)
 
     def listen_events(self, callback=None):
-        """Spawn a thread with an event listener that updates the status."""
-        uri = f"{self.hc.host}/api/homeappliances/{self.haId}/events"
-        sse = SSEClient(uri, session=self.hc._oauth, retry=1000, timeout=TIMEOUT_S)
-        Thread(target=self._listen, args=(sse, callback)).start()
+        """Spawn a thread with an event listener that updates the status. The callback gets the appliance, the set of changed keys or None if anything might have changed and the trace of the event."""
+        self._stopped = False
+        self._sse = self._create_sse()
+        self._listener = Thread(target=self._listen, args=(self._sse, callback), name=f"homeconnect-{self.haId}", daemon=True)
+        self._listener.start()
+
+    def subscribe(self, pattern, maxsize=SUBSCRIPTION_QUEUE_SIZE, overflow=DROP_OLDEST):
+        """Return an async iterator of the changes of the keys matching `pattern`, e.g. Refrigeration.*. Call it on the event loop."""
+        return self.changes.subscribe(pattern, maxsize, overflow)
+
+    def stop(self):
+        """Stop listening to events. Returns immediately, join() waits for the threads to end."""
+        with self._status_lock:
+            # no resynchronization is started afterwards
+            self._stopped = True
+        liveness_scheduler.cancel(self)
+        self.changes.close()
+        if self._sse is not None:
+            self._sse.close()
+
+    def join(self, timeout=None):
+        """Wait up to `timeout` seconds for the threads to end after stop(). Return true if they have ended."""
+        deadline = None if timeout is None else monotonic() + timeout
+        threads = self.threads()
+        for thread in threads:
+            thread.join(None if deadline is None else max(0, deadline - monotonic()))
+        return not any(thread.is_alive() for thread in threads)
+
+    def threads(self):
+        """Return the threads of the event listener and the resynchronizations which are still running."""
+        with self._status_lock:
+            threads = [self._listener, *self._resync_threads]
+        return [thread for thread in threads if thread is not None and thread.is_alive()]
 
     def _listen(self, sse, callback=None):
         """Worker function for listener."""
 
         _LOGGER.debug("Listening to event stream for device %s", self.name)
 
+        # Every message of the stream proves that the connection is alive
+        self._sse = sse
+        liveness_scheduler.schedule(self, self.liveness_timeout, self._observer)
+
         try:
             for event in sse:
+                if self._stopped:
+                    break
+
+                # Dummy messages are sent when the server connection breaks
+                if event.event != "message":
+                    liveness_scheduler.reset(self)
+                    metrics.counter("stream.events", appliance=self.haId, event=event.event).inc()
+
+                # The stream has been reconnected after a lost connection. Fetch what has been missed.
+                if self._resync_pending:
+                    self._resync_pending = False
+                    self._request_resync(callback)
+
                 if event.event == "NOTIFY":  # e.g. Progress update
                     _LOGGER.debug("Handle event: %s", event.event)
+                    trace = tracer.start(event.event, sse.received_at, appliance=self.haId)
                     # set home connect applieance to connected
                     self.is_connected = True
                     # load event data
                     event = json.loads(event.data)
                     # convert mqtt message to dictinary
                     d = self.json2dict(event["items"])
+                    self._trace_parsed(trace, d)
                     # store and update all messages of this appliance in status to get access from home assistance entities
-                    self.status.update(d)
-                    # call callback function from home assistance home connect devices class
+                    self._apply_event(d)
+                    trace.mark("applied")
+                    # call callback function from home assistance home connect devices class with the changed keys
                     if callback is not None:
-                        callback(self)
-                    # Watchdog counter reset
-                    self.wdt.reset()
+                        callback(self, set(d), trace)
 
                 elif event.event == "STATUS":  # e.g. Program selection
                     _LOGGER.debug("Handle event: %s", event.event)
+                    trace = tracer.start(event.event, sse.received_at, appliance=self.haId)
                     # set home connect applieance to connected
                     self.is_connected = True
                     # load event data
                     event = json.loads(event.data)
                     # convert mqtt message to dictinary
                     d = self.json2dict(event["items"])
+                    self._trace_parsed(trace, d)
                     # store and update all messages of this appliance in status to get access from home assistance entities
-                    self.status.update(d)
-                    # call callback function from home assistance home connect devices class
+                    self._apply_event(d)
+                    trace.mark("applied")
+                    # call callback function from home assistance home connect devices class with the changed keys
                     if callback is not None:
-                        callback(self)
-                    # Watchdog counter reset
-                    self.wdt.reset()
+                        callback(self, set(d), trace)
 
                 elif event.event == "EVENT":  # e.g. Program finished
                     _LOGGER.debug("Handle event: %s", event.event)
+                    trace = tracer.start(event.event, sse.received_at, appliance=self.haId)
                     # set home connect applieance to connected
                     self.is_connected = True
                     # load event data
                     event = json.loads(event.data)
                     # convert mqtt message to dictinary
                     d = self.json2dict(event["items"])
+                    self._trace_parsed(trace, d)
                     # store and update all messages of this appliance in status to get access from home assistance entities
-                    self.status.update(d)
+                    self._apply_event(d)
+                    trace.mark("applied")
                     # when program is finished set ProgramProgress to 100% and RemainingProgramTime to 0s
                     if "BSH.Common.Event.ProgramFinished" in d and d.get("BSH.Common.Event.ProgramFinished")["value"] == "BSH.Common.EnumType.EventPresentState.Present":
-                        self.status.get("BSH.Common.Option.ProgramProgress")["value"] = 100
-                        self.status.get("BSH.Common.Option.RemainingProgramTime")["value"] = 0
-                    # call callback function from home assistance home connect devices class
+                        self._apply_event({"BSH.Common.Option.ProgramProgress": {**self.status.get("BSH.Common.Option.ProgramProgress"), "value": 100}, "BSH.Common.Option.RemainingProgramTime": {**self.status.get("BSH.Common.Option.RemainingProgramTime"), "value": 0}})
+                        d = {**d, "BSH.Common.Option.ProgramProgress": None, "BSH.Common.Option.RemainingProgramTime": None}
+                    # call callback function from home assistance home connect devices class with the changed keys
                     if callback is not None:
-                        callback(self)
-                    # Watchdog counter reset
-                    self.wdt.reset()
+                        callback(self, set(d), trace)
 
                 elif event.event == "CONNECTED":
                     _LOGGER.debug("Handle event: %s", event.event)
                     # set home connect applieance to connected
                     self.is_connected = True
-                    # update aplienace properties like Seleced Program, Spin speed, etc.
-                    self.update_properties()
+                    # the firmware might have been updated while the appliance was offline
+                    self.reset_capabilities()
+                    # continue interpolating until the resync tells otherwise
+                    with self._status_lock:
+                        self._set_running(self.status["BSH.Common.Status.OperationState"].get("value") == "BSH.Common.EnumType.OperationState.Run")
+                    # update aplienace properties like Seleced Program, Spin speed, etc. without blocking the event stream
+                    self._request_resync(callback)
                     # call callback function from home assistance home connect devices class
                     if callback is not None:
                         callback(self)
-                    # Watchdog counter resume because there is a valid connection
-                    self.wdt.resume()
 
                 elif event.event == "DISCONNECTED":
                     _LOGGER.debug("Handle event: %s", event.event)
                     # set home connect applieance to disconnected
                     self.is_connected = False
+                    # program times of a disconnected appliance are unknown, stop interpolating them
+                    with self._status_lock:
+                        self._set_running(False)
+                    # everything after this event might be missed
+                    self._stale_since = self._sequence
                     # call callback function from home assistance home connect devices class
                     if callback is not None:
                         callback(self)
-                    # Watchdog pause
-                    self.wdt.pause()
 
                 elif event.event == "KEEP-ALIVE":
-                    # Watchdog counter reset
-                    self.wdt.reset()
+                    # The liveness deadline has already been reset, events of an idle appliance expire here
+                    if self._event_times:
+                        with self._status_lock:
+                            self._retain({})
 
                 elif event.event == "message":
                     # if a server connection breaks, a dummy messages will be sent. Ignore it.
@@ -368,22 +836,60 @@ class HomeConnectAppliance:
 
         except TokenExpiredError as err:  # pylint: disable=unused-variable
             _LOGGER.info("Token expired in event stream.")
+            metrics.counter("api.token_refreshes").inc()
 
+            if self._stopped:
+                return
             self.hc._oauth.token = self.hc.refresh_tokens()
-            uri = f"{self.hc.host}/api/homeappliances/{self.haId}/events"
-            sse = SSEClient(uri, session=self.hc._oauth, retry=1000, timeout=TIMEOUT_S)
+            sse = self._create_sse()
             self._listen(sse, callback=callback)
 
         except Exception as err:
-            _LOGGER.error("Unhandled exception occured. %s", err)
+            if not self._stopped:
+                _LOGGER.error("Unhandled exception occured. %s", err)
+            liveness_scheduler.cancel(self)
+
+        _LOGGER.debug("Stopped listening to event stream for device %s", self.name)
+
+    @staticmethod
+    def _trace_parsed(trace, d):
+        """Mark a traced event as parsed and record how long before it has been reported by the appliance."""
+        trace.mark("parsed")
+        if trace:
+            timestamps = [item["timestamp"] for item in d.values() if isinstance(item.get("timestamp"), (int, float))]
+            if timestamps:
+                trace.set("cloud", round(time.time() - max(timestamps), 3))
 
     def _observer(self):
         """Recover the connection when it's lost."""
-        _LOGGER.info("Server connection lost")
+        _LOGGER.info("Server connection lost. Reconnecting event stream of %s", self.name)
+        self._resync_pending = True
+        self._stale_since = self._sequence
+        liveness_scheduler.schedule(self, self.liveness_timeout, self._observer)
+        if self._sse is not None:
+            self._sse.reconnect()
 
     def get(self, endpoint):
-        """Get data (as dictionary) from an endpoint."""
-        return self.hc.get("{}/{}{}".format(ENDPOINT_APPLIANCES, self.haId, endpoint))
+        """Get data (as dictionary) from an endpoint. Endpoints known to be unsupported are not requested again."""
+        if endpoint in self.unsupported:
+            self.skipped_requests += 1
+            raise HomeConnectError({"key": self.unsupported[endpoint], "description": f"{endpoint} is not supported by this appliance"})
+
+        try:
+            data = self.hc.get("{}/{}{}".format(ENDPOINT_APPLIANCES, self.haId, endpoint))
+        except HomeConnectError as err:
+            if err.key in UNSUPPORTED_ERRORS and not endpoint.startswith(PROGRAM_ENDPOINTS):
+                _LOGGER.debug("%s does not support %s: %s", self.name, endpoint, err.key)
+                self.unsupported[endpoint] = err.key
+            raise
+
+        self.supported.add(endpoint)
+        return data
+
+    def reset_capabilities(self):
+        """Forget the probed endpoints, e.g. after the appliance has been connected again."""
+        self.supported.clear()
+        self.unsupported.clear()
 
     def put(self, endpoint, data):
         """Send (PUT) data to an endpoint."""
@@ -450,6 +956,8 @@ class HomeConnectAppliance:
     def set_programs_active(self, program_key, options=None):
         """Start the given program."""
 
+        self.catalog.validate_program(program_key, options)
+
         if options is not None:
             return self.put("/programs/active", {"data": {"key": program_key, "options": options}})
 
@@ -462,6 +970,9 @@ class HomeConnectAppliance:
     def set_programs_active_options_with_key(self, option_key, value, unit=None):
         """Set one specific option of the active program."""
 
+        program_key = self.status.get("BSH.Common.Root.ActiveProgram", {}).get("value") or self.status["BSH.Common.Root.SelectedProgram"].get("value")
+        self.catalog.validate_option(program_key, option_key, value)
+
         if unit is not None:
             return self.put(f"/programs/active/options/{option_key}", {"data": {"key": option_key, "value": value, "unit": unit}})
 
@@ -474,6 +985,8 @@ class HomeConnectAppliance:
     def set_programs_selected(self, program_key, options=None):
         """Select a program."""
 
+        self.catalog.validate_program(program_key, options)
+
         if options is not None:
             return self.put("/programs/selected", {"data": {"key": program_key, "options": options}})
 
@@ -486,6 +999,8 @@ class HomeConnectAppliance:
     def set_programs_selected_options_with_key(self, option_key, value, unit=None):
         """Set specific option of selected program."""
 
+        self.catalog.validate_option(self.status["BSH.Common.Root.SelectedProgram"].get("value"), option_key, value)
+
         if unit is not None:
             return self.put(f"/programs/selected/options/{option_key}", {"data": {"key": option_key, "value": value, "unit": unit}})
 
@@ -494,13 +1009,14 @@ class HomeConnectAppliance:
     def update_status(self):
         """Get the status (as dictionary) and update `self.status`."""
 
+        start = self._sequence
         status = self.get("/status")
 
         if not status or "status" not in status:
             return {}
 
         # Update the status dictunary
-        self.status.update(self.json2dict(status["status"]))
+        self._merge(self.json2dict(status["status"]), start)
 
         return self.status
 
@@ -511,13 +1027,14 @@ class HomeConnectAppliance:
     def update_settings(self):
         """Get a list of available settings."""
 
+        start = self._sequence
         settings = self.get("/settings")
 
         if not settings or "settings" not in settings:
             return {}
 
         # Update the status dictunary
-        self.status.update(self.json2dict(settings["settings"]))
+        self._merge(self.json2dict(settings["settings"]), start)
 
         return self.status
 
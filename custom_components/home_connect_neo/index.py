@@ -0,0 +1,75 @@
+"""Device name index for Home Connect service calls."""
+
+import logging
+from homeassistant.core import HomeAssistant, callback  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers import device_registry  # pylint: disable=import-error, no-name-in-module
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ApplianceIndex:
+    """Map device names to haIds and haIds to devices to find a device in constant time."""
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the index."""
+        self.hass = hass
+        self.registry = None
+        self._name_to_ha_id = {}
+        self._device_id_to_names = {}
+        self._devices = {}
+
+    async def async_setup(self, devices):
+        """Build the index from the devices and the device registry and keep it current."""
+        self.registry = await device_registry.async_get_registry(self.hass)
+
+        # the device name of a new appliance is the name reported by Home Connect until the device registry knows it
+        for device in devices:
+            self._devices[device.appliance.haId] = device
+            self._name_to_ha_id.setdefault(device.appliance.name, device.appliance.haId)
+
+        for device in self.registry.devices.values():
+            self._index_device(device)
+
+        return self.hass.bus.async_listen(device_registry.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_registry_updated)
+
+    def get(self, name: str):
+        """Return the device of a device name or None."""
+        ha_id = self._name_to_ha_id.get(name)
+        if ha_id is None:
+            return None
+        return self._devices.get(ha_id)
+
+    def _index_device(self, device):
+        """Add the names of a registry device to the index."""
+        ha_id = None
+        for identifier in device.identifiers:
+            if identifier[0] == DOMAIN:
+                ha_id = identifier[1]
+                break
+        if ha_id is None:
+            return
+
+        self._unindex_device(device.id)
+        names = {name for name in (device.name, device.name_by_user) if name}
+        for name in names:
+            self._name_to_ha_id[name] = ha_id
+        self._device_id_to_names[device.id] = names
+
+    def _unindex_device(self, device_id):
+        """Remove the names of a registry device from the index."""
+        for name in self._device_id_to_names.pop(device_id, ()):
+            self._name_to_ha_id.pop(name, None)
+
+    @callback
+    def _async_device_registry_updated(self, event):
+        """Apply created, renamed and removed devices."""
+        device_id = event.data["device_id"]
+        if event.data["action"] == "remove":
+            self._unindex_device(device_id)
+            return
+
+        device = self.registry.async_get(device_id)
+        if device is not None:
+            self._index_device(device)
+            _LOGGER.debug("Device index updated for %s", device.name_by_user or device.name)
@@ -0,0 +1,44 @@
+"""Teardown of the event streams and threads of an account."""
+
+import logging
+from time import monotonic
+from homeassistant.core import HomeAssistant  # pylint: disable=import-error, no-name-in-module
+from .const import SHUTDOWN_TIMEOUT_S
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """Stop everything started for an account within a bounded time on unload or shutdown."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._stoppables = []
+        self._stopped = False
+
+    def register(self, stoppable):
+        """Register an object with stop() and join(timeout) methods like an appliance listening to events.
+        join() must wait for all threads of the object, e.g. the event listener and the resynchronizations of an appliance."""
+        self._stoppables.append(stoppable)
+
+    async def async_teardown(self, timeout: float = SHUTDOWN_TIMEOUT_S):
+        """Stop all registered objects and wait up to `timeout` seconds for their threads to end. Return the objects still running."""
+        if self._stopped:
+            return []
+        self._stopped = True
+
+        # Stopping only closes connections and sets flags, so it doesn't block the event loop
+        for stoppable in self._stoppables:
+            stoppable.stop()
+
+        deadline = monotonic() + timeout
+
+        def join():
+            return [stoppable for stoppable in self._stoppables if not stoppable.join(max(0, deadline - monotonic()))]
+
+        running = await self.hass.async_add_executor_job(join)
+        for stoppable in running:
+            threads = ", ".join(thread.name for thread in stoppable.threads()) if hasattr(stoppable, "threads") else ""
+            _LOGGER.warning("%s did not stop within %.0f s %s", getattr(stoppable, "name", stoppable), timeout, threads)
+        self._stoppables.clear()
+        return running
@@ -4,44 +4,67 @@ import logging
 from math import ceil
 from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_HS_COLOR, LightEntity  # pylint: disable=import-error, no-name-in-module
 from homeassistant.util import color as color_util  # pylint: disable=import-error, no-name-in-module
-from .const import DOMAIN
+from homeassistant.core import callback  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers.dispatcher import async_dispatcher_connect  # pylint: disable=import-error, no-name-in-module
+from .const import DOMAIN, SIGNAL_NEW_ENTITIES
 from .entity import HomeConnectEntity
 from .homeconnect import HomeConnectError
 
 _LOGGER = logging.getLogger(__name__)
 
+# Settings which affect brightness and color of a light
+LIGHT_KEYS = {
+    "BSH.Common.Setting.AmbientLightEnabled": ("BSH.Common.Setting.AmbientLightBrightness", "BSH.Common.Setting.AmbientLightCustomColor"),
+    "Cooking.Common.Setting.Lighting": ("Cooking.Common.Setting.LightingBrightness",),
+}
+
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Add switch sensor in HA."""
 
     home_connect = hass.data[DOMAIN][config_entry.entry_id]
 
-    # put all lights of the appliances into a list and add it to HA
-    entities = []
-    for device in home_connect.devices:
-        # get a list of all lights
-        lichts_list = device.get_lights()
-        for i in lichts_list:
-            # create a home connect light
-            light = HomeConnectLight(i["device"], i["key"], i["description"])
-            # add light to the list
-            entities.append(light)
+    @callback
+    def async_add_new_entities(ha_id=None):
+        """Add the lights which are not in HA yet. Optional ones are added when their key appears."""
+
+        # put all lights of the appliances into a list and add it to HA
+        entities = []
+        for device in home_connect.devices:
+            # get a list of all lights
+            lichts_list = device.get_lights()
+            for description in lichts_list:
+                # create a home connect light
+                light = HomeConnectLight(device, description)
+                # add light to the list
+                entities.append(light)
 
-    # add all entities to HA
-    async_add_entities(entities, True)
+        # add all entities to HA
+        if entities:
+            async_add_entities(entities, True)
+
+    async_add_new_entities()
+    config_entry.async_on_unload(async_dispatcher_connect(hass, SIGNAL_NEW_ENTITIES, async_add_new_entities))
 
 
 class HomeConnectLight(HomeConnectEntity, LightEntity):
     """Light class for Home Connect."""
 
-    def __init__(self, device, key, description) -> None:
+    def __init__(self, device, description) -> None:
         """Initialize entity."""
-        super().__init__(device, description)
-        self._key = key
+        super().__init__(device, description.description)
+        self._key = description.key
         self._state = None
         self._brightness = None
         self._hs_color = None
 
+        # resolve the handlers of the key once
+        self._turn_on, self._update = {
+            "BSH.Common.Setting.AmbientLightEnabled": (self._async_turn_on_ambient, self._update_ambient),
+            "Cooking.Common.Setting.Lighting": (self._async_turn_on_functional, self._update_brightness),
+        }.get(self._key, (None, None))
+        self._watched_keys = frozenset([self._key, *LIGHT_KEYS.get(self._key, ())])
+
     @property
     def is_on(self):
         """Return true if light is on."""
@@ -60,67 +83,70 @@ class HomeConnectLight(HomeConnectEntity, LightEntity):
     async def async_turn_on(self, **kwargs):
         """Switch  light on."""
 
-        if self._key == "BSH.Common.Setting.AmbientLightEnabled":
-            # Turn on ambient light
+        if self._turn_on is None:
+            _LOGGER.warning("Unexpected value for key: %s", self._key)
+        else:
+            await self._turn_on(kwargs)
+
+        self.async_entity_update()
+
+    async def _async_turn_on_ambient(self, kwargs):
+        """Turn on ambient light and set hue, saturation and brightness."""
+        try:
+            await self._device.commands.async_submit(self._device.appliance.set_setting_with_key, self._key, True)
+        except HomeConnectError as err:
+            _LOGGER.error("Error while trying to turn on ambient light: %s", err)
+            return
+
+        # Set hue and saturation and brightness of ambient light
+        if ATTR_BRIGHTNESS in kwargs or ATTR_HS_COLOR in kwargs:
             try:
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, self._key, True)
+                await self._device.commands.async_submit(self._device.appliance.set_setting_with_key, "BSH.Common.Setting.AmbientLightColor", "BSH.Common.EnumType.AmbientLightColor.CustomColor")
             except HomeConnectError as err:
-                _LOGGER.error("Error while trying to turn on ambient light: %s", err)
-                return
-
-            # Set hue and saturation and brightness of ambient light
-            if ATTR_BRIGHTNESS in kwargs or ATTR_HS_COLOR in kwargs:
-                try:
-                    await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "BSH.Common.Setting.AmbientLightColor", "BSH.Common.EnumType.AmbientLightColor.CustomColor")
-                except HomeConnectError as err:
-                    _LOGGER.error("Error while trying selecting customcolor: %s", err)
-
-                if self._brightness is not None:
-                    # Set brightness
-                    if ATTR_BRIGHTNESS in kwargs:
-                        brightness = 10 + ceil(kwargs[ATTR_BRIGHTNESS] / 255 * 90)
-                    else:
-                        brightness = 10 + ceil(self._brightness / 255 * 90)
-
-                    # Set hue and saturation
-                    hs_color = kwargs.get(ATTR_HS_COLOR, self._hs_color)
-                    if hs_color is not None:
-                        rgb = color_util.color_hsv_to_RGB(*hs_color, brightness)
-                        hex_val = color_util.color_rgb_to_hex(rgb[0], rgb[1], rgb[2])
-                        try:
-                            await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "BSH.Common.Setting.AmbientLightCustomColor", f"#{hex_val}")
-                        except HomeConnectError as err:
-                            _LOGGER.error("Error while trying setting the color: %s", err)
-
-        elif self._key == "Cooking.Common.Setting.Lighting":
-            if ATTR_BRIGHTNESS in kwargs:
-                # Set brightness of functional light
-                brightness = 10 + ceil(kwargs[ATTR_BRIGHTNESS] / 255 * 90)
-                try:
-                    await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Cooking.Common.Setting.LightingBrightness", brightness)
-                except HomeConnectError as err:
-                    _LOGGER.error("Error while trying set the brightness: %s", err)
-            else:
-                # Turn on functional light
-                try:
-                    await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, self._key, True)
-                except HomeConnectError as err:
-                    _LOGGER.error("Error while trying to turn on light: %s", err)
+                _LOGGER.error("Error while trying selecting customcolor: %s", err)
 
+            if self._brightness is not None:
+                # Set brightness
+                if ATTR_BRIGHTNESS in kwargs:
+                    brightness = 10 + ceil(kwargs[ATTR_BRIGHTNESS] / 255 * 90)
+                else:
+                    brightness = 10 + ceil(self._brightness / 255 * 90)
+
+                # Set hue and saturation
+                hs_color = kwargs.get(ATTR_HS_COLOR, self._hs_color)
+                if hs_color is not None:
+                    rgb = color_util.color_hsv_to_RGB(*hs_color, brightness)
+                    hex_val = color_util.color_rgb_to_hex(rgb[0], rgb[1], rgb[2])
+                    try:
+                        await self._device.commands.async_submit(self._device.appliance.set_setting_with_key, "BSH.Common.Setting.AmbientLightCustomColor", f"#{hex_val}")
+                    except HomeConnectError as err:
+                        _LOGGER.error("Error while trying setting the color: %s", err)
+
+    async def _async_turn_on_functional(self, kwargs):
+        """Turn on functional light or set its brightness."""
+        if ATTR_BRIGHTNESS in kwargs:
+            # Set brightness of functional light
+            brightness = 10 + ceil(kwargs[ATTR_BRIGHTNESS] / 255 * 90)
+            try:
+                await self._device.commands.async_submit(self._device.appliance.set_setting_with_key, "Cooking.Common.Setting.LightingBrightness", brightness)
+            except HomeConnectError as err:
+                _LOGGER.error("Error while trying set the brightness: %s", err)
         else:
-            _LOGGER.warning("Unexpected value for key: %s", self._key)
-
-        self.async_entity_update()
+            # Turn on functional light
+            try:
+                await self._device.commands.async_submit(self._device.appliance.set_setting_with_key, self._key, True)
+            except HomeConnectError as err:
+                _LOGGER.error("Error while trying to turn on light: %s", err)
 
     async def async_turn_off(self, **kwargs):
         """Switch light off."""
         try:
-            await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, self._key, False)
+            await self._device.commands.async_submit(self._device.appliance.set_setting_with_key, self._key, False)
         except HomeConnectError as err:
             _LOGGER.error("Error while trying to turn off light: %s", err)
         self.async_entity_update()
 
-    async def async_update(self):
+    def update_state(self):
         """Update light's status."""
 
         # get all messages of this appliance stored in status
@@ -131,39 +157,35 @@ class HomeConnectLight(HomeConnectEntity, LightEntity):
             self._state = None
         elif "value" not in status[self._key]:
             self._state = None
-        else:
+        elif self._update is not None:
             # Functional or ambient lighting
-            if self._key in ["BSH.Common.Setting.AmbientLightEnabled", "Cooking.Common.Setting.Lighting"]:
-                self._state = status[self._key].get("value") == "true"
-
-            # Functional lighting
-            if self._key == "Cooking.Common.Setting.Lighting":
-
-                # Brightness
-                brightness = self._device.appliance.status.get("Cooking.Common.Setting.LightingBrightness", {})
-                if brightness is not None and brightness.get("value") is not None:
-                    self._brightness = ceil((brightness.get("value") - 10) * 255 / 90)
-                else:
-                    self._brightness = None
-
-            # Ambient lighting
-            elif self._key == "BSH.Common.Setting.AmbientLightEnabled":
+            self._state = status[self._key].get("value") == "true"
+            self._update(status)
+
+    def _update_brightness(self, status):
+        """Update brightness of functional lighting."""
+        brightness = status.get("Cooking.Common.Setting.LightingBrightness", {})
+        if brightness is not None and brightness.get("value") is not None:
+            self._brightness = ceil((brightness.get("value") - 10) * 255 / 90)
+        else:
+            self._brightness = None
 
-                # Brightness
-                brightness = self._device.appliance.status.get("BSH.Common.Setting.AmbientLightBrightness", {})
-                if brightness is not None and brightness.get("value") is not None:
-                    self._brightness = ceil((brightness.get("value") - 10) * 255 / 90)
-                else:
-                    self._brightness = None
-
-                # Hue, saturation and brightness for custom color
-                color = self._device.appliance.status.get("BSH.Common.Setting.AmbientLightCustomColor", {})
-                if color is not None and color.get("value") is not None:
-                    colorvalue = color.get("value")[1:]
-                    rgb = color_util.rgb_hex_to_rgb_list(colorvalue)
-                    hsv = color_util.color_RGB_to_hsv(rgb[0], rgb[1], rgb[2])
-                    self._hs_color = [hsv[0], hsv[1]]
-                    self._brightness = ceil((hsv[2] - 10) * 255 / 90)
-                else:
-                    self._hs_color = None
-                    self._brightness = None
+    def _update_ambient(self, status):
+        """Update brightness, hue and saturation of ambient lighting."""
+        brightness = status.get("BSH.Common.Setting.AmbientLightBrightness", {})
+        if brightness is not None and brightness.get("value") is not None:
+            self._brightness = ceil((brightness.get("value") - 10) * 255 / 90)
+        else:
+            self._brightness = None
+
+        # Hue, saturation and brightness for custom color
+        color = status.get("BSH.Common.Setting.AmbientLightCustomColor", {})
+        if color is not None and color.get("value") is not None:
+            colorvalue = color.get("value")[1:]
+            rgb = color_util.rgb_hex_to_rgb_list(colorvalue)
+            hsv = color_util.color_RGB_to_hsv(rgb[0], rgb[1], rgb[2])
+            self._hs_color = [hsv[0], hsv[1]]
+            self._brightness = ceil((hsv[2] - 10) * 255 / 90)
+        else:
+            self._hs_color = None
+            self._brightness = None
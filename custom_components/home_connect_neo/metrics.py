@@ -0,0 +1,125 @@
+"""Lightweight metrics of the Home Connect integration."""
+
+from bisect import bisect_left
+from threading import Lock
+
+# Upper bounds of the latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        """Increase the count."""
+        with self._lock:
+            self.value += amount
+
+    def as_dict(self):
+        """Return the count."""
+        return {"type": "counter", "value": self.value}
+
+
+class Gauge:
+    """Value which goes up and down."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = None
+
+    def set(self, value):
+        """Set the value."""
+        self.value = value
+
+    def as_dict(self):
+        """Return the value."""
+        return {"type": "gauge", "value": self.value}
+
+
+class Histogram:
+    """Distribution of observed values in fixed buckets."""
+
+    __slots__ = ("_lock", "buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self._lock = Lock()
+        self.buckets = tuple(buckets)
+        # the last count is the overflow bucket of values above the highest bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        """Add a value to its bucket."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    @property
+    def mean(self):
+        """Return the mean of the observed values or None."""
+        return self.sum / self.count if self.count else None
+
+    def as_dict(self):
+        """Return the bucket counts and summary values."""
+        buckets = {str(bound): count for bound, count in zip(self.buckets, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {"type": "histogram", "count": self.count, "sum": round(self.sum, 3), "mean": round(self.mean, 3) if self.count else None, "max": round(self.max, 3), "buckets": buckets}
+
+
+class MetricsRegistry:
+    """Metrics identified by name and labels. Recording is thread safe and cheap enough for every request and event."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._metrics = {}
+
+    def _get(self, factory, name, labels):
+        """Return the metric of a name and labels, create it on first use."""
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, factory())
+        return metric
+
+    def counter(self, name, **labels) -> Counter:
+        """Return a counter."""
+        return self._get(Counter, name, labels)
+
+    def gauge(self, name, **labels) -> Gauge:
+        """Return a gauge."""
+        return self._get(Gauge, name, labels)
+
+    def histogram(self, name, buckets=LATENCY_BUCKETS, **labels) -> Histogram:
+        """Return a histogram."""
+        return self._get(lambda: Histogram(buckets), name, labels)
+
+    def find(self, name, **labels):
+        """Return the metrics of a name whose labels contain the given ones."""
+        wanted = set(labels.items())
+        return [metric for (metric_name, metric_labels), metric in list(self._metrics.items()) if metric_name == name and wanted.issubset(metric_labels)]
+
+    def total(self, name, **labels):
+        """Return the sum of the counters of a name whose labels contain the given ones."""
+        return sum(metric.value for metric in self.find(name, **labels))
+
+    def as_dict(self):
+        """Return all metrics."""
+        return [{"name": name, "labels": dict(labels), **metric.as_dict()} for (name, labels), metric in sorted(list(self._metrics.items()), key=lambda item: item[0])]
+
+
+# Metrics of all appliances of all accounts
+metrics = MetricsRegistry()
@@ -1,45 +1,179 @@
 """Sensor for Home Connect"""
 
 import logging
-from homeassistant.helpers.entity import Entity  # pylint: disable=import-error, no-name-in-module
-from .const import DOMAIN
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Callable, Dict, Optional
+from homeassistant.helpers.entity import Entity, EntityCategory  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers.event import async_call_later  # pylint: disable=import-error, no-name-in-module
+from homeassistant.const import MATCH_ALL  # pylint: disable=import-error, no-name-in-module
+from homeassistant.core import callback  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers.dispatcher import async_dispatcher_connect  # pylint: disable=import-error, no-name-in-module
+from .const import DATA_CONFIG, DOMAIN, SIGNAL_NEW_ENTITIES
 from .entity import HomeConnectEntity
+from .homeconnect import INTERPOLATED_KEYS
+from .metrics import metrics
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class ThrottlePolicy:
+    """Write a new value only if `min_interval` seconds have passed since the last write or it differs by `min_delta` or `min_relative_delta` from the written value."""
+
+    min_interval: float
+    min_delta: Optional[float] = None
+    min_relative_delta: Optional[float] = None
+
+
+# Sensors which tick constantly while a program is running. Transitions of the operation state are always written.
+THROTTLE_POLICIES = {
+    "BSH.Common.Option.ProgramProgress": ThrottlePolicy(60, min_delta=5),
+    "BSH.Common.Option.RemainingProgramTime": ThrottlePolicy(60, min_delta=300),
+    "BSH.Common.Option.ElapsedProgramTime": ThrottlePolicy(60, min_delta=300),
+    "Cooking.Oven.Status.CurrentCavityTemperature": ThrottlePolicy(30, min_delta=5, min_relative_delta=0.05),
+}
+
+OPERATION_STATE = "BSH.Common.Status.OperationState"
+
+# Sensors with the minimum, maximum, mean and slope of their recent values as attributes
+TREND_KEYS = frozenset(["Cooking.Oven.Status.CurrentCavityTemperature", "BSH.Common.Option.ProgramProgress"])
+TREND_WINDOW_S = 10 * 60
+
+# Keys of sensors which show the value of the status message
+SENSOR_VALUE_KEYS = frozenset(
+    [
+        "BSH.Common.Status.OperationState",
+        "BSH.Common.Option.RemainingProgramTime",
+        "BSH.Common.Option.ProgramProgress",
+        "BSH.Common.Option.Duration",
+        "BSH.Common.Option.ElapsedProgramTime",
+        "BSH.Common.Root.SelectedProgram",
+        "LaundryCare.Washer.Option.Temperature",
+        "LaundryCare.Washer.Option.SpinSpeed",
+        "LaundryCare.Dryer.Option.DryingTarget",
+        "Cooking.Oven.Status.CurrentCavityTemperature",
+        "Cooking.Oven.Option.SetpointTemperature",
+        "Refrigeration.Common.Setting.BottleCooler.SetpointTemperature",
+        "Refrigeration.Common.Setting.ChillerLeft.SetpointTemperature",
+        "Refrigeration.Common.Setting.ChillerCommon.SetpointTemperature",
+        "Refrigeration.Common.Setting.ChillerRight.SetpointTemperature",
+        "Refrigeration.Common.Setting.WineCompartment.SetpointTemperature",
+        "Refrigeration.Common.Setting.WineCompartment2.SetpointTemperature",
+        "Refrigeration.Common.Setting.WineCompartment3.SetpointTemperature",
+        "Refrigeration.FridgeFreezer.Setting.SetpointTemperatureRefrigerator",
+        "Refrigeration.FridgeFreezer.Setting.SetpointTemperatureFreezer",
+        "ConsumerProducts.CoffeeMaker.Option.CoffeeTemperature",
+        "ConsumerProducts.CoffeeMaker.Option.FillQuantity",
+        "ConsumerProducts.CoffeeMaker.Option.BeanAmount",
+    ]
+)
+
+
+@dataclass(frozen=True)
+class MetricSensorDescription:
+    """Description of a diagnostic sensor showing metrics of an appliance."""
+
+    description: str
+    icon: str
+    value: Callable[[Any], Any]
+    attributes: Callable[[Any], Dict[str, Any]]
+
+
+def _updates_per_event(device):
+    """Return the mean number of entity state writes per event of an appliance."""
+    events = metrics.total("dispatch.events", appliance=device.appliance.haId)
+    return round(metrics.total("dispatch.entity_writes", appliance=device.appliance.haId) / events, 2) if events else None
+
+
+# Diagnostic sensors of every appliance
+METRIC_SENSORS = (
+    MetricSensorDescription(
+        "API Requests",
+        "mdi:api",
+        lambda device: metrics.total("api.requests", appliance=device.appliance.haId),
+        lambda device: {"rate_limited": metrics.total("api.requests", appliance=device.appliance.haId, status=429), "skipped": device.appliance.skipped_requests},
+    ),
+    MetricSensorDescription(
+        "Events",
+        "mdi:transit-connection-variant",
+        lambda device: metrics.total("stream.events", appliance=device.appliance.haId),
+        lambda device: {"connects": metrics.total("stream.connects", appliance=device.appliance.haId), "connect_failures": metrics.total("stream.connect_failures", appliance=device.appliance.haId)},
+    ),
+    MetricSensorDescription(
+        "Entity Updates",
+        "mdi:update",
+        lambda device: metrics.total("dispatch.entity_writes", appliance=device.appliance.haId),
+        lambda device: {"updates_per_event": _updates_per_event(device), "suppressed": metrics.total("dispatch.suppressed_writes", appliance=device.appliance.haId), "skipped_entities": device.skipped_entities()},
+    ),
+    MetricSensorDescription(
+        "Command Queue",
+        "mdi:tray-full",
+        lambda device: device.commands.depth,
+        lambda device: device.commands.as_dict(),
+    ),
+)
+
+
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Add sensors in HA."""
 
     home_connect = hass.data[DOMAIN][config_entry.entry_id]
 
-    # put all sensors of the appliances into a list and add it to HA
-    entities = []
-    for device in home_connect.devices:
-        # get a list of all sensors
-        sensor_list = device.get_sensors()
-        for i in sensor_list:
-            # create a home connect sensor
-            sensor = HomeConnectSensor(i["device"], i["key"], i["description"], i["unit"], i["icon"], i["device_class"])
-            # add sensor to the list
-            entities.append(sensor)
+    # the default policies can be changed per key in YAML
+    policies = {**THROTTLE_POLICIES, **{key: ThrottlePolicy(**policy) for key, policy in hass.data.get(DATA_CONFIG, {}).get("throttle", {}).items()}}
+
+    @callback
+    def async_add_new_entities(ha_id=None):
+        """Add the sensors which are not in HA yet. Optional ones are added when their key appears."""
+
+        # put all sensors of the appliances into a list and add it to HA
+        entities = []
+        for device in home_connect.devices:
+            # get a list of all sensors
+            sensor_list = device.get_sensors()
+            for description in sensor_list:
+                # create a home connect sensor
+                sensor = HomeConnectSensor(device, description, policies)
+                # add sensor to the list
+                entities.append(sensor)
+
+        # add all entities to HA
+        if entities:
+            async_add_entities(entities, True)
 
-    # add all entities to HA
-    async_add_entities(entities, True)
+    async_add_new_entities()
+    # diagnostic sensors exist for every appliance from the start
+    async_add_entities([HomeConnectMetricSensor(device, description) for device in home_connect.devices for description in METRIC_SENSORS], True)
+    config_entry.async_on_unload(async_dispatcher_connect(hass, SIGNAL_NEW_ENTITIES, async_add_new_entities))
 
 
 class HomeConnectSensor(HomeConnectEntity, Entity):
     """Sensor class for Home Connect."""
 
-    def __init__(self, device, key, description, unit, icon, device_class) -> None:
+    def __init__(self, device, description, policies=THROTTLE_POLICIES) -> None:
         """Initialize the entity."""
-        super().__init__(device, description)
-        self._unit = unit
-        self._icon = icon
-        self._device_class = device_class
-        self._key = key
+        super().__init__(device, description.description)
+        self._unit = description.unit
+        self._icon = description.icon
+        self._device_class = description.device_class
+        self._key = description.key
+        self._watched_keys = frozenset([self._key])
+        self._has_value = description.key in SENSOR_VALUE_KEYS
+        self._interpolated = description.key in INTERPOLATED_KEYS
+        self._trend = description.key in TREND_KEYS
         self._state = None
 
+        # State write throttling of sensors which tick constantly
+        self._throttle = policies.get(self._key)
+        if self._throttle is not None:
+            self._watched_keys = frozenset([self._key, OPERATION_STATE])
+        self._written_state = None
+        self._written_at = 0.0
+        self._cancel_flush = None
+        self.suppressed_writes = 0
+        self._suppressed = metrics.counter("dispatch.suppressed_writes", appliance=device.appliance.haId)
+
     @property
     def state(self):
         """Return the state of the sensor."""
@@ -60,7 +194,72 @@ class HomeConnectSensor(HomeConnectEntity, Entity):
         """Return the device class."""
         return self._device_class
 
-    async def async_update(self):
+    @property
+    def extra_state_attributes(self):
+        """Return the trend of the recent values from the history of the appliance."""
+        if not self._trend:
+            return None
+        stats = self._device.appliance.history.stats(self._key, monotonic() - TREND_WINDOW_S)
+        if stats is None or stats["count"] < 2:
+            return None
+        return {"min": stats["min"], "max": stats["max"], "mean": round(stats["mean"], 1), "slope_per_minute": round(stats["slope"] * 60, 2)}
+
+    def should_write(self, keys):
+        """Throttle the writes of constantly ticking values. A pending value is written at the latest when the interval has passed."""
+        if self._throttle is None:
+            return True
+
+        now = monotonic()
+        if keys is None or OPERATION_STATE in keys:
+            self._written(now)
+            return True
+        if self._state == self._written_state:
+            return False
+        if self._significant(now):
+            self._written(now)
+            return True
+
+        self.suppressed_writes += 1
+        self._suppressed.inc()
+        if self._cancel_flush is None:
+            self._cancel_flush = async_call_later(self.hass, self._throttle.min_interval - (now - self._written_at), self._async_flush)
+        return False
+
+    def _significant(self, now):
+        """Return true if the state differs enough from the written state or the interval has passed."""
+        if now - self._written_at >= self._throttle.min_interval:
+            return True
+        if not isinstance(self._state, (int, float)) or not isinstance(self._written_state, (int, float)):
+            return True
+        delta = abs(self._state - self._written_state)
+        if self._throttle.min_delta is not None and delta >= self._throttle.min_delta:
+            return True
+        if self._throttle.min_relative_delta is not None and self._written_state and delta / abs(self._written_state) >= self._throttle.min_relative_delta:
+            return True
+        return False
+
+    def _written(self, now):
+        self._written_state = self._state
+        self._written_at = now
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+
+    @callback
+    def _async_flush(self, _now):
+        """Write the value which has been held back."""
+        self._cancel_flush = None
+        if self._state != self._written_state:
+            self._written(monotonic())
+            self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self):
+        """Cancel a pending write."""
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+
+    def update_state(self):
         """Update the sensos status."""
 
         # get all messages of this appliance stored in status
@@ -72,30 +271,61 @@ class HomeConnectSensor(HomeConnectEntity, Entity):
         elif "value" not in status[self._key]:
             self._state = None
         else:
-            if self._key in [
-                "BSH.Common.Status.OperationState",
-                "BSH.Common.Option.RemainingProgramTime",
-                "BSH.Common.Option.ProgramProgress",
-                "BSH.Common.Option.Duration",
-                "BSH.Common.Option.ElapsedProgramTime",
-                "BSH.Common.Root.SelectedProgram",
-                "LaundryCare.Washer.Option.Temperature",
-                "LaundryCare.Washer.Option.SpinSpeed",
-                "LaundryCare.Dryer.Option.DryingTarget",
-                "Cooking.Oven.Status.CurrentCavityTemperature",
-                "Cooking.Oven.Option.SetpointTemperature",
-                "Refrigeration.Common.Setting.BottleCooler.SetpointTemperature",
-                "Refrigeration.Common.Setting.ChillerLeft.SetpointTemperature",
-                "Refrigeration.Common.Setting.ChillerCommon.SetpointTemperature",
-                "Refrigeration.Common.Setting.ChillerRight.SetpointTemperature",
-                "Refrigeration.Common.Setting.WineCompartment.SetpointTemperature",
-                "Refrigeration.Common.Setting.WineCompartment2.SetpointTemperature",
-                "Refrigeration.Common.Setting.WineCompartment3.SetpointTemperature",
-                "Refrigeration.FridgeFreezer.Setting.SetpointTemperatureRefrigerator",
-                "Refrigeration.FridgeFreezer.Setting.SetpointTemperatureFreezer",
-                "ConsumerProducts.CoffeeMaker.Option.CoffeeTemperature",
-                "ConsumerProducts.CoffeeMaker.Option.FillQuantity",
-                "ConsumerProducts.CoffeeMaker.Option.BeanAmount",
-            ]:
+            if self._interpolated:
+                self._state = self._device.appliance.interpolated_value(self._key)
+            elif self._has_value:
                 self._state = status[self._key].get("value")
             # _LOGGER.debug("Updated, new state: %s", self._state)
+
+
+class HomeConnectMetricSensor(HomeConnectEntity, Entity):
+    """Diagnostic sensor showing metrics of an appliance. It's polled because the metrics change with every request and event."""
+
+    # Metrics are for troubleshooting, they are enabled on demand and their details are not recorded
+    _attr_entity_registry_enabled_default = False
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, device, description) -> None:
+        """Initialize the entity."""
+        super().__init__(device, description.description)
+        self._metric = description
+        self._state = None
+        self._attributes = {}
+
+    @property
+    def state(self):
+        """Return the state of the sensor."""
+        return self._state
+
+    @property
+    def icon(self):
+        """Return the icon of the sensor."""
+        return self._metric.icon
+
+    @property
+    def extra_state_attributes(self):
+        """Return the details of the metric."""
+        return self._attributes
+
+    @property
+    def entity_category(self):
+        """Return the entity category."""
+        return EntityCategory.DIAGNOSTIC
+
+    @property
+    def available(self):
+        """Metrics are available while the appliance is disconnected."""
+        return True
+
+    @property
+    def should_poll(self):
+        """Poll the metrics."""
+        return True
+
+    async def async_added_to_hass(self):
+        """Metrics are polled, not updated by events."""
+
+    def update_state(self):
+        """Read the metrics."""
+        self._state = self._metric.value(self._device)
+        self._attributes = self._metric.attributes(self._device)
@@ -7,22 +7,47 @@ import re
 import time
 import http
 import socket
+import threading
+from collections import deque
 import requests
 from requests.exceptions import HTTPError
+from .metrics import metrics
 
 # Technically, we should support streams that mix line endings.  This regex, however, assumes that a system will provide consistent line endings.
 end_of_field = re.compile(r"\r\n\r\n|\r\r|\n\n")
 
 _LOGGER = logging.getLogger("homeconnect.sseclient")
 
+# Upper bounds of the buckets of the time to detect a lost connection in seconds
+DETECTION_TIME_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600)
+
 
 class SSEClient(object):
-    def __init__(self, url, last_id=None, retry=3000, session=None, chunk_size=1024, **kwargs):
+    def __init__(self, url, last_id=None, retry=3000, session=None, chunk_size=1024, keepalive=None, cadence_event=None, deadline_factor=2.0, min_deadline=30, metric_labels=None, **kwargs):
         self.url = url
         self.last_id = last_id
         self.retry = retry
         self.chunk_size = chunk_size
 
+        # TCP keepalive as (idle, interval, count) in seconds to detect dead connections in the kernel
+        self.keepalive = keepalive
+
+        # The read deadline is derived from the cadence of a periodic event like KEEP-ALIVE and never exceeds the configured timeout
+        self.cadence_event = cadence_event
+        self.deadline_factor = deadline_factor
+        self.min_deadline = min_deadline
+        self.max_deadline = kwargs.get("timeout")
+        self.read_deadline = self.max_deadline
+        self._cadence = deque(maxlen=4)
+        self._last_cadence_event = None
+
+        # Time between the last received message and the detection of a dead connection
+        self.last_message = time.monotonic()
+        self.last_detection_time = None
+
+        # Labels of the recorded connection metrics
+        self.metric_labels = metric_labels or {}
+
         # Optional support for passing in a requests.Session()
         self.session = session
 
@@ -39,6 +64,13 @@ class SSEClient(object):
 
         # Keep data here as it streams in
         self.buf = ""
+        # Monotonic time the first chunk of the last returned event has been received
+        self.received_at = time.monotonic()
+
+        # Set by another thread to drop the current connection
+        self._reconnect_requested = False
+        # Set by close() to end the iteration and interrupt waiting for a reconnect
+        self._closed = threading.Event()
 
         self._connect()
 
@@ -56,11 +88,88 @@ class SSEClient(object):
             self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
             # TODO: Ensure we're handling redirects.  Might also stick the 'origin' attribute on Events like the Javascript spec requires.
             self.resp.raise_for_status()
+            self._configure_socket()
+            metrics.counter("stream.connects", **self.metric_labels).inc()
         except (HTTPError, requests.RequestException):
             _LOGGER.warning("Failed connecting.")
+            metrics.counter("stream.connect_failures", **self.metric_labels).inc()
             # Wait 10 times longer if connection failed due to rate limits
-            time.sleep(10 * self.retry / 1000.0)
-            self._connect()
+            if not self._closed.wait(10 * self.retry / 1000.0):
+                self._connect()
+
+    def _socket(self):
+        """Return the socket of the streamed response or None if it's not accessible."""
+        fp = getattr(getattr(self.resp.raw, "_fp", None), "fp", None)
+        return getattr(getattr(fp, "raw", None), "_sock", None)
+
+    def _configure_socket(self):
+        """Enable TCP keepalive and apply the read deadline to the socket."""
+        sock = self._socket()
+        if sock is None:
+            return
+        try:
+            if self.keepalive is not None:
+                idle, interval, count = self.keepalive
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                if hasattr(socket, "TCP_KEEPIDLE"):
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle)
+                elif hasattr(socket, "TCP_KEEPALIVE"):
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, idle)
+                if hasattr(socket, "TCP_KEEPINTVL"):
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, interval)
+                if hasattr(socket, "TCP_KEEPCNT"):
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, count)
+            if self.read_deadline is not None:
+                sock.settimeout(self.read_deadline)
+        except OSError as err:
+            _LOGGER.debug("Failed configuring socket. %s", err)
+
+    def _update_cadence(self, msg):
+        """Shorten the read deadline to a multiple of the observed interval of the cadence event."""
+        now = time.monotonic()
+        self.last_message = now
+        if self.cadence_event is None or msg.event != self.cadence_event:
+            return
+        if self._last_cadence_event is not None:
+            self._cadence.append(now - self._last_cadence_event)
+            deadline = max(self.min_deadline, max(self._cadence) * self.deadline_factor)
+            if self.max_deadline is not None:
+                deadline = min(deadline, self.max_deadline)
+            if deadline != self.read_deadline:
+                _LOGGER.debug("Read deadline set to %.1f s", deadline)
+                self.read_deadline = deadline
+                self._configure_socket()
+        self._last_cadence_event = now
+
+    def reconnect(self):
+        """Drop the current connection from another thread. The reading thread connects again."""
+        _LOGGER.info("Reconnect requested")
+        self._reconnect_requested = True
+        self._drop_connection()
+
+    def _drop_connection(self):
+        """Close the connection while another thread may be blocked reading from it."""
+        # Closing the response waits for a pending read, shutting down the socket wakes it up
+        sock = self._socket()
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError as err:
+                _LOGGER.debug("Failed shutting down socket. %s", err)
+        try:
+            self.resp.close()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Failed closing connection. %s", err)
+
+    def close(self):
+        """Close the connection from another thread and end the iteration."""
+        self._closed.set()
+        self._drop_connection()
+
+    @property
+    def closed(self):
+        """Return true if close() has been called."""
+        return self._closed.is_set()
 
     def iter_content(self):
         def generate():
@@ -84,16 +193,35 @@ class SSEClient(object):
 
     def __next__(self):
         while not self._event_complete():
+            if self._closed.is_set():
+                raise StopIteration
             try:
                 next_chunk = next(self.resp_iterator)
                 if not next_chunk:
                     _LOGGER.error("EOFError")
                     raise EOFError()
+                if not self.buf.strip():
+                    self.received_at = time.monotonic()
                 self.buf += self.decoder.decode(next_chunk)
 
-            except (StopIteration, requests.RequestException, EOFError, http.client.IncompleteRead, socket.timeout) as err:
-                _LOGGER.error("Exception while reading event. %s", err)
-                time.sleep(self.retry / 1000.0)
+            except Exception as err:  # pylint: disable=broad-except
+                if self._closed.is_set():
+                    raise StopIteration from err
+                # Reading from a connection closed by reconnect() may raise any kind of I/O error
+                if not self._reconnect_requested and not isinstance(err, (StopIteration, requests.RequestException, EOFError, http.client.IncompleteRead, socket.timeout)):
+                    raise
+                if self._reconnect_requested:
+                    _LOGGER.info("Connection dropped on request. %s", err)
+                else:
+                    _LOGGER.error("Exception while reading event. %s", err)
+                self.last_detection_time = time.monotonic() - self.last_message
+                _LOGGER.info("Connection loss detected %.1f s after the last message", self.last_detection_time)
+                metrics.histogram("stream.detection_time", DETECTION_TIME_BUCKETS, **self.metric_labels).observe(self.last_detection_time)
+                # The interval between cadence events of the new connection starts from scratch
+                self._last_cadence_event = None
+                self._reconnect_requested = False
+                if self._closed.wait(self.retry / 1000.0):
+                    raise StopIteration from err
                 self._connect()
 
                 # The SSE spec only supports resuming from a whole message, so if we have half a message we should throw it out.
@@ -104,6 +232,7 @@ class SSEClient(object):
         # Split the complete event (up to the end_of_field) into event_string, and retain anything after the current complete event in self.buf for next time.
         (event_string, self.buf) = re.split(end_of_field, self.buf, maxsplit=1)
         msg = Event.parse(event_string)
+        self._update_cadence(msg)
 
         # If the server requests a specific retry delay, we need to honor it.
         if msg.retry:
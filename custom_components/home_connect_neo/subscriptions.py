@@ -0,0 +1,199 @@
+"""Subscriptions to the changes of appliance keys by key pattern."""
+
+import asyncio
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict
+from .metrics import metrics
+
+# What happens with a new change when the queue of a subscriber is full
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+# Matches one namespace segment, or all remaining ones at the end of a pattern
+WILDCARD = "*"
+
+# Ends the iteration of a closed subscription
+_CLOSED = object()
+
+
+@dataclass(frozen=True)
+class Change:
+    """New value of a key of an appliance with the monotonic time it has been applied."""
+
+    ha_id: str
+    key: str
+    value: Any
+    at: float
+
+
+class Subscription:
+    """Async iterator of the changes of the keys matching a pattern. Iterate it on the event loop it has been created on."""
+
+    def __init__(self, feed, pattern: str, maxsize: int, overflow: str):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow}")
+        self.feed = feed
+        self.pattern = pattern
+        self.overflow = overflow
+        self.dropped = 0
+        self.closed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize)
+        self._dropped = metrics.counter("subscriptions.dropped", appliance=feed.ha_id)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        change = await self._queue.get()
+        if change is _CLOSED:
+            # wake up other waiting consumers, too
+            self._queue.put_nowait(_CLOSED)
+            raise StopAsyncIteration
+        return change
+
+    def close(self):
+        """Stop receiving changes. The iteration ends after the queued changes."""
+        self.feed.unsubscribe(self)
+        self._schedule([_CLOSED])
+
+    def _schedule(self, changes):
+        """Queue changes from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._put, changes)
+        except RuntimeError:
+            # the loop is closed
+            self.closed = True
+
+    def _put(self, changes):
+        for change in changes:
+            if self.closed:
+                return
+            if change is _CLOSED:
+                # queued changes are still delivered, a waiting consumer needs to be woken up
+                self.closed = True
+                if self._queue.empty():
+                    self._queue.put_nowait(_CLOSED)
+                return
+            if self._queue.full():
+                if self.overflow == DROP_NEWEST:
+                    self._drop()
+                    continue
+                self._queue.get_nowait()
+                self._drop()
+            self._queue.put_nowait(change)
+
+    def _drop(self):
+        self.dropped += 1
+        self._dropped.inc()
+
+
+class _Node:
+    """Namespace segment of the subscription trie."""
+
+    __slots__ = ("children", "subscriptions", "rest")
+
+    def __init__(self):
+        self.children = {}
+        # subscriptions of the patterns ending at this node
+        self.subscriptions = set()
+        # subscriptions of the patterns ending with a wildcard after this node
+        self.rest = set()
+
+
+class ChangeFeed:
+    """Subscriptions of one appliance indexed in a trie of the namespace segments of their patterns, so matching a key takes O(depth)."""
+
+    def __init__(self, ha_id: str):
+        self.ha_id = ha_id
+        self._root = _Node()
+        self._count = 0
+        self._lock = Lock()
+
+    def __len__(self):
+        return self._count
+
+    def subscribe(self, pattern: str, maxsize: int = SUBSCRIPTION_QUEUE_SIZE, overflow: str = DROP_OLDEST) -> Subscription:
+        """Return an async iterator of the changes of the keys matching `pattern`, e.g. BSH.Common.Status.DoorState or Refrigeration.*. Call it on the event loop."""
+        subscription = Subscription(self, pattern, maxsize, overflow)
+        segments = pattern.split(".")
+        with self._lock:
+            node = self._root
+            for segment in segments[:-1]:
+                node = node.children.setdefault(segment, _Node())
+            if segments[-1] == WILDCARD:
+                node.rest.add(subscription)
+            else:
+                node.children.setdefault(segments[-1], _Node()).subscriptions.add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription. Emptied nodes are kept, patterns are few and reused."""
+        segments = subscription.pattern.split(".")
+        with self._lock:
+            node = self._root
+            for segment in segments[:-1]:
+                node = node.children.get(segment)
+                if node is None:
+                    return
+            if segments[-1] == WILDCARD:
+                subscribers = node.rest
+            else:
+                node = node.children.get(segments[-1])
+                subscribers = node.subscriptions if node is not None else set()
+            if subscription in subscribers:
+                subscribers.discard(subscription)
+                self._count -= 1
+
+    def match(self, key: str):
+        """Return the subscriptions of the patterns matching `key`."""
+        matched = set()
+        segments = key.split(".")
+        with self._lock:
+            nodes = [self._root]
+            for segment in segments:
+                following = []
+                for node in nodes:
+                    matched.update(node.rest)
+                    for child in (node.children.get(segment), node.children.get(WILDCARD)):
+                        if child is not None:
+                            following.append(child)
+                nodes = following
+                if not nodes:
+                    break
+            for node in nodes:
+                matched.update(node.subscriptions)
+        return matched
+
+    def publish(self, values: Dict[str, dict]):
+        """Send the changed status items to the matching subscriptions. Each subscription is woken up once per call. Called from any thread."""
+        if not self._count:
+            return
+        at = monotonic()
+        pending = {}
+        for key, item in values.items():
+            change = Change(self.ha_id, key, item.get("value") if item else None, at)
+            for subscription in self.match(key):
+                pending.setdefault(subscription, []).append(change)
+        for subscription, changes in pending.items():
+            subscription._schedule(changes)  # pylint: disable=protected-access
+
+    def close(self):
+        """End the iteration of all subscriptions."""
+        with self._lock:
+            subscriptions = set()
+            nodes = [self._root]
+            while nodes:
+                node = nodes.pop()
+                subscriptions.update(node.subscriptions, node.rest)
+                nodes.extend(node.children.values())
+        for subscription in subscriptions:
+            subscription.close()
@@ -2,42 +2,96 @@
 
 import logging
 from homeassistant.components.switch import SwitchEntity  # pylint: disable=import-error, no-name-in-module
-from .const import DOMAIN
+from homeassistant.core import callback  # pylint: disable=import-error, no-name-in-module
+from homeassistant.helpers.dispatcher import async_dispatcher_connect  # pylint: disable=import-error, no-name-in-module
+from .const import DOMAIN, SIGNAL_NEW_ENTITIES
 from .entity import HomeConnectEntity
 from .homeconnect import HomeConnectError
 
 _LOGGER = logging.getLogger(__name__)
 
+# Boolean settings which are switched on and off directly
+SETTING_SWITCH_KEYS = frozenset(
+    [
+        "Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator",
+        "Refrigeration.FridgeFreezer.Setting.SuperModeFreezer",
+        "Refrigeration.Common.Setting.EcoMode",
+        "Refrigeration.Common.Setting.FreshMode",
+        "Refrigeration.Common.Setting.SabbathMode",
+        "Refrigeration.Common.Setting.VacationMode",
+    ]
+)
+
+# State of the start switch for each operation state
+OPERATION_STATE_RUNNING = {
+    "BSH.Common.EnumType.OperationState.Run": True,
+    "BSH.Common.EnumType.OperationState.DelayedStart": True,
+    "BSH.Common.EnumType.OperationState.Ready": False,
+    "BSH.Common.EnumType.OperationState.Finished": False,
+    "BSH.Common.EnumType.OperationState.Pause": False,
+    "BSH.Common.EnumType.OperationState.Inactive": False,
+    "BSH.Common.EnumType.OperationState.ActionRequired": False,
+    "BSH.Common.EnumType.OperationState.Error": False,
+    "BSH.Common.EnumType.OperationState.Aborting": False,
+}
+
+DOOR_CLOSED_STATES = frozenset(["BSH.Common.EnumType.DoorState.Closed", "BSH.Common.EnumType.DoorState.Locked"])
+STARTABLE_OPERATION_STATES = frozenset(["BSH.Common.EnumType.OperationState.Ready", "BSH.Common.EnumType.OperationState.Finished"])
+
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Add switch sensor in HA."""
 
     home_connect = hass.data[DOMAIN][config_entry.entry_id]
 
-    # put all switches of the appliances into a list and add it to HA
-    entities = []
-    for device in home_connect.devices:
-        # get a list of all switches
-        switch_list = device.get_switches()
-        for i in switch_list:
-            # create a home connect switch
-            switch = HomeConnectSwitch(i["device"], i["key"], i["description"])
-            # add switch to the list
-            entities.append(switch)
+    @callback
+    def async_add_new_entities(ha_id=None):
+        """Add the switches which are not in HA yet. Optional ones are added when their key appears."""
+
+        # put all switches of the appliances into a list and add it to HA
+        entities = []
+        for device in home_connect.devices:
+            # get a list of all switches
+            switch_list = device.get_switches()
+            for description in switch_list:
+                # create a home connect switch
+                switch = HomeConnectSwitch(device, description)
+                # add switch to the list
+                entities.append(switch)
+
+        # add all entities to HA
+        if entities:
+            async_add_entities(entities, True)
 
-    # add all entities to HA
-    async_add_entities(entities, True)
+    async_add_new_entities()
+    config_entry.async_on_unload(async_dispatcher_connect(hass, SIGNAL_NEW_ENTITIES, async_add_new_entities))
 
 
 class HomeConnectSwitch(HomeConnectEntity, SwitchEntity):
     """Switch class for Home Connect."""
 
-    def __init__(self, device, key, description) -> None:
+    def __init__(self, device, description) -> None:
         """Initialize the entity."""
-        super().__init__(device, description)
-        self._key = key
+        super().__init__(device, description.description)
+        self._key = description.key
         self._state = None
 
+        # resolve the handlers of the key once
+        if self._key == "BSH.Common.Start":
+            self._turn_on = self._async_start_program
+            self._turn_off = self._async_pause_program
+            self._update = self._update_program
+            self._watched_keys = frozenset(["BSH.Common.Status.OperationState"])
+        elif self._key in SETTING_SWITCH_KEYS:
+            self._turn_on = self._async_enable_setting
+            self._turn_off = self._async_disable_setting
+            self._update = self._update_setting
+            self._watched_keys = frozenset([self._key])
+        else:
+            self._turn_on = self._async_nothing
+            self._turn_off = self._async_nothing
+            self._update = self._update_nothing
+
     @property
     def is_on(self):
         """Return true if the switch is on."""
@@ -49,25 +103,7 @@ class HomeConnectSwitch(HomeConnectEntity, SwitchEntity):
         _LOGGER.debug("Tried to switch on %s", self.name)
 
         try:
-            # Start selected program if door is closed, remmote is enables and state is Ready or Finished
-            if self._key == "BSH.Common.Start" and self._device.appliance.status["BSH.Common.Status.RemoteControlStartAllowed"].get("value") and self._device.appliance.status["BSH.Common.Status.DoorState"].get("value") in ["BSH.Common.EnumType.DoorState.Closed", "BSH.Common.EnumType.DoorState.Locked"] and self._device.appliance.status["BSH.Common.Status.OperationState"].get("value") in ["BSH.Common.EnumType.OperationState.Ready", "BSH.Common.EnumType.OperationState.Finished"]:
-                program = self._device.appliance.status["BSH.Common.Root.SelectedProgram"].get("value")
-                await self.hass.async_add_executor_job(self._device.appliance.set_programs_active, program)
-            # Resume program if state is Pause
-            elif self._key == "BSH.Common.Start" and self._device.appliance.status["BSH.Common.Status.OperationState"].get("value") == "BSH.Common.EnumType.OperationState.Pause":
-                await self.hass.async_add_executor_job(self._device.appliance.set_command, "BSH.Common.Command.ResumeProgram")
-            elif self._key == "Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator", True)
-            elif self._key == "Refrigeration.FridgeFreezer.Setting.SuperModeFreezer":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.FridgeFreezer.Setting.SuperModeFreezer", True)
-            elif self._key == "Refrigeration.Common.Setting.EcoMode":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.Common.Setting.EcoMode", True)
-            elif self._key == "Refrigeration.Common.Setting.FreshMode":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.Common.Setting.FreshMode", True)
-            elif self._key == "Refrigeration.Common.Setting.SabbathMode":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.Common.Setting.SabbathMode", True)
-            elif self._key == "Refrigeration.Common.Setting.VacationMode":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.Common.Setting.VacationMode", True)
+            await self._turn_on()
         except HomeConnectError as err:
             _LOGGER.error("Error while trying to turn on device: %s", err)
             self._state = False
@@ -80,46 +116,49 @@ class HomeConnectSwitch(HomeConnectEntity, SwitchEntity):
         _LOGGER.debug("Tried to switch off %s", self.name)
 
         try:
-            # Pause program if state is Run
-            if self._key == "BSH.Common.Start" and self._device.appliance.status["BSH.Common.Status.OperationState"].get("value") == "BSH.Common.EnumType.OperationState.Run":
-                await self.hass.async_add_executor_job(self._device.appliance.set_command, "BSH.Common.Command.PauseProgram")
-            elif self._key == "Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator", False)
-            elif self._key == "Refrigeration.FridgeFreezer.Setting.SuperModeFreezer":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.FridgeFreezer.Setting.SuperModeFreezer", False)
-            elif self._key == "Refrigeration.Common.Setting.EcoMode":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.Common.Setting.EcoMode", False)
-            elif self._key == "Refrigeration.Common.Setting.FreshMode":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.Common.Setting.FreshMode", False)
-            elif self._key == "Refrigeration.Common.Setting.SabbathMode":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.Common.Setting.SabbathMode", False)
-            elif self._key == "Refrigeration.Common.Setting.VacationMode":
-                await self.hass.async_add_executor_job(self._device.appliance.set_setting_with_key, "Refrigeration.Common.Setting.VacationMode", False)
+            await self._turn_off()
         except HomeConnectError as err:  # pylint: disable=unused-variable
             _LOGGER.error("Error while trying to turn on device: %s", err)
             self._state = True
 
         self.async_entity_update()
 
-    async def async_update(self):
-        """Update the switch's status."""
+    async def _async_start_program(self):
+        """Start selected program if door is closed, remote is enabled and state is Ready or Finished. Resume program if state is Pause."""
+        status = self._device.appliance.status
+        operation_state = status["BSH.Common.Status.OperationState"].get("value")
+        if status["BSH.Common.Status.RemoteControlStartAllowed"].get("value") and status["BSH.Common.Status.DoorState"].get("value") in DOOR_CLOSED_STATES and operation_state in STARTABLE_OPERATION_STATES:
+            program = status["BSH.Common.Root.SelectedProgram"].get("value")
+            await self._device.commands.async_submit(self._device.appliance.set_programs_active, program)
+        elif operation_state == "BSH.Common.EnumType.OperationState.Pause":
+            await self._device.commands.async_submit(self._device.appliance.set_command, "BSH.Common.Command.ResumeProgram")
 
-        if self._key == "BSH.Common.Start" and self._device.appliance.status["BSH.Common.Status.OperationState"].get("value") in ["BSH.Common.EnumType.OperationState.Run", "BSH.Common.EnumType.OperationState.DelayedStart"]:
-            self._state = True
-        elif self._key == "BSH.Common.Start" and self._device.appliance.status["BSH.Common.Status.OperationState"].get("value") in ["BSH.Common.EnumType.OperationState.Ready", "BSH.Common.EnumType.OperationState.Finished", "BSH.Common.EnumType.OperationState.Pause", "BSH.Common.EnumType.OperationState.Inactive", "BSH.Common.EnumType.OperationState.ActionRequired", "BSH.Common.EnumType.OperationState.Error", "BSH.Common.EnumType.OperationState.Aborting"]:
-            self._state = False
-        elif self._key == "Refrigeration.FridgeFreezer.Setting.SuperModeFreezer":
-            self._state = self._device.appliance.status["Refrigeration.FridgeFreezer.Setting.SuperModeFreezer"].get("value")
-        elif self._key == "Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator":
-            self._state = self._device.appliance.status["Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator"].get("value")
-        elif self._key == "Refrigeration.Common.Setting.EcoMode":
-            self._state = self._device.appliance.status["Refrigeration.Common.Setting.EcoMode"].get("value")
-        elif self._key == "Refrigeration.Common.Setting.SabbathMode":
-            self._state = self._device.appliance.status["Refrigeration.Common.Setting.SabbathMode"].get("value")
-        elif self._key == "Refrigeration.Common.Setting.VacationMode":
-            self._state = self._device.appliance.status["Refrigeration.Common.Setting.VacationMode"].get("value")
-        elif self._key == "Refrigeration.Common.Setting.FreshMode":
-            self._state = self._device.appliance.status["Refrigeration.Common.Setting.FreshMode"].get("value")
-        else:
-            self._state = None
+    async def _async_pause_program(self):
+        """Pause program if state is Run."""
+        if self._device.appliance.status["BSH.Common.Status.OperationState"].get("value") == "BSH.Common.EnumType.OperationState.Run":
+            await self._device.commands.async_submit(self._device.appliance.set_command, "BSH.Common.Command.PauseProgram")
+
+    async def _async_enable_setting(self):
+        await self._device.commands.async_submit(self._device.appliance.set_setting_with_key, self._key, True)
+
+    async def _async_disable_setting(self):
+        await self._device.commands.async_submit(self._device.appliance.set_setting_with_key, self._key, False)
+
+    async def _async_nothing(self):
+        pass
+
+    def _update_program(self, status):
+        state = OPERATION_STATE_RUNNING.get(status["BSH.Common.Status.OperationState"].get("value"))
+        if state is not None:
+            self._state = state
+
+    def _update_setting(self, status):
+        self._state = status.get(self._key, {}).get("value")
+
+    def _update_nothing(self, status):
+        self._state = None
+
+    def update_state(self):
+        """Update the switch's status."""
+        self._update(self._device.appliance.status)
         # _LOGGER.debug("Updated, new state: %s", self._state)
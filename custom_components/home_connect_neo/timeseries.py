@@ -0,0 +1,127 @@
+"""Compact in-memory history of the numeric values of an appliance."""
+
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Dict, Optional
+
+
+class RingBuffer:
+    """Fixed number of samples with their monotonic times in two arrays of doubles. Appending overwrites the oldest sample."""
+
+    __slots__ = ("capacity", "_times", "_values", "_start", "_count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, at: float, value: float):
+        """Add a sample. Samples must be appended in the order of their times."""
+        if self._count < self.capacity:
+            index = (self._start + self._count) % self.capacity
+            self._count += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._times[index] = at
+        self._values[index] = value
+
+    def _ordered(self, data):
+        """Return the samples of `data` from the oldest to the newest."""
+        end = self._start + self._count
+        if end <= self.capacity:
+            return data[self._start : end]
+        return data[self._start :] + data[: end - self.capacity]
+
+    def window(self, since: float):
+        """Return the times and values of the samples taken at or after `since` as arrays."""
+        times = self._ordered(self._times)
+        first = bisect_left(times, since)
+        return times[first:], self._ordered(self._values)[first:]
+
+    def last(self):
+        """Return the time and value of the newest sample or None."""
+        if not self._count:
+            return None
+        index = (self._start + self._count - 1) % self.capacity
+        return self._times[index], self._values[index]
+
+    @property
+    def nbytes(self):
+        """Return the memory used by the samples."""
+        return (self._times.itemsize + self._values.itemsize) * self.capacity
+
+
+def summarize(times, values) -> Optional[Dict[str, float]]:
+    """Return minimum, maximum, mean and the least squares slope per second of the samples or None if there are none."""
+    count = len(values)
+    if not count:
+        return None
+    mean = sum(values) / count
+    slope = 0.0
+    if count > 1:
+        mean_time = sum(times) / count
+        variance = sum((at - mean_time) ** 2 for at in times)
+        if variance:
+            slope = sum((at - mean_time) * (value - mean) for at, value in zip(times, values)) / variance
+    return {"min": min(values), "max": max(values), "mean": mean, "slope": slope, "count": count}
+
+
+class History:
+    """Ring buffers of the numeric values of one appliance. At most `max_series` keys are kept, the least recently updated one is dropped first."""
+
+    def __init__(self, capacity: int, max_series: int):
+        self.capacity = capacity
+        self.max_series = max_series
+        self._series = OrderedDict()
+        self._lock = Lock()
+
+    def record(self, values: Dict[str, dict]):
+        """Append the numeric values of status items received now."""
+        with self._lock:
+            # taken with the lock held, so the samples of concurrent threads stay in order
+            at = monotonic()
+            for key, item in values.items():
+                value = item.get("value") if item else None
+                # bool is a subclass of int, but not a measurement
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                series = self._series.get(key)
+                if series is None:
+                    if len(self._series) >= self.max_series:
+                        self._series.popitem(last=False)
+                    series = self._series[key] = RingBuffer(self.capacity)
+                else:
+                    self._series.move_to_end(key)
+                series.append(at, value)
+
+    def window(self, key: str, since: float):
+        """Return the times and values of `key` since monotonic time `since`."""
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return array("d"), array("d")
+            return series.window(since)
+
+    def stats(self, key: str, since: float) -> Optional[Dict[str, float]]:
+        """Return minimum, maximum, mean and slope per second of `key` since monotonic time `since`."""
+        return summarize(*self.window(key, since))
+
+    def keys(self):
+        """Return the keys with a history."""
+        with self._lock:
+            return list(self._series)
+
+    @property
+    def nbytes(self):
+        """Return the memory used by the samples of all keys."""
+        with self._lock:
+            return sum(series.nbytes for series in self._series.values())
@@ -0,0 +1,172 @@
+"""Optional tracing of the latency of events from the socket to the Home Assistant state."""
+
+import json
+import logging
+import random
+import time
+from collections import deque
+from queue import Queue
+from threading import Thread
+from time import monotonic
+from .const import TRACE_BUFFER_SIZE
+
+_LOGGER = logging.getLogger("homeconnect.tracing")
+
+# Stages of an event in the order they are passed
+STAGES = ("received", "parsed", "applied", "dispatched", "written")
+
+
+class Trace:
+    """Monotonic timestamps of the stages of one event."""
+
+    __slots__ = ("name", "attributes", "marks")
+
+    def __init__(self, name, start, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.marks = {"received": start}
+
+    def __bool__(self):
+        return True
+
+    def mark(self, stage):
+        """Record the time a stage is passed. Repeated stages like the writes of several entities keep the first and the last time."""
+        now = monotonic()
+        if stage in self.marks:
+            self.marks[f"{stage}_last"] = now
+        else:
+            self.marks[stage] = now
+
+    def set(self, key, value):
+        """Add an attribute."""
+        self.attributes[key] = value
+
+    def as_dict(self):
+        """Return the durations of the stages in milliseconds since the event has been received."""
+        start = self.marks["received"]
+        return {"name": self.name, **self.attributes, **{stage: round((at - start) * 1000, 3) for stage, at in self.marks.items()}}
+
+
+class NullTrace:
+    """Trace of an event which is not sampled. Recording is a no-op."""
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def mark(self, stage):
+        """Ignore the stage."""
+
+    def set(self, key, value):
+        """Ignore the attribute."""
+
+
+NULL_TRACE = NullTrace()
+
+
+class TraceGroup:
+    """Traces of several events which are dispatched together. Stages are recorded in all of them."""
+
+    __slots__ = ("traces",)
+
+    def __init__(self, traces):
+        self.traces = traces
+
+    def __bool__(self):
+        return bool(self.traces)
+
+    def mark(self, stage):
+        """Record the time a stage is passed in every trace."""
+        for trace in self.traces:
+            trace.mark(stage)
+
+    def set(self, key, value):
+        """Add an attribute to every trace."""
+        for trace in self.traces:
+            trace.set(key, value)
+
+
+class FileExporter:
+    """Append finished traces as JSON lines to a file in a background thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self._queue = Queue()
+        Thread(target=self._run, name="homeconnect-trace-exporter", daemon=True).start()
+
+    def export(self, trace):
+        """Queue a trace for writing."""
+        self._queue.put({"time": time.time(), **trace.as_dict()})
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            try:
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(record) + "\n")
+                    # write everything queued meanwhile with the same open file
+                    while not self._queue.empty():
+                        file.write(json.dumps(self._queue.get()) + "\n")
+            except OSError as err:
+                _LOGGER.error("Failed writing trace to %s: %s", self.path, err)
+
+
+class Tracer:
+    """Sample events into traces and keep the finished ones in a ring buffer. Disabled while the sample rate is 0."""
+
+    def __init__(self):
+        self.sample_rate = 0.0
+        self.finished = deque(maxlen=TRACE_BUFFER_SIZE)
+        self.exporter = None
+
+    def configure(self, sample_rate, buffer_size=TRACE_BUFFER_SIZE, path=None):
+        """Set the fraction of traced events, the number of kept traces and an optional file to export them to."""
+        self.sample_rate = sample_rate
+        self.finished = deque(self.finished, maxlen=buffer_size)
+        self.exporter = FileExporter(path) if path else None
+
+    def start(self, name, received, **attributes):
+        """Return a new trace of an event received at monotonic time `received` or `NULL_TRACE` if the event is not sampled."""
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return NULL_TRACE
+        return Trace(name, received, attributes)
+
+    def finish(self, trace):
+        """Keep a finished trace."""
+        if not trace:
+            return
+        self.finished.append(trace)
+        if self.exporter is not None:
+            self.exporter.export(trace)
+
+    def report(self):
+        """Return the latency breakdown of the kept traces: count, mean, median, 95th percentile and maximum in milliseconds of every step between two stages."""
+        steps = {}
+        for trace in list(self.finished):
+            marks = trace.marks
+            passed = [stage for stage in STAGES if stage in marks]
+            for previous, stage in zip(passed, passed[1:]):
+                steps.setdefault(f"{previous}-{stage}", []).append(marks[stage] - marks[previous])
+            if "written_last" in marks:
+                steps.setdefault("written-written_last", []).append(marks["written_last"] - marks["written"])
+            if passed:
+                steps.setdefault("total", []).append(max(marks.values()) - marks["received"])
+            if "cloud" in trace.attributes:
+                steps.setdefault("cloud", []).append(trace.attributes["cloud"])
+
+        report = {}
+        for step, durations in steps.items():
+            durations.sort()
+            report[step] = {
+                "count": len(durations),
+                "mean": round(sum(durations) / len(durations) * 1000, 3),
+                "p50": round(durations[len(durations) // 2] * 1000, 3),
+                "p95": round(durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000, 3),
+                "max": round(durations[-1] * 1000, 3),
+            }
+        return report
+
+
+# Tracer of all appliances of all accounts
+tracer = Tracer()
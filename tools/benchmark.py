@@ -0,0 +1,957 @@
+"""Reproducible benchmarks of the Home Connect library and the Home Assistant platforms.
+
+Scenarios:
+    sse_parse       events per second parsed by SSEClient from an in-memory stream
+    listen_apply    events per second applied to the status by HomeConnectAppliance._listen
+    fanout          entity callbacks per second when N appliances receive events (needs homeassistant)
+    entity_cost     memory per entity and CPU time per event and per entity update of the entities of N appliances
+                    (needs homeassistant)
+    throttle        recorded state writes per program run of the sensors with and without the throttle policies, replaying
+                    program runs of the stand-in appliances in compressed time (needs homeassistant)
+    handoff         event loop wakeups and dispatches per event when the listener threads of N appliances hand over bursts
+    replay          latency from the listener thread to the entity state and event loop tasks created per event when
+                    the listener threads of N appliances replay a high-rate recording of program runs (needs homeassistant)
+    bulk            wall time of writing to N appliances concurrently like the bulk services and one after another
+                    against the local stand-in server with a simulated round trip time (needs homeassistant)
+    detection       seconds until silently stalled event streams of the local stand-in server are detected and how many
+                    took longer than the read deadline derived from the KEEP-ALIVE cadence plus a margin
+    cold_start      seconds to list and fetch the properties of N appliances from the local stand-in server
+    rest_refresh    median and 95th percentile latency of a status refresh against the local stand-in server
+    reload          teardown time and leaked threads, file descriptors and memory after repeatedly starting and
+                    stopping the event streams of N appliances against the local stand-in server
+    entry_reload    reload time and leaked threads, file descriptors and memory after repeatedly reloading a config
+                    entry of the integration in Home Assistant against the local stand-in server, and failed writes
+                    of the bulk_setting service example with typed values (needs homeassistant)
+
+The library modules are loaded without the package __init__, so all scenarios but fanout run without Home Assistant.
+Usage:
+
+    python tools/benchmark.py --output results.json
+    python tools/benchmark.py --baseline results.json --tolerance 0.15
+
+The exit code is 1 if a result is worse than the baseline by more than the tolerance or exceeds its budget, e.g. a
+leaked thread.
+"""
+
+import argparse
+import asyncio
+import gc
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import tempfile
+import tracemalloc
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+COMPONENT = ROOT / "custom_components" / "home_connect_neo"
+
+# The stand-in server does not speak TLS
+os.environ.setdefault("OAUTHLIB_INSECURE_TRANSPORT", "1")
+
+# Leaks are flagged if they exceed these counts, whatever the baseline. The interpreter and Home Assistant might keep a
+# few files open which were first opened during the measurement, e.g. databases of lazily imported modules.
+LEAKED_FDS_BUDGET = 2
+# Events are dispatched by callbacks, a task per event would be a regression even against a baseline of 0
+TASKS_PER_EVENT_BUDGET = 0.05
+# Memory kept by every reload after the first half of the reloads, warm-up allocations like caches are made before it
+MEMORY_PER_RELOAD_BUDGET_KB = 1.0
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import fake_home_connect  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def load_package():
+    """Import the modules of the integration without running its __init__, which needs Home Assistant."""
+    if "home_connect_neo" not in sys.modules:
+        package = types.ModuleType("home_connect_neo")
+        package.__path__ = [str(COMPONENT)]
+        sys.modules["home_connect_neo"] = package
+    return sys.modules["home_connect_neo"]
+
+
+def notify(ha_id, remaining):
+    """Return the data of a NOTIFY event with program times."""
+    return json.dumps(
+        {
+            "items": [
+                {"timestamp": 0, "handling": "none", "uri": f"/api/homeappliances/{ha_id}/programs/active/options/BSH.Common.Option.RemainingProgramTime", "key": "BSH.Common.Option.RemainingProgramTime", "value": remaining, "unit": "seconds", "level": "hint"},
+                {"timestamp": 0, "handling": "none", "uri": f"/api/homeappliances/{ha_id}/programs/active/options/BSH.Common.Option.ProgramProgress", "key": "BSH.Common.Option.ProgramProgress", "value": 100 - remaining // 72, "unit": "%", "level": "hint"},
+            ],
+            "haId": ha_id,
+        }
+    )
+
+
+def new_hass(cls):
+    """Return a Home Assistant instance of the installed version on the running event loop."""
+    try:
+        return cls(str(ROOT))
+    except TypeError:
+        return cls()  # pylint: disable=no-value-for-parameter
+
+
+def best_of(repeat, run):
+    """Return the best result of several runs, which is the least disturbed by other processes."""
+    return max(run() for _ in range(repeat))
+
+
+# ---- Scenarios ----
+
+
+def bench_sse_parse(args):
+    """Parse a stream of NOTIFY and KEEP-ALIVE events."""
+    load_package()
+    from home_connect_neo.sseclient import SSEClient  # pylint: disable=import-outside-toplevel
+
+    frames = []
+    for index in range(args.events):
+        if index % 10 == 9:
+            frames.append("event: KEEP-ALIVE\ndata: \n\n")
+        else:
+            frames.append(f"event: NOTIFY\ndata: {notify('BENCH', index % 7200)}\nid: BENCH\n\n")
+    payload = "".join(frames).encode()
+
+    class Response:
+        encoding = "utf-8"
+
+        def __init__(self):
+            self.raw = io.BytesIO(payload)
+
+        def raise_for_status(self):
+            pass
+
+        def close(self):
+            pass
+
+    class Session:
+        def get(self, url, **kwargs):
+            return Response()
+
+    def run():
+        client = SSEClient("http://bench/events", session=Session(), chunk_size=1024)
+        start = time.perf_counter()
+        for _ in itertools.islice(client, args.events):
+            pass
+        return args.events / (time.perf_counter() - start)
+
+    return {"events_per_s": {"value": best_of(args.repeat, run), "unit": "1/s", "better": "higher"}}
+
+
+def bench_listen_apply(args):
+    """Apply parsed events to the status of an appliance."""
+    load_package()
+    from home_connect_neo.homeconnect import HomeConnectAppliance, liveness_scheduler  # pylint: disable=import-outside-toplevel
+    from home_connect_neo.sseclient import Event  # pylint: disable=import-outside-toplevel
+
+    class Stream(list):
+        received_at = time.monotonic()
+
+    events = Stream(Event(notify("BENCH", index % 7200), "NOTIFY") for index in range(args.events))
+    calls = []
+
+    def run():
+        appliance = HomeConnectAppliance(None, "BENCH", type="Washer", connected=True)
+        start = time.perf_counter()
+        appliance._listen(events, lambda *callback_args: calls.append(1))  # pylint: disable=protected-access
+        elapsed = time.perf_counter() - start
+        liveness_scheduler.cancel(appliance)
+        return args.events / elapsed
+
+    return {"events_per_s": {"value": best_of(args.repeat, run), "unit": "1/s", "better": "higher"}}
+
+
+def bench_fanout(args):
+    """Dispatch events of N appliances to all entities of all appliances through the Home Assistant dispatcher."""
+    try:
+        from homeassistant.core import HomeAssistant  # pylint: disable=import-outside-toplevel, import-error
+        from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send  # pylint: disable=import-outside-toplevel, import-error
+    except ImportError:
+        return None
+
+    load_package()
+    # pylint: disable=import-outside-toplevel
+    from home_connect_neo.binary_sensor import HomeConnectBinarySensor
+    from home_connect_neo.const import SIGNAL_UPDATE_ENTITIES
+    from home_connect_neo.device import APPLIANCE_TYPES
+    from home_connect_neo.homeconnect import HomeConnectAppliance
+    from home_connect_neo.light import HomeConnectLight
+    from home_connect_neo.sensor import HomeConnectSensor
+    from home_connect_neo.switch import HomeConnectSwitch
+
+    async def run_async():
+        hass = new_hass(HomeAssistant)
+
+        writes = [0]
+
+        def write():
+            writes[0] += 1
+
+        types_ = list(APPLIANCE_TYPES.items())
+        devices, entities = [], []
+        for index in range(args.appliances):
+            appliance_type, cls = types_[index % len(types_)]
+            device = cls(hass, HomeConnectAppliance(None, f"BENCH-{index}", type=appliance_type, connected=True))
+            devices.append(device)
+            for platform_cls, descriptions in ((HomeConnectBinarySensor, device.get_binary_sensors()), (HomeConnectSensor, device.get_sensors()), (HomeConnectSwitch, device.get_switches()), (HomeConnectLight, device.get_lights())):
+                for description in descriptions:
+                    entity = platform_cls(device, description)
+                    entity.hass = hass
+                    entity.entity_id = f"sensor.bench_{len(entities)}"
+                    # the state machine of Home Assistant is not part of the benchmark
+                    entity.async_write_ha_state = write
+                    async_dispatcher_connect(hass, SIGNAL_UPDATE_ENTITIES, entity._update_callback)  # pylint: disable=protected-access
+                    entities.append(entity)
+
+        rounds = max(1, args.events // len(devices))
+        start = time.perf_counter()
+        for remaining in range(rounds):
+            for device in devices:
+                data = json.loads(notify(device.appliance.haId, 7200 - remaining))
+                keys = device.appliance.json2dict(data["items"])
+                device.appliance._apply_event(keys)  # pylint: disable=protected-access
+                async_dispatcher_send(hass, SIGNAL_UPDATE_ENTITIES, device.appliance.haId, set(keys))
+        elapsed = time.perf_counter() - start
+        await hass.async_stop(force=True)
+        return rounds * len(devices) / elapsed, writes[0] / (rounds * len(devices)), len(entities)
+
+    results = [asyncio.run(run_async()) for _ in range(args.repeat)]
+    events_per_s, writes_per_event, entities = max(results)
+    return {
+        "events_per_s": {"value": events_per_s, "unit": "1/s", "better": "higher"},
+        "writes_per_event": {"value": writes_per_event, "unit": "1", "better": "lower"},
+        "entities": {"value": entities, "unit": "1", "better": None},
+    }
+
+
+def bench_entity_cost(args):
+    """Memory of the entities of N appliances and CPU time of dispatching events to them."""
+    try:
+        import homeassistant.config_entries  # noqa: F401  pylint: disable=import-outside-toplevel, import-error, unused-import
+        from homeassistant.core import HomeAssistant  # pylint: disable=import-outside-toplevel, import-error
+        from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send  # pylint: disable=import-outside-toplevel, import-error
+    except ImportError:
+        return None
+
+    load_package()
+    # pylint: disable=import-outside-toplevel
+    from home_connect_neo.binary_sensor import HomeConnectBinarySensor
+    from home_connect_neo.const import SIGNAL_UPDATE_ENTITIES
+    from home_connect_neo.device import APPLIANCE_TYPES
+    from home_connect_neo.homeconnect import HomeConnectAppliance
+    from home_connect_neo.light import HomeConnectLight
+    from home_connect_neo.sensor import HomeConnectSensor
+    from home_connect_neo.switch import HomeConnectSwitch
+
+    async def run_async():
+        hass = new_hass(HomeAssistant)
+        types_ = list(APPLIANCE_TYPES.items())
+        devices = []
+        for index in range(args.appliances):
+            appliance_type, cls = types_[index % len(types_)]
+            devices.append(cls(hass, HomeConnectAppliance(None, f"BENCH-{index}", type=appliance_type, connected=True)))
+
+        gc.collect()
+        tracemalloc.start()
+        memory = tracemalloc.get_traced_memory()[0]
+        entities = []
+        for device in devices:
+            for platform_cls, descriptions in ((HomeConnectBinarySensor, device.get_binary_sensors()), (HomeConnectSensor, device.get_sensors()), (HomeConnectSwitch, device.get_switches()), (HomeConnectLight, device.get_lights())):
+                for description in descriptions:
+                    entity = platform_cls(device, description)
+                    entity.hass = hass
+                    entity.entity_id = f"sensor.bench_{len(entities)}"
+                    # the state machine of Home Assistant is not part of the benchmark
+                    entity.async_write_ha_state = lambda: None
+                    async_dispatcher_connect(hass, SIGNAL_UPDATE_ENTITIES, entity._update_callback)  # pylint: disable=protected-access
+                    entities.append(entity)
+        gc.collect()
+        per_entity = (tracemalloc.get_traced_memory()[0] - memory) / len(entities)
+        tracemalloc.stop()
+
+        # the entities which compute their state from the keys of an event, whether it's written or throttled
+        keys = {"BSH.Common.Option.RemainingProgramTime", "BSH.Common.Option.ProgramProgress"}
+        updates_per_round = sum(not entity._watched_keys.isdisjoint(keys) for entity in entities)  # pylint: disable=protected-access
+        rounds = max(1, args.events // len(devices))
+        start = time.process_time()
+        for remaining in range(rounds):
+            for device in devices:
+                data = json.loads(notify(device.appliance.haId, 7200 - remaining))
+                keys = device.appliance.json2dict(data["items"])
+                device.appliance._apply_event(keys)  # pylint: disable=protected-access
+                async_dispatcher_send(hass, SIGNAL_UPDATE_ENTITIES, device.appliance.haId, set(keys))
+        cpu = time.process_time() - start
+        await hass.async_stop(force=True)
+        return -cpu / (rounds * len(devices)), -cpu / max(rounds * updates_per_round, 1), per_entity
+
+    cpu_per_event, cpu_per_update, per_entity = max(asyncio.run(run_async()) for _ in range(args.repeat))
+    return {
+        "cpu_us_per_event": {"value": -cpu_per_event * 1e6, "unit": "us", "better": "lower"},
+        "cpu_us_per_update": {"value": -cpu_per_update * 1e6, "unit": "us", "better": "lower"},
+        "memory_per_entity_b": {"value": per_entity, "unit": "B", "better": "lower"},
+    }
+
+
+def bench_throttle(args):
+    """Replay program runs of the stand-in appliances in compressed time and count the state writes of the sensors with and without throttling."""
+    try:
+        # imported first like Home Assistant does, the entity helpers import it circularly
+        import homeassistant.config_entries  # noqa: F401  pylint: disable=import-outside-toplevel, import-error, unused-import
+        from homeassistant.core import HomeAssistant  # pylint: disable=import-outside-toplevel, import-error
+    except ImportError:
+        return None
+
+    load_package()
+    # pylint: disable=import-outside-toplevel
+    from home_connect_neo.device import APPLIANCE_TYPES
+    from home_connect_neo.homeconnect import HomeConnectAppliance
+    from home_connect_neo.sensor import THROTTLE_POLICIES, HomeConnectSensor, ThrottlePolicy
+
+    programs = {"Washer": "LaundryCare.Washer.Program.Mix", "Dishwasher": "Dishcare.Dishwasher.Program.Quick45", "Dryer": "LaundryCare.Dryer.Program.Synthetic"}
+    speed = args.replay_speed
+    # the appliances report the program times every few seconds of program time
+    tick = 10
+
+    async def replay(policies):
+        hass = new_hass(HomeAssistant)
+        writes = [0]
+
+        def write():
+            writes[0] += 1
+
+        runs = []
+        for index, (appliance_type, program) in enumerate(programs.items()):
+            virtual = fake_home_connect.VirtualAppliance(index, appliance_type)
+            device = APPLIANCE_TYPES[appliance_type](hass, HomeConnectAppliance(None, virtual.ha_id, type=appliance_type, connected=True))
+            sensors = []
+            for description in device.get_sensors():
+                sensor = HomeConnectSensor(device, description, policies)
+                sensor.hass = hass
+                sensor.entity_id = f"sensor.bench_{index}_{len(sensors)}"
+                # the state machine of Home Assistant is not part of the benchmark
+                sensor.async_write_ha_state = write
+                sensors.append(sensor)
+            runs.append((virtual, device, sensors, virtual.start(program)))
+
+        while runs:
+            following = []
+            for virtual, device, sensors, events in runs:
+                for _, items in events:
+                    keys = device.appliance.json2dict(items)
+                    device.appliance._apply_event(keys)  # pylint: disable=protected-access
+                    for sensor in sensors:
+                        sensor._update_callback(device.appliance.haId, set(keys))  # pylint: disable=protected-access
+                if virtual.active is not None:
+                    following.append((virtual, device, sensors, virtual.tick(tick, 0, 0)))
+            runs = following
+            await asyncio.sleep(tick / speed)
+        # let the held back values be written
+        await asyncio.sleep(max((policy.min_interval for policy in policies.values()), default=0) + 0.05)
+        await hass.async_stop(force=True)
+        return writes[0] / len(programs)
+
+    # time is compressed by the replay speed, so are the intervals of the policies
+    scaled = {key: ThrottlePolicy(policy.min_interval / speed, policy.min_delta, policy.min_relative_delta) for key, policy in THROTTLE_POLICIES.items()}
+    unthrottled = asyncio.run(replay({}))
+    throttled = asyncio.run(replay(scaled))
+    return {
+        "writes_per_run": {"value": throttled, "unit": "1", "better": "lower"},
+        "unthrottled_writes_per_run": {"value": unthrottled, "unit": "1", "better": None},
+        "saved": {"value": 1 - throttled / unthrottled if unthrottled else 0, "unit": "1", "better": "higher"},
+    }
+
+
+def bench_handoff(args):
+    """Hand bursts of events of several listener threads over to the event loop."""
+    load_package()
+    from home_connect_neo.handoff import EventHandoff  # pylint: disable=import-outside-toplevel
+    from home_connect_neo.metrics import metrics  # pylint: disable=import-outside-toplevel
+
+    class Target:
+        def __init__(self):
+            self.dispatches = 0
+            self.events = 0
+
+        def async_dispatch(self, keys, traces, events):
+            self.dispatches += 1
+            self.events += events
+
+    listeners = min(args.appliances, 20)
+    per_listener = max(1, args.events // listeners)
+    burst = 20
+
+    def listen(handoff, target):
+        for index in range(per_listener):
+            handoff.submit(target, {f"BENCH.Option.{index % 8}"})
+            # a settings dump or a progress burst, then a pause until the next one
+            if index % burst == burst - 1:
+                time.sleep(0.001)
+
+    async def run_async():
+        handoff = EventHandoff(asyncio.get_running_loop())
+        targets = [Target() for _ in range(listeners)]
+        wakeups = metrics.total("handoff.wakeups")
+        threads = [threading.Thread(target=listen, args=(handoff, target)) for target in targets]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        while sum(target.events for target in targets) < listeners * per_listener:
+            await asyncio.sleep(0.0005)
+        elapsed = time.perf_counter() - start
+        for thread in threads:
+            thread.join()
+        events = listeners * per_listener
+        return events / elapsed, (metrics.total("handoff.wakeups") - wakeups) / events, sum(target.dispatches for target in targets) / events
+
+    events_per_s, wakeups_per_event, dispatches_per_event = max(asyncio.run(run_async()) for _ in range(args.repeat))
+    return {
+        "events_per_s": {"value": events_per_s, "unit": "1/s", "better": "higher"},
+        "wakeups_per_event": {"value": wakeups_per_event, "unit": "1", "better": "lower"},
+        "dispatches_per_event": {"value": dispatches_per_event, "unit": "1", "better": "lower"},
+    }
+
+
+def bench_replay(args):
+    """Replay a high-rate recording of program runs from listener threads through the handoff and the dispatcher to the entities."""
+    try:
+        import homeassistant.config_entries  # noqa: F401  pylint: disable=import-outside-toplevel, import-error, unused-import
+        from homeassistant.core import HomeAssistant  # pylint: disable=import-outside-toplevel, import-error
+        from homeassistant.helpers.dispatcher import async_dispatcher_connect  # pylint: disable=import-outside-toplevel, import-error
+    except ImportError:
+        return None
+
+    load_package()
+    # pylint: disable=import-outside-toplevel
+    from home_connect_neo.binary_sensor import HomeConnectBinarySensor
+    from home_connect_neo.const import SIGNAL_UPDATE_ENTITIES
+    from home_connect_neo.device import APPLIANCE_TYPES
+    from home_connect_neo.handoff import EventHandoff
+    from home_connect_neo.homeconnect import HomeConnectAppliance
+    from home_connect_neo.light import HomeConnectLight
+    from home_connect_neo.metrics import metrics
+    from home_connect_neo.sensor import HomeConnectSensor
+    from home_connect_neo.switch import HomeConnectSwitch
+    from home_connect_neo.tracing import tracer
+
+    listeners = min(args.appliances, 20)
+    per_listener = max(1, args.events // listeners)
+    types_ = ["Washer", "Dryer", "Dishwasher", "Oven"]
+
+    def record(virtual):
+        """Return the data of the events of program runs with a progress update every program second."""
+        events = []
+        while len(events) < per_listener:
+            if virtual.active is None:
+                produced = virtual.start(next(iter(virtual.spec["programs"])))
+            else:
+                produced = virtual.tick(1, 0, 0)
+            events.extend((event, json.dumps({"items": items, "haId": virtual.ha_id})) for event, items in produced)
+        return events[:per_listener]
+
+    def listen(device, recording):
+        appliance = device.appliance
+        # bursts of the recording are replayed at the selected rate
+        burst = 10
+        for index, (name, data) in enumerate(recording):
+            trace = tracer.start(name, time.monotonic(), appliance=appliance.haId)
+            keys = appliance.json2dict(json.loads(data)["items"])
+            appliance._apply_event(keys)  # pylint: disable=protected-access
+            trace.mark("applied")
+            device.event_callback(appliance, set(keys), trace)
+            if index % burst == burst - 1:
+                time.sleep(burst / args.rate)
+
+    async def run_async():
+        hass = new_hass(HomeAssistant)
+        loop = asyncio.get_running_loop()
+        tasks = [0]
+
+        def task_factory(loop, coro):
+            tasks[0] += 1
+            return asyncio.Task(coro, loop=loop)
+
+        handoff = EventHandoff(loop)
+        devices, recordings = [], []
+        for index in range(listeners):
+            virtual = fake_home_connect.VirtualAppliance(index, types_[index % len(types_)])
+            device = APPLIANCE_TYPES[virtual.type](hass, HomeConnectAppliance(None, virtual.ha_id, type=virtual.type, connected=True))
+            device.handoff = handoff
+            device.was_connected = True
+            devices.append(device)
+            recordings.append(record(virtual))
+            for platform_cls, descriptions in ((HomeConnectBinarySensor, device.get_binary_sensors()), (HomeConnectSensor, device.get_sensors()), (HomeConnectSwitch, device.get_switches()), (HomeConnectLight, device.get_lights())):
+                for description in descriptions:
+                    entity = platform_cls(device, description)
+                    entity.hass = hass
+                    entity.entity_id = f"sensor.bench_{index}_{id(entity)}"
+                    # the state machine of Home Assistant is not part of the benchmark
+                    entity.async_write_ha_state = lambda: None
+                    async_dispatcher_connect(hass, SIGNAL_UPDATE_ENTITIES, entity._update_callback)  # pylint: disable=protected-access
+
+        events = listeners * per_listener
+        tracer.configure(1.0, events)
+        tracer.finished.clear()
+        wakeups = metrics.total("handoff.wakeups")
+        loop.set_task_factory(task_factory)
+        threads = [threading.Thread(target=listen, args=(device, recording)) for device, recording in zip(devices, recordings)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        while len(tracer.finished) < events and any(thread.is_alive() for thread in threads):
+            await asyncio.sleep(0.01)
+        for thread in threads:
+            thread.join()
+        await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        loop.set_task_factory(None)
+        total = tracer.report()["total"]
+        tracer.configure(0.0)
+        await hass.async_stop(force=True)
+        return events / elapsed, total["p50"], total["p95"], tasks[0] / events, (metrics.total("handoff.wakeups") - wakeups) / events
+
+    events_per_s, p50, p95, tasks_per_event, wakeups_per_event = asyncio.run(run_async())
+    return {
+        "events_per_s": {"value": events_per_s, "unit": "1/s", "better": "higher"},
+        "latency_p50_ms": {"value": p50, "unit": "ms", "better": "lower"},
+        "latency_p95_ms": {"value": p95, "unit": "ms", "better": "lower"},
+        "tasks_per_event": {"value": tasks_per_event, "unit": "1", "better": "lower", "budget": TASKS_PER_EVENT_BUDGET},
+        "wakeups_per_event": {"value": wakeups_per_event, "unit": "1", "better": "lower"},
+    }
+
+
+class StandIn:
+    """Local stand-in server in a background thread."""
+
+    def __init__(self, appliances, *options):
+        arguments = fake_home_connect.parse_args(["--port", "0", "--appliances", str(appliances), "--rate-limit", "0", "--disconnect-probability", "0", "--start-probability", "0", *options])
+        self.fake = fake_home_connect.FakeHomeConnect(arguments)
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(asyncio.start_server(self.fake.handle, "127.0.0.1", 0, backlog=1024))
+        self.url = "http://127.0.0.1:{}".format(self.server.sockets[0].getsockname()[1])
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def token(self):
+        """Return a token issued by the OAuth endpoints."""
+        _status, _payload, headers = self.fake.authorize({"redirect_uri": ["http://bench/"], "state": ["bench"]})
+        code = headers["Location"].split("code=")[1].split("&")[0]
+        _status, token, _headers = self.fake.token({"grant_type": ["authorization_code"], "code": [code]})
+        token["expires_at"] = time.time() + token["expires_in"]
+        return token
+
+    def close(self):
+        """Stop the server and the connections kept alive by the clients."""
+
+        async def shutdown():
+            self.server.close()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop)
+        self.thread.join()
+        self.loop.close()
+
+
+def bench_cold_start(args, stand_in):
+    """List the appliances and fetch the properties of each one like the setup of the integration."""
+    load_package()
+    from home_connect_neo.homeconnect import HomeConnectAPI  # pylint: disable=import-outside-toplevel
+
+    def run():
+        api = HomeConnectAPI(token=stand_in.token())
+        api.host = stand_in.url
+        requests_before = stand_in.fake.counts["requests"]
+        start = time.perf_counter()
+        for appliance in api.get_appliances():
+            appliance.update_properties()
+        return -(time.perf_counter() - start), stand_in.fake.counts["requests"] - requests_before
+
+    # the best run is the shortest
+    elapsed, requests = max(run() for _ in range(args.repeat))
+    return {
+        "seconds": {"value": -elapsed, "unit": "s", "better": "lower"},
+        "requests": {"value": requests, "unit": "1", "better": "lower"},
+    }
+
+
+def bench_bulk(args):
+    """Write a setting to every appliance concurrently like the bulk services and one after another like single service calls."""
+    try:
+        from homeassistant.core import HomeAssistant  # pylint: disable=import-outside-toplevel, import-error
+    except ImportError:
+        return None
+
+    load_package()
+    # pylint: disable=import-outside-toplevel
+    from home_connect_neo.command import CommandQueue
+    from home_connect_neo.const import MAX_CONCURRENT_REQUESTS
+    from home_connect_neo.homeconnect import HomeConnectAPI
+
+    stand_in = StandIn(args.appliances, "--latency", str(args.latency))
+    api = HomeConnectAPI(token=stand_in.token())
+    api.host = stand_in.url
+    appliances = api.get_appliances()
+    writes = [("BSH.Common.Setting.PowerState", "BSH.Common.EnumType.PowerState.On")] * 2
+
+    async def run_async():
+        hass = new_hass(HomeAssistant)
+        limiter = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        queues = []
+        for appliance in appliances:
+            queue = CommandQueue(hass, appliance)
+            queue.limiter = limiter
+            queues.append(queue)
+
+        async def write_all(queue):
+            for key, value in writes:
+                await queue.async_submit(queue.appliance.set_setting_with_key, key, value)
+
+        start = time.perf_counter()
+        for queue in queues:
+            await write_all(queue)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*[write_all(queue) for queue in queues])
+        bulk = time.perf_counter() - start
+        return -bulk, sequential
+
+    bulk, sequential = max(asyncio.run(run_async()) for _ in range(args.repeat))
+    stand_in.close()
+    return {
+        "sequential_s": {"value": sequential, "unit": "s", "better": "lower"},
+        "bulk_s": {"value": -bulk, "unit": "s", "better": "lower"},
+        "speedup": {"value": sequential / -bulk, "unit": "x", "better": "higher"},
+    }
+
+
+def bench_detection(args):
+    """Silently stall the event streams of the stand-in server and measure the time until the loss is detected."""
+    load_package()
+    # pylint: disable=import-outside-toplevel
+    from home_connect_neo.homeconnect import HomeConnectAPI
+    from home_connect_neo.metrics import metrics
+
+    keep_alive = 1.0
+    stand_in = StandIn(min(args.appliances, 10), "--keep-alive", str(keep_alive))
+    api = HomeConnectAPI(token=stand_in.token())
+    api.host = stand_in.url
+    appliances = api.get_appliances()
+    for appliance in appliances:
+        appliance.read_deadline_min = 1
+        appliance.listen_events()
+    # the read deadline follows the KEEP-ALIVE cadence after two of them
+    time.sleep(3 * keep_alive)
+    bound = max(appliances[0].read_deadline_factor * keep_alive, appliances[0].read_deadline_min) + args.detection_margin
+
+    def detections(appliance):
+        return sum(metric.count for metric in metrics.find("stream.detection_time", appliance=appliance.haId))
+
+    times = []
+    for _ in range(args.repeat):
+        before = {appliance.haId: detections(appliance) for appliance in appliances}
+        start = time.monotonic()
+        for appliance in appliances:
+            stand_in.loop.call_soon_threadsafe(stand_in.fake.stall, appliance.haId)
+        pending = set(before)
+        while pending and time.monotonic() - start < 10 * bound:
+            for appliance in appliances:
+                if appliance.haId in pending and detections(appliance) > before[appliance.haId]:
+                    pending.discard(appliance.haId)
+                    times.append(time.monotonic() - start)
+            time.sleep(0.01)
+        times.extend([float("inf")] * len(pending))
+        # wait for the new connections and their KEEP-ALIVE cadence
+        time.sleep(3 * keep_alive)
+
+    for appliance in appliances:
+        appliance.stop()
+    for appliance in appliances:
+        appliance.join(5)
+    stand_in.close()
+    times.sort()
+    return {
+        "max_s": {"value": times[-1], "unit": "s", "better": "lower"},
+        "p50_s": {"value": times[len(times) // 2], "unit": "s", "better": "lower"},
+        "missed_bound": {"value": sum(1 for value in times if value > bound), "unit": "1", "better": "lower", "budget": 0},
+    }
+
+
+def bench_rest_refresh(args, stand_in):
+    """Refresh the status of every appliance and measure the latency."""
+    load_package()
+    from home_connect_neo.homeconnect import HomeConnectAPI  # pylint: disable=import-outside-toplevel
+
+    api = HomeConnectAPI(token=stand_in.token())
+    api.host = stand_in.url
+    appliances = api.get_appliances()
+    latencies = []
+    for _ in range(args.repeat):
+        for appliance in appliances:
+            start = time.perf_counter()
+            appliance.update_status()
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "p50_ms": {"value": latencies[len(latencies) // 2] * 1000, "unit": "ms", "better": "lower"},
+        "p95_ms": {"value": latencies[int(len(latencies) * 0.95)] * 1000, "unit": "ms", "better": "lower"},
+    }
+
+
+def open_fds():
+    """Return the number of open file descriptors of this process or None if it can't be determined."""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def traced_memory():
+    """Return the memory traced by tracemalloc without the stand-in server, its reads in flight would add noise."""
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, fake_home_connect.__file__), tracemalloc.Filter(False, asyncio.selector_events.__file__)))
+    return sum(trace.size for trace in snapshot.traces)
+
+
+def bench_reload(args, stand_in):
+    """Start and stop listening to the events of all appliances like reloading the integration."""
+    load_package()
+    from home_connect_neo.homeconnect import HomeConnectAPI  # pylint: disable=import-outside-toplevel
+
+    api = HomeConnectAPI(token=stand_in.token())
+    api.host = stand_in.url
+    appliances = api.get_appliances()
+
+    def cycle():
+        for appliance in appliances:
+            appliance.listen_events()
+        start = time.perf_counter()
+        for appliance in appliances:
+            appliance.stop()
+        stopped = all(appliance.join(5) for appliance in appliances)
+        return time.perf_counter() - start, stopped
+
+    # the first cycle opens the pooled connections and imports lazily loaded modules
+    cycle()
+    # objects of earlier scenarios, e.g. closed event loops, release their files when they are collected
+    gc.collect()
+    threads, fds = threading.active_count(), open_fds()
+    tracemalloc.start()
+    memory = traced_memory()
+    durations = []
+    failures = 0
+    for reload in range(args.reloads):
+        if reload == args.reloads // 2:
+            halfway = traced_memory()
+        duration, stopped = cycle()
+        durations.append(duration)
+        failures += not stopped
+    growth = traced_memory() - memory
+    per_reload = (memory + growth - halfway) / (args.reloads - args.reloads // 2)
+    tracemalloc.stop()
+    durations.sort()
+    return {
+        "teardown_p95_ms": {"value": durations[int(len(durations) * 0.95)] * 1000, "unit": "ms", "better": "lower"},
+        "not_stopped": {"value": failures, "unit": "1", "better": "lower", "budget": 0},
+        "leaked_threads": {"value": threading.active_count() - threads, "unit": "1", "better": "lower", "budget": 0},
+        "leaked_fds": {"value": open_fds() - fds if fds is not None else 0, "unit": "1", "better": "lower", "budget": LEAKED_FDS_BUDGET},
+        "memory_growth_kb": {"value": growth / 1024, "unit": "kB", "better": "lower"},
+        "memory_per_reload_kb": {"value": per_reload / 1024, "unit": "kB", "better": "lower", "budget": MEMORY_PER_RELOAD_BUDGET_KB},
+    }
+
+
+def homeconnect_threads():
+    """Return the listener and resynchronization threads of the appliances which are alive."""
+    shared = ("homeconnect-liveness", "homeconnect-trace-exporter")
+    return [thread for thread in threading.enumerate() if thread.name.startswith("homeconnect-") and thread.name not in shared]
+
+
+def bench_entry_reload(args):
+    """Reload a config entry through async_setup_entry and async_unload_entry of the integration in Home Assistant."""
+    try:
+        import homeassistant.config_entries as config_entries  # pylint: disable=import-outside-toplevel, import-error
+        from homeassistant.core import CoreState, HomeAssistant  # pylint: disable=import-outside-toplevel, import-error
+        from homeassistant.helpers import device_registry, entity_registry  # pylint: disable=import-outside-toplevel, import-error
+        from homeassistant.util.yaml import load_yaml  # pylint: disable=import-outside-toplevel, import-error
+    except ImportError:
+        return None
+
+    EVENT_BULK_RESULT = "home_connect_neo_bulk_result"  # pylint: disable=invalid-name
+    appliances = min(args.appliances, 20)
+    stand_in = StandIn(appliances)
+    # read by the integration when it's imported by the loader of Home Assistant
+    os.environ["HOME_CONNECT_BASE_URL"] = stand_in.url
+
+    async def run_async(config_dir):
+        hass = new_hass(HomeAssistant)
+        hass.config.config_dir = config_dir
+        hass.config.skip_pip = True
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await hass.config_entries.async_initialize()
+        await device_registry.async_load(hass)
+        await entity_registry.async_load(hass)
+        # the web server only serves the OAuth callback, it's not part of the benchmark
+        hass.config.components.add("http")
+        hass.state = CoreState.running
+
+        entry = config_entries.ConfigEntry(
+            version=1,
+            domain="home_connect_neo",
+            title="Benchmark",
+            data={"auth_implementation": "home_connect_neo", "token": stand_in.token(), "client_id": "0" * 64, "client_secret": "0" * 64},
+            source=config_entries.SOURCE_USER,
+        )
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+
+        # the example of the bulk setting service writes typed values, the stand-in rejects values of the wrong type
+        results = []
+        hass.bus.async_listen(EVENT_BULK_RESULT, lambda event: results.extend(event.data["results"]))
+        items = json.loads(load_yaml(str(COMPONENT / "services.yaml"))["bulk_setting"]["fields"]["items"]["example"])
+        names = [appliance.name for appliance in stand_in.fake.appliances.values() if appliance.type == "FridgeFreezer"]
+        await hass.services.async_call("home_connect_neo", "bulk_setting", {"device_names": names, "items": items}, blocking=True)
+        await hass.async_block_till_done()
+        failed_writes = sum(not result["success"] for result in results) + stand_in.fake.counts["type_errors"]
+
+        # the first reload imports lazily loaded modules and fills the executor
+        await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+        gc.collect()
+        fds = open_fds()
+        tracemalloc.start()
+        memory = traced_memory()
+        durations = []
+        # listeners and resynchronizations of the unloaded entry which are still running after a reload
+        stale = 0
+        for reload in range(args.reloads):
+            if reload == args.reloads // 2:
+                halfway = traced_memory()
+            start = time.perf_counter()
+            await hass.config_entries.async_reload(entry.entry_id)
+            await hass.async_block_till_done()
+            durations.append(time.perf_counter() - start)
+            stale = max(stale, len(homeconnect_threads()) - appliances)
+        growth = traced_memory() - memory
+        per_reload = (memory + growth - halfway) / (args.reloads - args.reloads // 2)
+        tracemalloc.stop()
+        leaked_fds = open_fds() - fds if fds is not None else 0
+        loaded = entry.state is config_entries.ConfigEntryState.LOADED
+
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop(force=True)
+        durations.sort()
+        return durations, stale, leaked_fds, growth, per_reload, loaded, failed_writes
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.symlink(COMPONENT.parent, os.path.join(config_dir, "custom_components"))
+        sys.path.insert(0, config_dir)
+        try:
+            durations, stale, leaked_fds, growth, per_reload, loaded, failed_writes = asyncio.run(run_async(config_dir))
+        finally:
+            sys.path.remove(config_dir)
+            del os.environ["HOME_CONNECT_BASE_URL"]
+            stand_in.close()
+    return {
+        "reload_p95_ms": {"value": durations[int(len(durations) * 0.95)] * 1000, "unit": "ms", "better": "lower"},
+        "not_loaded": {"value": int(not loaded), "unit": "1", "better": "lower", "budget": 0},
+        "failed_bulk_writes": {"value": failed_writes, "unit": "1", "better": "lower", "budget": 0},
+        "stale_threads": {"value": max(stale, 0), "unit": "1", "better": "lower", "budget": 0},
+        "leaked_threads": {"value": len(homeconnect_threads()), "unit": "1", "better": "lower", "budget": 0},
+        "leaked_fds": {"value": leaked_fds, "unit": "1", "better": "lower", "budget": LEAKED_FDS_BUDGET},
+        "memory_growth_kb": {"value": growth / 1024, "unit": "kB", "better": "lower"},
+        "memory_per_reload_kb": {"value": per_reload / 1024, "unit": "kB", "better": "lower", "budget": MEMORY_PER_RELOAD_BUDGET_KB},
+    }
+
+
+SCENARIOS = ("sse_parse", "listen_apply", "fanout", "entity_cost", "throttle", "handoff", "replay", "bulk", "detection", "cold_start", "rest_refresh", "reload", "entry_reload")
+
+
+def run(args):
+    """Run the selected scenarios and return the results."""
+    random.seed(args.seed)
+    results = {}
+    stand_in = None
+    for scenario in args.scenarios:
+        print(f"Running {scenario} ...", file=sys.stderr)
+        if scenario in ("cold_start", "rest_refresh", "reload"):
+            if stand_in is None:
+                stand_in = StandIn(args.appliances)
+            result = globals()[f"bench_{scenario}"](args, stand_in)
+        else:
+            result = globals()[f"bench_{scenario}"](args)
+        if result is None:
+            print(f"Skipped {scenario}, Home Assistant is not installed", file=sys.stderr)
+            continue
+        for name, metric in result.items():
+            results[f"{scenario}.{name}"] = metric
+    if stand_in is not None:
+        stand_in.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print the change of every result against the baseline and return the regressed ones.
+    Results with a budget, like leaked threads, are regressions if they exceed it, whatever the baseline."""
+    regressions = []
+    for name, metric in results.items():
+        budget = metric.get("budget")
+        if budget is not None and metric["value"] > budget:
+            print(f"{name:32} {metric['value']:12.3f} {metric['unit']:4} exceeds budget {budget} REGRESSION")
+            regressions.append(name)
+            continue
+        previous = baseline.get("results", {}).get(name)
+        if previous is None or not previous["value"] or metric["better"] is None:
+            print(f"{name:32} {metric['value']:12.3f} {metric['unit']}")
+            continue
+        change = metric["value"] / previous["value"] - 1
+        worse = -change if metric["better"] == "higher" else change
+        flag = "REGRESSION" if worse > tolerance else ""
+        print(f"{name:32} {metric['value']:12.3f} {metric['unit']:4} {change:+8.1%} {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmarks, store the results and compare them against a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), type=lambda value: value.split(","))
+    parser.add_argument("--events", type=int, default=20000, help="events per parse, apply and fan-out run")
+    parser.add_argument("--appliances", type=int, default=100, help="appliances of the fan-out, cold start and refresh scenarios")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per scenario, the best one counts")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the stand-in server takes per request in the bulk scenario")
+    parser.add_argument("--detection-margin", type=float, default=0.5, help="seconds the detection of a stalled stream may take longer than its read deadline")
+    parser.add_argument("--rate", type=float, default=200, help="events per second and appliance replayed in the replay scenario")
+    parser.add_argument("--replay-speed", type=float, default=600, help="program seconds replayed per second in the throttle scenario")
+    parser.add_argument("--reloads", type=int, default=50, help="start and stop cycles of the reload scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to store the results as JSON")
+    parser.add_argument("--baseline", help="results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative slow down before a result counts as regression")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    document = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(), "machine": platform.machine(), "parameters": {"events": args.events, "appliances": args.appliances, "repeat": args.repeat, "reloads": args.reloads}, "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(document, indent=2))
+
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else {}
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
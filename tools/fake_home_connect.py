@@ -0,0 +1,536 @@
+"""Local stand-in for the Home Connect cloud to test the integration offline and at scale.
+
+The server mimics the OAuth endpoints, the REST resources below /api/homeappliances and the event streams of single
+appliances and of all appliances. It simulates any number of virtual appliances which run programs, send KEEP-ALIVE,
+NOTIFY, STATUS, EVENT, CONNECTED and DISCONNECTED events, and it can expire tokens, enforce rate limits and drop or
+silently stall event streams.
+
+Only the standard library is used. Start it with e.g.
+
+    python tools/fake_home_connect.py --appliances 200 --port 8080
+
+and point Home Assistant at it by setting HOME_CONNECT_BASE_URL=http://localhost:8080 and, because the server does not
+speak TLS, OAUTHLIB_INSECURE_TRANSPORT=1 in its environment.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import secrets
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+_LOGGER = logging.getLogger("fake_home_connect")
+
+CONTENT_TYPE = "application/vnd.bsh.sdk.v1+json"
+
+OPERATION_STATE = "BSH.Common.Status.OperationState"
+REMAINING_TIME = "BSH.Common.Option.RemainingProgramTime"
+ELAPSED_TIME = "BSH.Common.Option.ElapsedProgramTime"
+PROGRESS = "BSH.Common.Option.ProgramProgress"
+PROGRAM_FINISHED = "BSH.Common.Event.ProgramFinished"
+DOOR_STATE = "BSH.Common.Status.DoorState"
+REMOTE_START = "BSH.Common.Status.RemoteControlStartAllowed"
+POWER_STATE = "BSH.Common.Setting.PowerState"
+
+RUN = "BSH.Common.EnumType.OperationState.Run"
+READY = "BSH.Common.EnumType.OperationState.Ready"
+FINISHED = "BSH.Common.EnumType.OperationState.Finished"
+
+# Programs with their duration in seconds and status and settings keys of the simulated appliance types
+APPLIANCE_TYPES = {
+    "Washer": {
+        "programs": {"LaundryCare.Washer.Program.Cotton": 7200, "LaundryCare.Washer.Program.EasyCare": 5400, "LaundryCare.Washer.Program.Mix": 3600},
+        "options": {"LaundryCare.Washer.Option.Temperature": "LaundryCare.Washer.EnumType.Temperature.GC40", "LaundryCare.Washer.Option.SpinSpeed": "LaundryCare.Washer.EnumType.SpinSpeed.RPM1200"},
+        "settings": {},
+    },
+    "Dryer": {
+        "programs": {"LaundryCare.Dryer.Program.Cotton": 6000, "LaundryCare.Dryer.Program.Synthetic": 4200},
+        "options": {"LaundryCare.Dryer.Option.DryingTarget": "LaundryCare.Dryer.EnumType.DryingTarget.CupboardDry"},
+        "settings": {},
+    },
+    "Dishwasher": {
+        "programs": {"Dishcare.Dishwasher.Program.Auto2": 8400, "Dishcare.Dishwasher.Program.Eco50": 10800, "Dishcare.Dishwasher.Program.Quick45": 2700},
+        "options": {},
+        "settings": {},
+    },
+    "Oven": {
+        "programs": {"Cooking.Oven.Program.HeatingMode.HotAir": 3600, "Cooking.Oven.Program.HeatingMode.PizzaSetting": 1200},
+        "options": {"Cooking.Oven.Option.SetpointTemperature": 180},
+        "settings": {},
+    },
+    "FridgeFreezer": {
+        "programs": {},
+        "options": {},
+        "settings": {
+            "Refrigeration.FridgeFreezer.Setting.SetpointTemperatureRefrigerator": 4,
+            "Refrigeration.FridgeFreezer.Setting.SetpointTemperatureFreezer": -18,
+            "Refrigeration.FridgeFreezer.Setting.SuperModeRefrigerator": False,
+            "Refrigeration.FridgeFreezer.Setting.SuperModeFreezer": False,
+            "Refrigeration.Common.Setting.VacationMode": False,
+        },
+    },
+    "CoffeeMaker": {
+        "programs": {"ConsumerProducts.CoffeeMaker.Program.Beverage.Espresso": 60, "ConsumerProducts.CoffeeMaker.Program.Beverage.Coffee": 90},
+        "options": {"ConsumerProducts.CoffeeMaker.Option.BeanAmount": "ConsumerProducts.CoffeeMaker.EnumType.BeanAmount.Normal"},
+        "settings": {},
+    },
+}
+
+
+def error(key, description):
+    """Return the body of an error response."""
+    return {"error": {"key": key, "description": description}}
+
+
+def same_type(value, current):
+    """Return true if a new value has the JSON type of the current value. Booleans are not numbers."""
+    if isinstance(value, bool) or isinstance(current, bool):
+        return isinstance(value, bool) and isinstance(current, bool)
+    if isinstance(current, (int, float)):
+        return isinstance(value, (int, float))
+    return isinstance(value, type(current))
+
+
+def item(ha_id, key, value, kind="status", unit=None):
+    """Return an item of an event."""
+    result = {"timestamp": int(time.time()), "handling": "none", "uri": f"/api/homeappliances/{ha_id}/{kind}/{key}", "key": key, "value": value, "level": "hint"}
+    if unit is not None:
+        result["unit"] = unit
+    return result
+
+
+class VirtualAppliance:
+    """Appliance which runs programs and reports its state changes as events."""
+
+    def __init__(self, index, appliance_type):
+        self.type = appliance_type
+        self.spec = APPLIANCE_TYPES[appliance_type]
+        self.ha_id = f"FAKE-{appliance_type.upper()}-{index:06d}"
+        self.name = f"{appliance_type} {index}"
+        self.connected = True
+        self.status = {OPERATION_STATE: READY, DOOR_STATE: "BSH.Common.EnumType.DoorState.Closed", REMOTE_START: True}
+        self.settings = {POWER_STATE: "BSH.Common.EnumType.PowerState.On", **self.spec["settings"]}
+        self.selected = next(iter(self.spec["programs"]), None)
+        self.options = dict(self.spec["options"])
+        self.active = None
+        self.duration = 0
+        self.elapsed = 0
+
+    def as_dict(self):
+        """Return the appliance as listed by /api/homeappliances."""
+        return {"name": self.name, "brand": "FAKE", "vib": f"FAKE{self.type.upper()}", "connected": self.connected, "type": self.type, "enumber": f"FAKE{self.type.upper()}/01", "haId": self.ha_id}
+
+    def program(self, key, with_times):
+        """Return a program with its options."""
+        options = [{"key": option, "value": value} for option, value in self.options.items()]
+        if with_times and key == self.active:
+            options += [{"key": REMAINING_TIME, "value": self.duration - self.elapsed, "unit": "seconds"}, {"key": ELAPSED_TIME, "value": self.elapsed, "unit": "seconds"}, {"key": PROGRESS, "value": self.progress, "unit": "%"}]
+        return {"key": key, "options": options}
+
+    @property
+    def progress(self):
+        """Return the progress of the active program in percent."""
+        return int(100 * self.elapsed / self.duration) if self.duration else 0
+
+    def start(self, key):
+        """Start a program and return the events."""
+        self.active = self.selected = key
+        self.duration = self.spec["programs"][key]
+        self.elapsed = 0
+        self.status[OPERATION_STATE] = RUN
+        return [("STATUS", [item(self.ha_id, OPERATION_STATE, RUN)]), ("NOTIFY", self._times())]
+
+    def stop(self):
+        """Abort the active program and return the events."""
+        self.active = None
+        self.status[OPERATION_STATE] = READY
+        return [("STATUS", [item(self.ha_id, OPERATION_STATE, READY)])]
+
+    def _times(self):
+        return [
+            item(self.ha_id, REMAINING_TIME, self.duration - self.elapsed, "programs/active/options", "seconds"),
+            item(self.ha_id, ELAPSED_TIME, self.elapsed, "programs/active/options", "seconds"),
+            item(self.ha_id, PROGRESS, self.progress, "programs/active/options", "%"),
+        ]
+
+    def tick(self, seconds, start_probability, disconnect_probability):
+        """Advance the simulation and return the events which happened meanwhile."""
+        if not self.connected:
+            if random.random() < 0.5:
+                self.connected = True
+                return [("CONNECTED", [item(self.ha_id, "BSH.Common.Appliance.Connected", True, "events")])]
+            return []
+        if random.random() < disconnect_probability:
+            self.connected = False
+            return [("DISCONNECTED", [item(self.ha_id, "BSH.Common.Appliance.Disconnected", True, "events")])]
+
+        if self.active is None:
+            if self.spec["programs"] and random.random() < start_probability:
+                return self.start(random.choice(list(self.spec["programs"])))
+            return []
+
+        self.elapsed = min(self.duration, self.elapsed + seconds)
+        if self.elapsed < self.duration:
+            return [("NOTIFY", self._times())]
+
+        self.active = None
+        self.status[OPERATION_STATE] = FINISHED
+        return [
+            ("NOTIFY", self._times()),
+            ("STATUS", [item(self.ha_id, OPERATION_STATE, FINISHED)]),
+            ("EVENT", [item(self.ha_id, PROGRAM_FINISHED, "BSH.Common.EnumType.EventPresentState.Present", "events")]),
+        ]
+
+
+class FakeHomeConnect:
+    """HTTP server with the OAuth endpoints, REST resources and event streams of the Home Connect cloud."""
+
+    def __init__(self, args):
+        self.args = args
+        types = args.types.split(",")
+        self.appliances = {}
+        for index in range(args.appliances):
+            appliance = VirtualAppliance(index, types[index % len(types)])
+            self.appliances[appliance.ha_id] = appliance
+        # access token -> expiry, refresh tokens and authorization codes which have been issued
+        self.tokens = {}
+        self.refresh_tokens = set()
+        self.codes = set()
+        # request times per access token within the rate limit window
+        self.requests = {}
+        # queues of the open event streams per haId, None for the streams of all appliances
+        self.streams = {}
+        self.counts = {"requests": 0, "rate_limited": 0, "events": 0, "streams": 0, "stalled": 0, "type_errors": 0}
+
+    # ---- HTTP ----
+
+    async def handle(self, reader, writer):
+        """Serve the requests of one connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, target, _version = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1")
+                    if line in ("\r\n", "\n", ""):
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                url = urlsplit(target)
+                if url.path.endswith("/events") and method == "GET":
+                    await self._stream(url.path, headers, reader, writer)
+                    return
+                status, payload, extra = self.route(method, url.path, parse_qs(url.query), headers, body)
+                if self.args.latency:
+                    # round trip time to the cloud
+                    await asyncio.sleep(self.args.latency)
+                await self._respond(writer, status, payload, extra)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # the server is shut down
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, extra=None):
+        """Write a response and keep the connection open."""
+        body = b"" if payload is None else json.dumps(payload).encode()
+        headers = {"Content-Type": CONTENT_TYPE if "error" not in (payload or {}) else "application/json", "Content-Length": str(len(body)), **(extra or {})}
+        head = f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}\r\n" + "".join(f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    def route(self, method, path, query, headers, body):
+        """Return status, payload and headers of a request."""
+        if path == "/security/oauth/authorize":
+            return self.authorize(query)
+        if path == "/security/oauth/token" and method == "POST":
+            return self.token(parse_qs(body.decode()))
+
+        denied = self._check_access(headers)
+        if denied is not None:
+            return denied
+
+        parts = path.strip("/").split("/")
+        if parts[:2] != ["api", "homeappliances"]:
+            return 404, error("404", "Not found"), None
+        if len(parts) == 2:
+            return 200, {"data": {"homeappliances": [appliance.as_dict() for appliance in self.appliances.values()]}}, None
+        appliance = self.appliances.get(parts[2])
+        if appliance is None:
+            return 404, error("SDK.Error.HomeAppliance.NotFound", "Home appliance not found"), None
+        if not appliance.connected:
+            return 409, error("SDK.Error.HomeAppliance.Connection.Initialization.Failed", "The home appliance is offline"), None
+        data = json.loads(body)["data"] if body else {}
+        return self.appliance_route(appliance, method, parts[3:], data)
+
+    def appliance_route(self, appliance, method, resource, data):
+        """Return status, payload and headers of a request of an appliance resource."""
+        if not resource:
+            return 200, {"data": appliance.as_dict()}, None
+        kind, rest = resource[0], resource[1:]
+
+        if kind == "status" and method == "GET":
+            if rest:
+                if rest[0] not in appliance.status:
+                    return 404, error("SDK.Error.UnsupportedStatus", "Status not supported"), None
+                return 200, {"data": {"key": rest[0], "value": appliance.status[rest[0]]}}, None
+            return 200, {"data": {"status": [{"key": key, "value": value} for key, value in appliance.status.items()]}}, None
+
+        if kind == "settings":
+            if not rest:
+                return 200, {"data": {"settings": [{"key": key, "value": value} for key, value in appliance.settings.items()]}}, None
+            if rest[0] not in appliance.settings:
+                return 404, error("SDK.Error.UnsupportedSetting", "Setting not supported"), None
+            if method == "PUT":
+                if not same_type(data["value"], appliance.settings[rest[0]]):
+                    self.counts["type_errors"] += 1
+                    return 400, error("SDK.Error.InvalidSettingValue", f"Value {data['value']!r} has the wrong type"), None
+                appliance.settings[rest[0]] = data["value"]
+                self.publish(appliance, [("NOTIFY", [item(appliance.ha_id, rest[0], data["value"], "settings")])])
+                return 204, None, None
+            return 200, {"data": {"key": rest[0], "value": appliance.settings[rest[0]]}}, None
+
+        if kind == "commands":
+            if method == "PUT":
+                return 204, None, None
+            return 200, {"data": {"commands": []}}, None
+
+        if kind == "programs":
+            return self.program_route(appliance, method, rest, data)
+
+        return 404, error("404", "Not found"), None
+
+    def program_route(self, appliance, method, rest, data):
+        """Return status, payload and headers of a request of the programs of an appliance."""
+        programs = appliance.spec["programs"]
+        if not programs:
+            return 404, error("SDK.Error.UnsupportedOperation", "Programs are not supported"), None
+        if not rest or rest == ["available"]:
+            return 200, {"data": {"programs": [{"key": key} for key in programs]}}, None
+        if rest[0] == "available":
+            if rest[1] not in programs:
+                return 404, error("SDK.Error.UnsupportedProgram", "Program not supported"), None
+            options = [{"key": key, "type": type(value).__name__, "constraints": {}} for key, value in appliance.options.items()]
+            return 200, {"data": {"key": rest[1], "options": options}}, None
+
+        if rest[0] == "active":
+            if method == "PUT" and len(rest) == 1:
+                if data["key"] not in programs:
+                    return 404, error("SDK.Error.UnsupportedProgram", "Program not supported"), None
+                self.publish(appliance, appliance.start(data["key"]))
+                return 204, None, None
+            if appliance.active is None:
+                return 404, error("SDK.Error.NoProgramActive", "There is no program active"), None
+            if method == "DELETE":
+                self.publish(appliance, appliance.stop())
+                return 204, None, None
+        elif rest[0] == "selected":
+            if method == "PUT" and len(rest) == 1:
+                if data["key"] not in programs:
+                    return 404, error("SDK.Error.UnsupportedProgram", "Program not supported"), None
+                appliance.selected = data["key"]
+                self.publish(appliance, [("NOTIFY", [item(appliance.ha_id, "BSH.Common.Root.SelectedProgram", data["key"], "programs")])])
+                return 204, None, None
+            if appliance.selected is None:
+                return 404, error("SDK.Error.NoProgramSelected", "There is no program selected"), None
+        else:
+            return 404, error("404", "Not found"), None
+
+        key = appliance.active if rest[0] == "active" else appliance.selected
+        program = appliance.program(key, rest[0] == "active")
+        if len(rest) == 1:
+            return 200, {"data": program}, None
+        if method == "PUT":
+            if len(rest) > 2:
+                appliance.options[rest[2]] = data["value"]
+            return 204, None, None
+        if len(rest) > 2:
+            option = next((option for option in program["options"] if option["key"] == rest[2]), None)
+            if option is None:
+                return 404, error("SDK.Error.UnsupportedOption", "Option not supported"), None
+            return 200, {"data": option}, None
+        return 200, {"data": {"options": program["options"]}}, None
+
+    # ---- OAuth and rate limits ----
+
+    def authorize(self, query):
+        """Grant access immediately and redirect back to the client."""
+        code = secrets.token_hex(16)
+        self.codes.add(code)
+        location = query["redirect_uri"][0] + "?" + urlencode({"code": code, "state": query.get("state", [""])[0]})
+        return 302, None, {"Location": location}
+
+    def token(self, form):
+        """Issue tokens for an authorization code or a refresh token."""
+        grant = form.get("grant_type", [""])[0]
+        if grant == "authorization_code" and form.get("code", [""])[0] in self.codes:
+            self.codes.discard(form["code"][0])
+        elif grant == "refresh_token" and form.get("refresh_token", [""])[0] in self.refresh_tokens:
+            pass
+        else:
+            return 400, error("invalid_grant", "Invalid authorization code or refresh token"), None
+
+        access_token = secrets.token_hex(32)
+        refresh_token = secrets.token_hex(32)
+        self.tokens[access_token] = time.monotonic() + self.args.token_lifetime
+        self.refresh_tokens.add(refresh_token)
+        _LOGGER.info("Issued token for %s grant", grant)
+        return 200, {"access_token": access_token, "refresh_token": refresh_token, "expires_in": self.args.token_lifetime, "token_type": "Bearer", "scope": "IdentifyAppliance Monitor Control Settings"}, None
+
+    def _check_access(self, headers):
+        """Return an error response if the token is invalid or expired or the rate limit is exceeded."""
+        self.counts["requests"] += 1
+        _scheme, _, access_token = headers.get("authorization", "").partition(" ")
+        expires = self.tokens.get(access_token)
+        if expires is None:
+            return 401, error("invalid_token", "The access token is invalid"), None
+        now = time.monotonic()
+        if expires < now:
+            return 401, error("invalid_token", "The access token has expired"), None
+
+        if self.args.rate_limit:
+            window = self.requests.setdefault(access_token, deque())
+            while window and window[0] < now - 60:
+                window.popleft()
+            if len(window) >= self.args.rate_limit:
+                self.counts["rate_limited"] += 1
+                retry_after = int(window[0] + 60 - now) + 1
+                return 429, error("429", f'The rate limit "{self.args.rate_limit} calls in 1 minute" was reached. Requests are blocked during the remaining period of {retry_after} seconds.'), {"Retry-After": str(retry_after)}
+            window.append(now)
+        return None
+
+    # ---- Event streams ----
+
+    async def _stream(self, path, headers, reader, writer):
+        """Send the events of one appliance or of all appliances until the client disconnects."""
+        denied = self._check_access(headers)
+        if denied is not None:
+            await self._respond(writer, *denied)
+            return
+        parts = path.strip("/").split("/")
+        ha_id = parts[2] if len(parts) == 4 else None
+        if ha_id is not None and ha_id not in self.appliances:
+            await self._respond(writer, 404, error("SDK.Error.HomeAppliance.NotFound", "Home appliance not found"))
+            return
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+        queue = asyncio.Queue(maxsize=self.args.queue_size)
+        self.streams.setdefault(ha_id, set()).add(queue)
+        self.counts["streams"] += 1
+        # the client closes the connection when it stops listening
+        disconnected = asyncio.ensure_future(reader.read(1))
+        try:
+            while True:
+                received = asyncio.ensure_future(queue.get())
+                done, _pending = await asyncio.wait({received, disconnected}, timeout=self.args.keep_alive, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    received.cancel()
+                    return
+                if received in done:
+                    event, data, event_id = received.result()
+                else:
+                    received.cancel()
+                    event, data, event_id = "KEEP-ALIVE", "", None
+                if event is None:
+                    # the stream is dropped to simulate a broken connection
+                    return
+                if event == STALL:
+                    # the connection stays open, but nothing arrives anymore like behind a dead route
+                    self.counts["stalled"] += 1
+                    await disconnected
+                    return
+                frame = f"event: {event}\ndata: {data}\n" + (f"id: {event_id}\n" if event_id else "") + "\n"
+                writer.write(frame.encode())
+                await writer.drain()
+        finally:
+            disconnected.cancel()
+            self.streams[ha_id].discard(queue)
+            self.counts["streams"] -= 1
+
+    def publish(self, appliance, events):
+        """Send events of an appliance to its streams and the streams of all appliances."""
+        for event, items in events:
+            data = json.dumps({"items": items, "haId": appliance.ha_id})
+            for queue in list(self.streams.get(appliance.ha_id, ())) + list(self.streams.get(None, ())):
+                try:
+                    queue.put_nowait((event, data, appliance.ha_id))
+                    self.counts["events"] += 1
+                except asyncio.QueueFull:
+                    _LOGGER.warning("Stream of %s is too slow, event dropped", appliance.ha_id)
+
+    def stall(self, ha_id):
+        """Silently stall the open event streams of an appliance."""
+        for queue in list(self.streams.get(ha_id, ())):
+            queue.put_nowait((STALL, None, None))
+
+    async def simulate(self):
+        """Advance all appliances periodically."""
+        while True:
+            await asyncio.sleep(self.args.tick)
+            for appliance in self.appliances.values():
+                self.publish(appliance, appliance.tick(self.args.tick * self.args.speed, self.args.start_probability, self.args.disconnect_probability))
+            if self.args.drop_probability or self.args.stall_probability:
+                for queues in self.streams.values():
+                    for queue in list(queues):
+                        if random.random() < self.args.drop_probability:
+                            queue.put_nowait((None, None, None))
+                        elif random.random() < self.args.stall_probability:
+                            queue.put_nowait((STALL, None, None))
+            _LOGGER.debug("Statistics: %s", self.counts)
+
+
+# Event of a stream which stalls silently
+STALL = "STALL"
+
+REASONS = {200: "OK", 204: "No Content", 302: "Found", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 409: "Conflict", 429: "Too Many Requests"}
+
+
+async def main(args):
+    """Run the server."""
+    fake = FakeHomeConnect(args)
+    server = await asyncio.start_server(fake.handle, args.host, args.port, limit=2 ** 20, backlog=1024)
+    _LOGGER.info("Simulating %d appliances on http://%s:%d", len(fake.appliances), args.host, args.port)
+    async with server:
+        await asyncio.gather(server.serve_forever(), fake.simulate())
+
+
+def parse_args(argv=None):
+    """Return the command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--appliances", type=int, default=10, help="number of virtual appliances")
+    parser.add_argument("--types", default=",".join(APPLIANCE_TYPES), help="comma separated appliance types, assigned round robin")
+    parser.add_argument("--tick", type=float, default=5, help="seconds between two simulation steps")
+    parser.add_argument("--speed", type=float, default=12, help="program seconds which pass per real second")
+    parser.add_argument("--start-probability", type=float, default=0.02, help="probability that an idle appliance starts a program per step")
+    parser.add_argument("--disconnect-probability", type=float, default=0.002, help="probability that an appliance is disconnected per step")
+    parser.add_argument("--drop-probability", type=float, default=0.0, help="probability that an open event stream is dropped per step")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every request takes like the round trip to the cloud")
+    parser.add_argument("--stall-probability", type=float, default=0.0, help="probability that an open event stream silently stops sending per step without being closed")
+    parser.add_argument("--keep-alive", type=float, default=55, help="seconds between KEEP-ALIVE events of an idle stream")
+    parser.add_argument("--token-lifetime", type=int, default=86400, help="seconds until an access token expires")
+    parser.add_argument("--rate-limit", type=int, default=50, help="requests per token and minute, 0 to disable")
+    parser.add_argument("--queue-size", type=int, default=1000, help="events buffered per stream before they are dropped")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    ARGS = parse_args()
+    logging.basicConfig(level=logging.DEBUG if ARGS.verbose else logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(main(ARGS))
+    except KeyboardInterrupt:
+        pass